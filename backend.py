@@ -0,0 +1,659 @@
+# This Python file uses the following encoding: utf-8
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Union
+
+try:
+    from jeepney import (DBusAddress, DBusErrorResponse, HeaderFields, MatchRule, MessageType,
+                         message_bus, new_method_call)
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    open_dbus_connection = None
+
+from units import Unit, unitTypeOf
+from properties import DETAIL_PROPERTIES, parseShowOutput
+from instrumentation import recorder, timed
+
+BULK_ACTIONS = ('start', 'stop', 'restart', 'enable', 'disable')
+# the actions systemd runs as jobs, enable and disable are done on the spot
+JOB_ACTIONS = ('start', 'stop', 'restart')
+ENABLED_STATES = ('enabled', 'enabled-runtime', 'static', 'indirect', 'alias', 'generated')
+TIMER_PROPERTIES = ('Unit', 'NextElapseUSecRealtime', 'NextElapseUSecMonotonic', 'LastTriggerUSec')
+# systemd's USEC_INFINITY and anything near it mean "never"
+NEVER_USEC = 1 << 63
+
+
+def usecValue(value) -> int:
+    try:
+        usec = int(value)
+    except (TypeError, ValueError):
+        return 0
+    return usec if 0 < usec < NEVER_USEC else 0
+
+
+def actionSucceeded(action: str, properties: dict) -> bool:
+    # judged from the state the unit is in afterwards, systemctl only reports
+    # one exit code for the whole batch
+    activeState = properties.get('ActiveState', '')
+    unitFileState = properties.get('UnitFileState', '')
+    if action in ('start', 'restart'):
+        return activeState in ('active', 'activating', 'reloading')
+    if action == 'stop':
+        return activeState in ('inactive', 'deactivating', 'failed')
+    if action == 'enable':
+        return unitFileState in ENABLED_STATES
+    if action == 'disable':
+        return unitFileState not in ('enabled', 'enabled-runtime', '')
+    raise ValueError(f'unknown action: {action}')
+
+
+def actionResult(action: str, properties: dict) -> tuple:
+    # (succeeded, detail) for a unit in properties after action
+    state = properties.get('UnitFileState' if action in ('enable', 'disable') else 'ActiveState', '')
+    if actionSucceeded(action, properties):
+        return True, state
+    return False, f'{action} failed ({state or "unknown"})'
+
+
+def errorLineFor(name: str, lines: list) -> Union[str, None]:
+    # the first of systemctl's stderr lines about name; a.service is not
+    # about xa.service, a.service.d or a.service@x, and quotes are fine
+    pattern = re.compile(r'(?<![\w@.-])' + re.escape(name) + r'(?![\w@.-])')
+    return next((line for line in lines if pattern.search(line)), None)
+
+
+class Backend:
+    # Everything the GUI needs from systemd. Implementations must be safe to
+    # call from the executor's worker threads. local tells whether it
+    # manages the systemd of this machine.
+    name = 'abstract'
+    local = True
+
+    def listUnitFiles(self) -> list:
+        raise NotImplementedError
+
+    def listUnits(self) -> list:
+        raise NotImplementedError
+
+    def getProperties(self, names: list, properties: tuple = DETAIL_PROPERTIES) -> dict:
+        raise NotImplementedError
+
+    @timed('backend')
+    def listTimers(self) -> list:
+        # [(timer, unit it activates, next elapse, last trigger)] for every
+        # loaded timer, in microseconds since the epoch, 0 for never. This
+        # reads the timer properties, which have to come as plain numbers
+        # (D-Bus); monotonic elapses are moved onto the wall clock.
+        names = [row[0] for row in self.listUnits() if row[0].endswith('.timer')]
+        offset = int((time.time() - time.monotonic()) * 1e6)
+        result = []
+        for name, values in self.getProperties(names, TIMER_PROPERTIES).items():
+            realtime = usecValue(values.get('NextElapseUSecRealtime'))
+            monotonic = usecValue(values.get('NextElapseUSecMonotonic'))
+            elapses = [usec for usec in (realtime, monotonic and monotonic + offset) if usec]
+            result.append((name, values.get('Unit', ''), min(elapses, default=0),
+                           usecValue(values.get('LastTriggerUSec'))))
+        return result
+
+    def startUnit(self, name: str) -> bool:
+        raise NotImplementedError
+
+    def stopUnit(self, name: str) -> bool:
+        raise NotImplementedError
+
+    def enableUnit(self, name: str) -> bool:
+        raise NotImplementedError
+
+    def disableUnit(self, name: str) -> bool:
+        raise NotImplementedError
+
+    @timed('backend')
+    def bulkAction(self, action: str, names: list) -> dict:
+        # Applies one of BULK_ACTIONS to all names and returns
+        # {name: (succeeded, detail)}; backends override this to do it in a
+        # single round trip
+        methods = {'start': self.startUnit, 'stop': self.stopUnit, 'enable': self.enableUnit,
+                   'disable': self.disableUnit}
+        result = {}
+        for name in names:
+            if action == 'restart':
+                succeeded = self.stopUnit(name) and self.startUnit(name)
+            else:
+                succeeded = methods[action](name)
+            result[name] = (succeeded, '' if succeeded else f'{action} failed')
+        return result
+
+    def enqueueJobs(self, action: str, names: list) -> tuple:
+        # Queues action for names without waiting for the jobs:
+        # ({name: job id}, {name: (succeeded, detail)}) with the jobs systemd
+        # took and the units done or failed right away. Backends without
+        # jobs of their own do it all on the spot with bulkAction.
+        return {}, self.bulkAction(action, names)
+
+    def jobResults(self, jobs: dict) -> dict:
+        # jobs maps names to (action, job id) as queued by enqueueJobs; the
+        # result has (succeeded, detail) for the ones that finished
+        return {}
+
+    def cancelJob(self, name: str, jobId) -> bool:
+        return False
+
+    def close(self):
+        pass
+
+
+def runLocally(argv: list, timeout: Union[float, None] = None, stderr=None) -> subprocess.CompletedProcess:
+    # the default runner; a runner gets the full systemctl command line and
+    # returns its CompletedProcess with stdout, and stderr when asked for
+    return subprocess.run(argv, shell=False, stdout=subprocess.PIPE, stderr=stderr, timeout=timeout)
+
+
+class SubprocessBackend(Backend):
+    # options are extra systemctl options such as --machine=NAME or
+    # --host=HOST, runner replaces runLocally() and timeout applies to every
+    # single systemctl call
+    name = 'subprocess'
+
+    def __init__(self, systemctl: str = 'systemctl', options: tuple = (), runner: Union[Callable, None] = None,
+                 timeout: Union[float, None] = None):
+        self.systemctl = systemctl
+        self.options = tuple(options)
+        self.runner = runner or runLocally
+        self.timeout = timeout
+        self.local = not self.options and runner is None
+        if self.options:
+            self.name = ' '.join((self.name,) + self.options)
+
+    def run(self, *args, stderr=None, tool: Union[str, None] = None) -> subprocess.CompletedProcess:
+        # the options go after the command, before any "--"; tool runs another
+        # program that takes them, such as systemd-analyze
+        cmd = [tool or self.systemctl, *args[:1], *self.options, *args[1:]]
+        if not recorder.enabled:
+            return self.runner(cmd, self.timeout, stderr)
+        start = time.perf_counter()
+        result = self.runner(cmd, self.timeout, stderr)
+        recorder.recordCommand(cmd, start, time.perf_counter() - start, result.returncode, len(result.stdout))
+        return result
+
+    def query(self, *args) -> str:
+        # output of a listing command; a target that cannot be reached is an
+        # error rather than an empty list
+        cmdOut = self.run(*args, stderr=subprocess.PIPE)
+        if cmdOut.returncode != 0 and not cmdOut.stdout:
+            raise RuntimeError(cmdOut.stderr.decode(errors='replace').strip() or f'systemctl {args[0]} failed')
+        return cmdOut.stdout.decode(errors='replace')
+
+    @timed('backend')
+    def listUnitFiles(self) -> list:
+        array = []
+        cmdOut = self.query("list-unit-files", "--no-legend", "--no-pager", "--plain", "--full")
+        for line in cmdOut.split('\n'):
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            name = fields[0]
+            array.append(Unit(name, unitTypeOf(name), unitFileState=fields[1]))
+        return array
+
+    @timed('backend')
+    def listUnits(self) -> list:
+        result = []
+        cmdOut = self.query("list-units", "--all", "--no-legend", "--plain", "--full")
+        for line in cmdOut.split('\n'):
+            fields = line.split(None, 4)
+            if len(fields) < 4:
+                continue
+            name, load, active, sub = fields[:4]
+            result.append((name, load, active, sub, fields[4] if len(fields) > 4 else ''))
+        return result
+
+    @timed('backend')
+    def listTimers(self) -> list:
+        # show would print the times for humans, list-timers has them raw
+        timers = json.loads(self.query("list-timers", "--all", "--output=json", "--no-pager") or '[]')
+        return [(timer['unit'], timer.get('activates') or '', usecValue(timer.get('next')),
+                 usecValue(timer.get('last'))) for timer in timers]
+
+    @timed('backend')
+    def getProperties(self, names: list, properties: tuple = DETAIL_PROPERTIES) -> dict:
+        if not names:
+            return {}
+        if 'Id' not in properties:
+            properties = ('Id',) + tuple(properties)
+        cmdOut = self.run("show", "-p", ",".join(properties), "--", *names)
+        if cmdOut.returncode != 0:
+            return {}
+        blocks = parseShowOutput(cmdOut.stdout.decode(errors='replace'))
+        return dict(zip(names, blocks))
+
+    def startUnit(self, name: str) -> bool:
+        return self.run("start", "--", name).returncode == 0
+
+    def stopUnit(self, name: str) -> bool:
+        return self.run("stop", "--", name).returncode == 0
+
+    def enableUnit(self, name: str) -> bool:
+        return self.run("enable", "--", name).returncode == 0
+
+    def disableUnit(self, name: str) -> bool:
+        return self.run("disable", "--", name).returncode == 0
+
+    @timed('backend')
+    def bulkAction(self, action: str, names: list) -> dict:
+        if action not in BULK_ACTIONS:
+            raise ValueError(f'unknown action: {action}')
+        if not names:
+            return {}
+        # one systemctl call enqueues every job and waits for all of them,
+        # a second one tells which units ended up where they should
+        cmdOut = self.run(action, "--", *names, stderr=subprocess.PIPE)
+        errors = cmdOut.stderr.decode(errors='replace').splitlines()
+        states = self.getProperties(names, ('LoadState', 'ActiveState', 'SubState', 'UnitFileState'))
+        result = {}
+        for name in names:
+            values = states.get(name, {})
+            succeeded = actionSucceeded(action, values)
+            if succeeded:
+                detail = values.get('UnitFileState' if action in ('enable', 'disable') else 'ActiveState', '')
+            else:
+                detail = errorLineFor(name, errors) or ''
+                if not detail and values.get('LoadState') == 'not-found':
+                    detail = 'unit not found'
+                detail = detail or f'{action} failed'
+            result[name] = (succeeded, detail)
+        return result
+
+    @timed('backend')
+    def enqueueJobs(self, action: str, names: list) -> tuple:
+        if action not in JOB_ACTIONS:
+            return super().enqueueJobs(action, names)
+        # systemctl does not print the job ids, jobs are told apart by unit
+        cmdOut = self.run(action, "--no-block", "--", *names, stderr=subprocess.PIPE)
+        errors = cmdOut.stderr.decode(errors='replace').splitlines()
+        failed = {}
+        for name in names:
+            detail = errorLineFor(name, errors)
+            if detail is not None:
+                failed[name] = (False, detail)
+        if cmdOut.returncode != 0 and not failed:
+            failed = {name: (False, errors[0] if errors else f'{action} failed') for name in names}
+        return {name: None for name in names if name not in failed}, failed
+
+    def runningJobs(self) -> dict:
+        # {unit: job id} for every job systemd has queued or running
+        jobs = {}
+        for line in self.query("list-jobs", "--no-legend", "--no-pager", "--plain", "--full").split('\n'):
+            fields = line.split()
+            if len(fields) >= 2 and fields[0].isdigit():
+                jobs[fields[1]] = fields[0]
+        return jobs
+
+    @timed('backend')
+    def jobResults(self, jobs: dict) -> dict:
+        # a unit without a job left is done, its state tells how it went
+        running = self.runningJobs()
+        finished = [name for name in jobs if name not in running]
+        states = self.getProperties(finished, ('ActiveState', 'UnitFileState'))
+        return {name: actionResult(jobs[name][0], states.get(name, {})) for name in finished}
+
+    def cancelJob(self, name: str, jobId) -> bool:
+        # looked up again, the job id is not known when it was queued
+        running = self.runningJobs().get(name)
+        return running is not None and self.run("cancel", "--", running).returncode == 0
+
+
+def formatDBusValue(signature: str, value) -> str:
+    # Render a property the same way `systemctl show` does, so both backends
+    # hand out interchangeable dictionaries
+    if signature == 'b':
+        return 'yes' if value else 'no'
+    if signature == 'as':
+        return ' '.join(value)
+    if signature in ('s', 'o', 'g'):
+        return value
+    return str(value)
+
+
+class DBusBackend(Backend):
+    name = 'dbus'
+    SERVICE = 'org.freedesktop.systemd1'
+    MANAGER_PATH = '/org/freedesktop/systemd1'
+    MANAGER_INTERFACE = 'org.freedesktop.systemd1.Manager'
+    PIPELINE_DEPTH = 64
+    # how long a JobRemoved of a job not known to be ours is kept: its path
+    # only becomes known when the reply that queued it is handed out
+    UNCLAIMED_JOB_SECONDS = 10.0
+
+    def __init__(self, bus: str = 'SYSTEM', jobTimeout: float = 90.0):
+        if open_dbus_connection is None:
+            raise RuntimeError('the D-Bus backend requires the jeepney package')
+        self.jobTimeout = jobTimeout
+        self._connection = open_dbus_connection(bus=bus)
+        self._manager = DBusAddress(self.MANAGER_PATH, bus_name=self.SERVICE,
+                                    interface=self.MANAGER_INTERFACE)
+        self._lock = threading.Lock()
+        # job paths this backend queued and is waiting for, the results of
+        # those that finished, and recent JobRemoved results not claimed yet
+        self._pendingJobs = set()
+        self._finishedJobs = {}
+        self._unclaimedJobs = {}
+        self._unitPaths = {}
+
+        jobRemoved = MatchRule(type='signal', sender=self.SERVICE, interface=self.MANAGER_INTERFACE,
+                               member='JobRemoved', path=self.MANAGER_PATH)
+        self._call(message_bus.AddMatch(jobRemoved))
+        self._callManager('Subscribe')
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _dispatch(self, message):
+        # Signals that arrive while waiting for a reply are only interesting
+        # when they report a finished job
+        if message.header.message_type != MessageType.signal:
+            return
+        if message.header.fields.get(HeaderFields.member) == 'JobRemoved':
+            _, jobPath, _, result = message.body
+            if jobPath in self._pendingJobs:
+                self._pendingJobs.discard(jobPath)
+                self._finishedJobs[jobPath] = result
+                return
+            # every client's jobs are reported, the unclaimed ones are only
+            # kept until no reply can be naming them anymore
+            now = time.monotonic()
+            self._unclaimedJobs[jobPath] = (result, now)
+            for path, (_, removed) in list(self._unclaimedJobs.items()):
+                if now - removed < self.UNCLAIMED_JOB_SECONDS:
+                    break
+                del self._unclaimedJobs[path]
+
+    def _trackJobs(self, jobPaths):
+        # from now on the JobRemoved of jobPaths is kept until it is read
+        with self._lock:
+            for jobPath in jobPaths:
+                unclaimed = self._unclaimedJobs.pop(jobPath, None)
+                if unclaimed is not None:
+                    self._finishedJobs[jobPath] = unclaimed[0]
+                else:
+                    self._pendingJobs.add(jobPath)
+
+    def _callMany(self, messages: list) -> list:
+        # Pipeline all calls on the shared connection and then collect the
+        # replies, instead of paying one round trip per call. Failed calls
+        # are reported as None.
+        replies = self._exchange(messages)
+        return [None if reply.header.message_type == MessageType.error else reply.body
+                for reply in replies]
+
+    def _exchange(self, messages: list) -> list:
+        if not recorder.enabled:
+            return self._exchangeLocked(messages)
+        start = time.perf_counter()
+        replies = self._exchangeLocked(messages)
+        errors = sum(1 for reply in replies if reply.header.message_type == MessageType.error)
+        members = sorted({message.header.fields.get(HeaderFields.member) for message in messages})
+        recorder.record('D-Bus ' + ','.join(members), 'command', start, time.perf_counter() - start,
+                        {'calls': len(messages), 'errors': errors})
+        return replies
+
+    def _exchangeLocked(self, messages: list) -> list:
+        with self._lock:
+            serials = []
+            pending = set()
+            replies = {}
+            queue = iter(messages)
+            while True:
+                # the bus daemon refuses more than 128 outstanding calls per
+                # connection, so keep a bounded window in flight; signals
+                # read in between do not make room in it
+                while len(pending) < self.PIPELINE_DEPTH:
+                    message = next(queue, None)
+                    if message is None:
+                        break
+                    serial = next(self._connection.outgoing_serial)
+                    self._connection.send(message, serial=serial)
+                    serials.append(serial)
+                    pending.add(serial)
+                if not pending:
+                    break
+                incoming = self._connection.receive()
+                replyTo = incoming.header.fields.get(HeaderFields.reply_serial)
+                if replyTo in pending:
+                    pending.discard(replyTo)
+                    replies[replyTo] = incoming
+                else:
+                    self._dispatch(incoming)
+        return [replies[serial] for serial in serials]
+
+    def _call(self, message):
+        reply = self._exchange([message])[0]
+        if reply.header.message_type == MessageType.error:
+            raise DBusErrorResponse(reply)
+        return reply.body
+
+    def _callManager(self, method: str, signature: Union[str, None] = None, body: tuple = ()):
+        return self._call(new_method_call(self._manager, method, signature, body))
+
+    def _waitForJob(self, jobPath: str) -> bool:
+        return self._waitForJobs([jobPath])[jobPath] == 'done'
+
+    def _waitForJobs(self, jobPaths: list) -> dict:
+        # {job path: JobRemoved result}, 'timeout' for jobs still running
+        # after jobTimeout
+        results = {}
+        waiting = set(jobPaths)
+        deadline = time.monotonic() + self.jobTimeout
+        while waiting and time.monotonic() < deadline:
+            with self._lock:
+                for jobPath in list(waiting):
+                    if jobPath in self._finishedJobs:
+                        results[jobPath] = self._finishedJobs.pop(jobPath)
+                        waiting.discard(jobPath)
+                if not waiting:
+                    break
+                try:
+                    self._dispatch(self._connection.receive(timeout=0.1))
+                except TimeoutError:
+                    pass
+        with self._lock:
+            self._pendingJobs -= waiting
+        for jobPath in waiting:
+            results[jobPath] = 'timeout'
+        return results
+
+    @timed('backend')
+    def listUnitFiles(self) -> list:
+        array = {}
+        for path, state in self._callManager('ListUnitFiles')[0]:
+            name = os.path.basename(path)
+            array.setdefault(name, Unit(name, unitTypeOf(name), unitFileState=state))
+        return list(array.values())
+
+    @timed('backend')
+    def listUnits(self) -> list:
+        result = []
+        for name, description, load, active, sub, *_ in self._callManager('ListUnits')[0]:
+            result.append((name, load, active, sub, description))
+        return result
+
+    def _unitPathsFor(self, names: list) -> list:
+        missing = [name for name in names if name not in self._unitPaths]
+        if missing:
+            # GetUnit only knows loaded units, LoadUnit also resolves the rest
+            calls = [new_method_call(self._manager, 'LoadUnit', 's', (name,)) for name in missing]
+            for name, body in zip(missing, self._callMany(calls)):
+                if body is not None:
+                    self._unitPaths[name] = body[0]
+        return [self._unitPaths.get(name) for name in names]
+
+    @timed('backend')
+    def getProperties(self, names: list, properties: tuple = DETAIL_PROPERTIES) -> dict:
+        if not names:
+            return {}
+        paths = self._unitPathsFor(names)
+        resolved = [(name, path) for name, path in zip(names, paths) if path]
+        # an empty interface name makes systemd return the properties of all
+        # interfaces (Unit, Service, Timer, ...) in one reply
+        calls = [new_method_call(DBusAddress(path, bus_name=self.SERVICE,
+                                             interface='org.freedesktop.DBus.Properties'),
+                                 'GetAll', 's', ('',))
+                 for _, path in resolved]
+        result = {}
+        for (name, _), body in zip(resolved, self._callMany(calls)):
+            if body is None:
+                # the unit object was garbage collected, look it up again next time
+                self._unitPaths.pop(name, None)
+                continue
+            values = body[0]
+            result[name] = {key: formatDBusValue(*values[key]) if key in values else ''
+                            for key in properties}
+        return result
+
+    def _runJob(self, method: str, name: str) -> bool:
+        try:
+            jobPath = self._callManager(method, 'ss', (name, 'replace'))[0]
+        except DBusErrorResponse:
+            return False
+        self._trackJobs([jobPath])
+        return self._waitForJob(jobPath)
+
+    def startUnit(self, name: str) -> bool:
+        return self._runJob('StartUnit', name)
+
+    def stopUnit(self, name: str) -> bool:
+        return self._runJob('StopUnit', name)
+
+    def enableUnit(self, name: str) -> bool:
+        try:
+            self._callManager('EnableUnitFiles', 'asbb', ([name], False, False))
+            self._callManager('Reload')
+        except DBusErrorResponse:
+            return False
+        return True
+
+    def disableUnit(self, name: str) -> bool:
+        try:
+            self._callManager('DisableUnitFiles', 'asb', ([name], False))
+            self._callManager('Reload')
+        except DBusErrorResponse:
+            return False
+        return True
+
+    @timed('backend')
+    def bulkAction(self, action: str, names: list) -> dict:
+        if action not in BULK_ACTIONS:
+            raise ValueError(f'unknown action: {action}')
+        if not names:
+            return {}
+        if action in ('enable', 'disable'):
+            # unit file changes take the whole list in one call
+            error = ''
+            try:
+                if action == 'enable':
+                    self._callManager('EnableUnitFiles', 'asbb', (names, False, False))
+                else:
+                    self._callManager('DisableUnitFiles', 'asb', (names, False))
+                self._callManager('Reload')
+            except DBusErrorResponse as e:
+                error = str(e)
+            states = self.getProperties(names, ('UnitFileState',))
+            result = {}
+            for name in names:
+                values = states.get(name, {})
+                succeeded = actionSucceeded(action, values)
+                result[name] = (succeeded, values.get('UnitFileState', '') if succeeded
+                                else error or f'{action} failed')
+            return result
+
+        # queue every job in one pipelined batch, then wait for the JobRemoved
+        # signals of all of them together
+        method = {'start': 'StartUnit', 'stop': 'StopUnit', 'restart': 'RestartUnit'}[action]
+        calls = [new_method_call(self._manager, method, 'ss', (name, 'replace')) for name in names]
+        result = {}
+        jobs = {}
+        for name, reply in zip(names, self._exchange(calls)):
+            if reply.header.message_type == MessageType.error:
+                result[name] = (False, str(DBusErrorResponse(reply)))
+            else:
+                jobs[name] = reply.body[0]
+        self._trackJobs(jobs.values())
+        finished = self._waitForJobs(list(jobs.values()))
+        for name, jobPath in jobs.items():
+            result[name] = (finished[jobPath] == 'done', finished[jobPath])
+        return result
+
+    @timed('backend')
+    def enqueueJobs(self, action: str, names: list) -> tuple:
+        if action not in JOB_ACTIONS:
+            return super().enqueueJobs(action, names)
+        method = {'start': 'StartUnit', 'stop': 'StopUnit', 'restart': 'RestartUnit'}[action]
+        calls = [new_method_call(self._manager, method, 'ss', (name, 'replace')) for name in names]
+        queued = {}
+        failed = {}
+        for name, reply in zip(names, self._exchange(calls)):
+            if reply.header.message_type == MessageType.error:
+                failed[name] = (False, str(DBusErrorResponse(reply)))
+            else:
+                queued[name] = reply.body[0]
+        self._trackJobs(queued.values())
+        return queued, failed
+
+    @timed('backend')
+    def jobResults(self, jobs: dict) -> dict:
+        # JobRemoved signals are collected while calls wait for replies,
+        # whatever else arrived since is read without blocking
+        with self._lock:
+            while True:
+                try:
+                    self._dispatch(self._connection.receive(timeout=0))
+                except TimeoutError:
+                    break
+            finished = {name: self._finishedJobs.pop(jobPath) for name, (_, jobPath) in jobs.items()
+                        if jobPath in self._finishedJobs}
+        return {name: (result == 'done', result) for name, result in finished.items()}
+
+    def cancelJob(self, name: str, jobId) -> bool:
+        job = DBusAddress(jobId, bus_name=self.SERVICE, interface='org.freedesktop.systemd1.Job')
+        try:
+            self._call(new_method_call(job, 'Cancel'))
+        except DBusErrorResponse:
+            return False
+        return True
+
+
+@timed('backend')
+def loadUnits(backend: Backend) -> list:
+    # Every unit file joined with the runtime state of every loaded unit, plus
+    # the loaded units without a unit file (devices, scopes, transient units);
+    # two bulk queries whatever the number of units
+    units = {unit.name: unit for unit in backend.listUnitFiles()}
+    for name, load, active, sub, description in backend.listUnits():
+        unit = units.get(name)
+        if unit is None:
+            units[name] = Unit(name, unitTypeOf(name), description, '', load, active, sub)
+        else:
+            unit.description = description
+            unit.loadState = sys.intern(load)
+            unit.activeState = sys.intern(active)
+            unit.subState = sys.intern(sub)
+    return sorted(units.values(), key=lambda x: x.name)
+
+
+def createBackend(kind: Union[str, None] = None) -> Backend:
+    # SYSTEMDGUI_BACKEND=subprocess|dbus forces a backend, otherwise D-Bus is
+    # used whenever jeepney is installed and the system bus is reachable
+    kind = kind or os.environ.get('SYSTEMDGUI_BACKEND', '')
+    if kind == 'subprocess':
+        return SubprocessBackend()
+    try:
+        return DBusBackend(os.environ.get('SYSTEMDGUI_BUS', 'SYSTEM'))
+    except Exception:
+        if kind == 'dbus':
+            raise
+        return SubprocessBackend()
@@ -0,0 +1,69 @@
+# This Python file uses the following encoding: utf-8
+# Measures what sampling the cgroups of many units costs, against a fake
+# cgroup v2 tree written by fake_systemd.generateCgroupTree:
+#
+#     python benchmarks/cgroup_sampling.py --units 2000 --samples 20
+#
+# Prints the CPU time of one sample of all units with and without the files
+# kept open, checks the computed rates against the counters written, and
+# how the ring buffers hold up after more samples than they keep.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from cgroups import HISTORY_LENGTH, CgroupSampler
+from fake_systemd import generateCgroupTree, unitNumber
+
+
+def measure(sampler: CgroupSampler, samples: int) -> float:
+    # CPU time per sample in milliseconds
+    sampler.sample()
+    start = time.process_time()
+    for _ in range(samples):
+        sampler.sample()
+    return (time.process_time() - start) / samples * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--units', type=int, default=2000)
+    parser.add_argument('--samples', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between samples in the GUI')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='cgroups') as root:
+        cgroups = generateCgroupTree(root, arguments.units)
+        print(f'{len(cgroups)} units with a cgroup')
+        for keepOpen in (True, False):
+            sampler = CgroupSampler(root)
+            if not keepOpen:
+                sampler.openFileBudget = 0
+            sampler.setUnits(cgroups)
+            perSample = measure(sampler, arguments.samples)
+            print(f'{"kept open" if keepOpen else "reopened":10} {perSample:7.2f} ms per sample, '
+                  f'{perSample / arguments.interval / 10:.2f} % of a core at one sample every '
+                  f'{arguments.interval:g} s')
+            sampler.close()
+
+        # the counters move by a known amount per tick
+        sampler = CgroupSampler(root)
+        sampler.setUnits(cgroups)
+        sampler.sample()
+        start = time.monotonic()
+        time.sleep(0.2)
+        generateCgroupTree(root, arguments.units, tick=1)
+        rows = sampler.sample()
+        elapsed = time.monotonic() - start
+        wrong = [row[0] for row in rows
+                 if abs(row[1] - unitNumber(row[0]) % 13 * 7000 / 1e4 / elapsed) > 0.5]
+        print(f'{len(rows)} rows, {len(wrong)} with an unexpected CPU rate')
+        for _ in range(HISTORY_LENGTH + 5):
+            rows = sampler.sample()
+        print(f'history after {HISTORY_LENGTH + 7} samples: {len(rows[0][5].values())} values')
+        sampler.close()
@@ -0,0 +1,109 @@
+# This Python file uses the following encoding: utf-8
+# Times the subprocess and D-Bus backends on the same operations.
+#
+#     python benchmarks/compare_backends.py              # against the running systemd
+#     python benchmarks/compare_backends.py --mock 5000  # D-Bus backend against a
+#                                                        # mock systemd1 on a private bus
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import DBusBackend, SubprocessBackend
+
+
+def timeIt(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def runSuite(backend, repeat: int, batch: int) -> dict:
+    units = backend.listUnitFiles()
+    names = [unit.name for unit in units]
+    result = {'units': len(names)}
+    result['listUnitFiles'] = min(timeIt(backend.listUnitFiles) for _ in range(repeat))
+    result['listUnits'] = min(timeIt(backend.listUnits) for _ in range(repeat))
+    result['getProperties(1)'] = min(timeIt(backend.getProperties, names[:1]) for _ in range(repeat))
+    result[f'getProperties({batch})'] = min(timeIt(backend.getProperties, names[:batch])
+                                            for _ in range(repeat))
+    return result
+
+
+def startPrivateBus(directory: str) -> tuple:
+    socket = os.path.join(directory, 'bus')
+    config = os.path.join(directory, 'bus.conf')
+    with open(config, 'w') as f:
+        f.write(f'''<!DOCTYPE busconfig PUBLIC "-//freedesktop//DTD D-Bus Bus Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/dbus/1.0/busconfig.dtd">
+<busconfig>
+  <type>session</type>
+  <listen>unix:path={socket}</listen>
+  <auth>EXTERNAL</auth>
+  <policy context="default">
+    <allow send_destination="*" eavesdrop="true"/>
+    <allow eavesdrop="true"/>
+    <allow own="*"/>
+  </policy>
+</busconfig>
+''')
+    daemon = subprocess.Popen(['dbus-daemon', '--nofork', '--print-address', f'--config-file={config}'],
+                              stdout=subprocess.PIPE, text=True)
+    address = daemon.stdout.readline().strip()
+    return daemon, address
+
+
+def runMock(count: int, repeat: int, batch: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        daemon, address = startPrivateBus(directory)
+        mockScript = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_systemd1.py')
+        mock = subprocess.Popen([sys.executable, mockScript, '--bus', address, '--units', str(count)],
+                                stdout=subprocess.PIPE, text=True)
+        try:
+            mock.stdout.readline()
+            backend = DBusBackend(address)
+            try:
+                return {'dbus': runSuite(backend, repeat, batch)}
+            finally:
+                backend.close()
+        finally:
+            mock.terminate()
+            daemon.terminate()
+            mock.wait()
+            daemon.wait()
+
+
+def runLive(repeat: int, batch: int) -> dict:
+    results = {'subprocess': runSuite(SubprocessBackend(), repeat, batch)}
+    backend = DBusBackend()
+    try:
+        results['dbus'] = runSuite(backend, repeat, batch)
+    finally:
+        backend.close()
+    return results
+
+
+def printResults(results: dict):
+    names = list(results)
+    keys = [key for key in results[names[0]] if key != 'units']
+    print(f"{'operation':<24}" + ''.join(f'{name:>14}' for name in names))
+    print(f"{'units':<24}" + ''.join(f"{results[name]['units']:>14}" for name in names))
+    for key in keys:
+        print(f'{key:<24}' + ''.join(f'{results[name][key] * 1000:>12.2f}ms' for name in names))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mock', type=int, metavar='UNITS',
+                        help='benchmark the D-Bus backend against a mock systemd1 with UNITS units')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--batch', type=int, default=200)
+    args = parser.parse_args()
+    if args.mock:
+        printResults(runMock(args.mock, args.repeat, args.batch))
+    else:
+        printResults(runLive(args.repeat, args.batch))
@@ -0,0 +1,497 @@
+# This Python file uses the following encoding: utf-8
+# A stand-in for systemctl and journalctl that serves a synthetic set of
+# units, for benchmarking the GUI without a real systemd:
+#
+#     python benchmarks/fake_systemd.py systemctl list-unit-files --no-legend
+#     python benchmarks/fake_systemd.py journalctl -f -o json -u foo.service
+#     python benchmarks/fake_systemd.py systemd-analyze blame
+#     python benchmarks/fake_systemd.py systemd-analyze verify ROOT/usr/lib/systemd/system/*.service
+#
+# Everything is derived from the unit number, so no state is kept between
+# calls. Configured through the environment:
+#
+#     FAKE_SYSTEMD_UNITS       number of units (default 1000)
+#     FAKE_SYSTEMD_ROOT        directory written by generateUnitTree(), unit
+#                              files are reported under ROOT/usr/lib/systemd/system
+#                              and need a daemon-reload once they are newer
+#                              than ROOT/loaded
+#     FAKE_SYSTEMD_LATENCY_MS  extra delay per invocation
+#     FAKE_SYSTEMD_JOB_MS      how long a --no-block job takes (default 0);
+#                              jobs and the states they leave are kept in
+#                              ROOT/jobs.json, so this needs FAKE_SYSTEMD_ROOT
+#     FAKE_SYSTEMD_VERIFY_MS   how long systemd-analyze verify takes per file
+#                              (default 2)
+#     FAKE_SYSTEMD_SPAWN_LOG   file that gets one line per invocation
+#     FAKE_JOURNAL_RATE        lines per second written by journalctl -f
+#
+# FakeRunner plugs it into a targets.Target as a stand-in machine.
+import fcntl
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+WORDS = ('systemd', 'network', 'user', 'session', 'getty', 'dbus', 'docker', 'worker', 'cron',
+         'journal', 'udev', 'login', 'nginx', 'postgres', 'backup', 'mount', 'swap', 'tmp')
+TYPES = ('service', 'socket', 'timer', 'mount', 'target', 'path', 'slice')
+UNIT_DIRECTORY = os.path.join('usr', 'lib', 'systemd', 'system')
+# the fake boot takes this long, in microseconds
+BOOT_SPAN = 10000000
+# generated unit files date from long before boot, like packaged ones
+PACKAGE_MTIME = 1700000000
+# the keys systemd-analyze verify knows in the type specific sections
+KNOWN_KEYS = {'Type', 'ExecStart', 'ExecStop', 'Environment', 'Restart', 'User', 'MemoryMax', 'Nice',
+              'TasksMax', 'OnCalendar', 'Persistent', 'ListenStream', 'What', 'Where', 'PathExists'}
+
+
+def unitName(number: int) -> str:
+    first = WORDS[number % len(WORDS)]
+    second = WORDS[(number * 7 + 3) % len(WORDS)]
+    return f'{first}-{second}-{number}.{TYPES[number % len(TYPES)]}'
+
+
+def unitNumber(name: str) -> int:
+    try:
+        return int(name.rpartition('.')[0].rpartition('-')[2])
+    except ValueError:
+        return -1
+
+
+def bootTimes(number: int, count: int) -> tuple:
+    # when the unit began activating and how long that took, in microseconds
+    started = 500000 + (number * 2654435761 % 1000) * (BOOT_SPAN // 1000)
+    return started, (number * 37 % 500) * 1000 + 1000
+
+
+class JobTable:
+    # The --no-block jobs of the fake systemd and the states finished jobs
+    # left behind, shared by all invocations through ROOT/jobs.json
+    def __init__(self, root: str):
+        self.path = os.path.join(root, 'jobs.json')
+        self._lock = open(self.path + '.lock', 'a')
+        fcntl.flock(self._lock, fcntl.LOCK_EX)
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.nextId = data.get('nextId', 1)
+        self.jobs = data.get('jobs', {})
+        self.states = data.get('states', {})
+        # jobs past their time are done
+        now = time.time()
+        for jobId, (unit, action, finish) in list(self.jobs.items()):
+            if finish <= now:
+                self.states[unit] = 'inactive' if action == 'stop' else 'active'
+                del self.jobs[jobId]
+
+    def add(self, unit: str, action: str, seconds: float):
+        # a new job for a unit replaces the one it has
+        for jobId, job in list(self.jobs.items()):
+            if job[0] == unit:
+                del self.jobs[jobId]
+        self.jobs[str(self.nextId)] = (unit, action, time.time() + seconds)
+        self.nextId += 1
+
+    def close(self):
+        temporary = f'{self.path}.{os.getpid()}'
+        with open(temporary, 'w') as f:
+            json.dump({'nextId': self.nextId, 'jobs': self.jobs, 'states': self.states}, f)
+        os.replace(temporary, self.path)
+        self._lock.close()
+
+
+_activeStates = {}
+
+
+def activeStates(root: str) -> dict:
+    # the states finished jobs left, read once per invocation
+    if root not in _activeStates:
+        try:
+            with open(os.path.join(root, 'jobs.json')) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        states = data.get('states', {})
+        now = time.time()
+        for unit, action, finish in data.get('jobs', {}).values():
+            if finish <= now:
+                states[unit] = 'inactive' if action == 'stop' else 'active'
+        _activeStates[root] = states
+    return _activeStates[root]
+
+
+def unitRecord(number: int, count: int, root: str = '') -> dict:
+    name = unitName(number)
+    active = number % 5 != 0
+    state = activeStates(root).get(name) if root else None
+    if state is not None:
+        active = state == 'active'
+    wants = [unitName(target) for target in (number * 3 + 1, number * 5 + 2) if target < count]
+    started, took = bootTimes(number, count)
+    failed = number % 50 == 0
+    return {
+        'Id': name,
+        'Description': f'{WORDS[number % len(WORDS)].title()} helper number {number}',
+        'LoadState': 'loaded',
+        'ActiveState': 'active' if active else ('failed' if number % 50 == 0 else 'inactive'),
+        'SubState': ('running' if number % 2 else 'exited') if active else 'dead',
+        'UnitFileState': ('enabled', 'disabled', 'static', 'enabled')[number % 4],
+        'FragmentPath': os.path.join(root, UNIT_DIRECTORY, name) if root else f'/usr/lib/systemd/system/{name}',
+        'After': ' '.join(['basic.target'] + wants),
+        'Before': 'shutdown.target',
+        'Requires': unitName(number // 2) if number > 1 and number % 3 == 0 else '',
+        'Wants': ' '.join(wants),
+        'Conflicts': 'shutdown.target',
+        'InactiveExitTimestampMonotonic': started if active or failed else 0,
+        'ActiveEnterTimestampMonotonic': started + took if active else 0,
+        'ActiveExitTimestampMonotonic': 0,
+        'InactiveEnterTimestampMonotonic': started + took if failed else 0,
+        'ControlGroup': f'/system.slice/{name}' if active else '',
+    }
+
+
+def unitFileText(record: dict) -> str:
+    lines = ['[Unit]', f'Description={record["Description"]}', f'After={record["After"]}']
+    if record['Wants']:
+        lines.append(f'Wants={record["Wants"]}')
+    if record['Requires']:
+        lines.append(f'Requires={record["Requires"]}')
+    unitType = record['Id'].rpartition('.')[2]
+    if unitType == 'service':
+        lines += ['', '[Service]', 'Type=simple', 'ExecStart=/usr/bin/sleep infinity',
+                  'Environment=MODE=benchmark \\', '    LEVEL=3', 'Restart=on-failure']
+    elif unitType == 'timer':
+        lines += ['', '[Timer]', 'OnCalendar=hourly', 'Persistent=true']
+    elif unitType == 'socket':
+        lines += ['', '[Socket]', f'ListenStream=/run/{record["Id"]}.sock']
+    lines += ['', '[Install]', 'WantedBy=multi-user.target', '']
+    return '\n'.join(lines)
+
+
+def loadedStamp(root: str) -> str:
+    # touched when the tree is generated and by daemon-reload
+    return os.path.join(root, 'loaded')
+
+
+def needDaemonReload(record: dict, root: str) -> str:
+    try:
+        loaded = os.stat(loadedStamp(root)).st_mtime_ns
+        paths = [record['FragmentPath']]
+        dropIns = record['FragmentPath'] + '.d'
+        if os.path.isdir(dropIns):
+            paths += [os.path.join(dropIns, name) for name in os.listdir(dropIns)]
+        return 'yes' if any(os.stat(path).st_mtime_ns > loaded for path in paths) else 'no'
+    except OSError:
+        return 'no'
+
+
+def touch(path: str):
+    with open(path, 'a'):
+        pass
+    os.utime(path)
+
+
+def generateUnitTree(root: str, count: int):
+    # one unit file per unit, with a drop-in directory next to every tenth
+    directory = os.path.join(root, UNIT_DIRECTORY)
+    os.makedirs(directory, exist_ok=True)
+    for number in range(count):
+        record = unitRecord(number, count, root)
+        path = os.path.join(directory, record['Id'])
+        with open(path, 'w') as f:
+            f.write(unitFileText(record))
+        os.utime(path, (PACKAGE_MTIME, PACKAGE_MTIME))
+        if number % 10 == 0:
+            dropIns = os.path.join(directory, record['Id'] + '.d')
+            os.makedirs(dropIns, exist_ok=True)
+            path = os.path.join(dropIns, 'override.conf')
+            with open(path, 'w') as f:
+                if record['Id'].endswith('.service'):
+                    f.write('[Service]\nEnvironment=\nEnvironment=OVERRIDDEN=1\n')
+                else:
+                    f.write('[Unit]\nDocumentation=man:overridden(1)\n')
+            os.utime(path, (PACKAGE_MTIME, PACKAGE_MTIME))
+    touch(loadedStamp(root))
+
+
+def writeCgroupFiles(directory: str, number: int, tick: int):
+    # the accounting files of one unit after `tick` samples, growing at a
+    # rate that depends on the unit
+    files = {
+        'cpu.stat': f'usage_usec {tick * (number % 13) * 7000}\nuser_usec 0\nsystem_usec 0\n',
+        'memory.current': f'{(number % 40 + 1) * 1048576 + tick * (number % 3) * 4096}\n',
+        'io.stat': f'8:0 rbytes={tick * (number % 7) * 512} wbytes={tick * 1024} rios=1 wios=1 dbytes=0 dios=0\n',
+        'pids.current': f'{number % 9 + 1}\n',
+    }
+    for file, text in files.items():
+        with open(os.path.join(directory, file), 'w') as f:
+            f.write(text)
+
+
+def generateCgroupTree(root: str, count: int, tick: int = 0) -> dict:
+    # a cgroup v2 hierarchy under root for the active units; call again with
+    # the next tick to make the counters move. {unit: cgroup path}
+    open(os.path.join(root, 'cgroup.controllers'), 'a').close()
+    cgroups = {}
+    for number in range(count):
+        record = unitRecord(number, count)
+        if not record['ControlGroup']:
+            continue
+        path = record['ControlGroup'].lstrip('/')
+        directory = os.path.join(root, path)
+        os.makedirs(directory, exist_ok=True)
+        writeCgroupFiles(directory, number, tick)
+        cgroups[record['Id']] = path
+    return cgroups
+
+
+def systemctl(args: list, count: int, root: str) -> int:
+    options = [arg for arg in args if arg.startswith('-')]
+    positional = [arg for arg in args if not arg.startswith('-')]
+    command = positional[0] if positional else 'list-units'
+    out = sys.stdout
+
+    if command == 'list-unit-files':
+        for number in range(count):
+            record = unitRecord(number, count, root)
+            out.write(f'{record["Id"]} {record["UnitFileState"]} enabled\n')
+        return 0
+    if command == 'list-units':
+        for number in range(count):
+            record = unitRecord(number, count, root)
+            out.write(f'{record["Id"]} {record["LoadState"]} {record["ActiveState"]} '
+                      f'{record["SubState"]} {record["Description"]}\n')
+        return 0
+    if command == 'list-timers':
+        # every active timer elapses every 10 to 60 seconds, on the dot
+        now = int(time.time())
+        timers = []
+        for number in range(count):
+            record = unitRecord(number, count, root)
+            if not record['Id'].endswith('.timer'):
+                continue
+            period = (number % 6 + 1) * 10
+            elapse = (now // period + 1) * period if record['ActiveState'] == 'active' else 0
+            timers.append({'next': elapse * 1000000, 'left': (elapse - now) * 1000000 if elapse else None,
+                           'last': (elapse - period) * 1000000 if elapse else None,
+                           'passed': (now - elapse + period) * 1000000 if elapse else None,
+                           'unit': record['Id'], 'activates': record['Id'].rpartition('.')[0] + '.service'})
+        out.write(json.dumps(timers) + '\n')
+        return 0
+    if command == 'show':
+        properties = None
+        for i, arg in enumerate(args):
+            if arg == '-p' and i + 1 < len(args):
+                properties = args[i + 1].split(',')
+        names = args[args.index('--') + 1:] if '--' in args else positional[1:]
+        blocks = []
+        for name in names:
+            number = unitNumber(name)
+            if 0 <= number < count:
+                record = unitRecord(number, count, root)
+            else:
+                record = {'Id': name, 'LoadState': 'not-found', 'ActiveState': 'inactive',
+                          'SubState': 'dead'}
+            keys = properties or list(record)
+            if 'NeedDaemonReload' in keys and root and record['LoadState'] == 'loaded':
+                record['NeedDaemonReload'] = needDaemonReload(record, root)
+            blocks.append('\n'.join(f'{key}={record.get(key, "")}' for key in keys))
+        out.write('\n\n'.join(blocks) + '\n')
+        return 0
+    if command == 'daemon-reload':
+        if root:
+            touch(loadedStamp(root))
+        return 0
+    if command == 'list-jobs':
+        if root:
+            table = JobTable(root)
+            for jobId, (unit, action, _) in sorted(table.jobs.items(), key=lambda item: int(item[0])):
+                out.write(f'{jobId} {unit} {action} running\n')
+            table.close()
+        return 0
+    if command == 'cancel':
+        if not root:
+            return 1
+        table = JobTable(root)
+        missing = [jobId for jobId in positional[1:] if table.jobs.pop(jobId, None) is None]
+        table.close()
+        for jobId in missing:
+            sys.stderr.write(f'Job {jobId} not found.\n')
+        return 1 if missing else 0
+    if command in ('start', 'stop', 'restart') and root:
+        names = positional[1:]
+        missing = [name for name in names if not 0 <= unitNumber(name) < count]
+        for name in missing:
+            sys.stderr.write(f'Failed to {command} {name}: Unit {name} not found.\n')
+        table = JobTable(root)
+        seconds = float(os.environ.get('FAKE_SYSTEMD_JOB_MS', '0')) / 1000
+        for name in names:
+            if name not in missing:
+                table.add(name, command, seconds if '--no-block' in options else 0)
+        table.close()
+        # without --no-block systemctl waits for the jobs
+        if '--no-block' not in options:
+            time.sleep(seconds)
+        return 1 if missing else 0
+    if command in ('start', 'stop', 'restart', 'enable', 'disable'):
+        names = positional[1:]
+        missing = [name for name in names if not 0 <= unitNumber(name) < count]
+        for name in missing:
+            sys.stderr.write(f'Failed to {command} {name}: Unit {name} not found.\n')
+        return 1 if missing else 0
+    sys.stderr.write(f'fake systemctl: unsupported command {command} {options}\n')
+    return 1
+
+
+def formatTimespan(microseconds: int) -> str:
+    if microseconds >= 1000000:
+        return f'{microseconds / 1000000:.3f}s'
+    return f'{microseconds // 1000}ms'
+
+
+def systemdAnalyze(args: list, count: int) -> int:
+    positional = [arg for arg in args if not arg.startswith('-')]
+    command = positional[0] if positional else 'time'
+    active = [number for number in range(count) if number % 5 != 0]
+    if command == 'blame':
+        times = sorted(((bootTimes(number, count)[1], unitName(number)) for number in active), reverse=True)
+        sys.stdout.write(''.join(f'{formatTimespan(took):>10} {name}\n' for took, name in times))
+        return 0
+    if command == 'critical-chain':
+        # the three units that became active last, each waiting for the next
+        last = sorted(active, key=lambda number: sum(bootTimes(number, count)), reverse=True)[:3]
+        finished = BOOT_SPAN + 600000
+        lines = ['The time when unit became active or started is printed after the "@" character.',
+                 'The time the unit took to start is printed after the "+" character.', '',
+                 f'graphical.target @{formatTimespan(finished)}',
+                 f'└─multi-user.target @{formatTimespan(finished)}']
+        for depth, number in enumerate(last, 1):
+            started, took = bootTimes(number, count)
+            lines.append(f'{"  " * depth}└─{unitName(number)} @{formatTimespan(started)} '
+                         f'+{formatTimespan(took)}')
+        sys.stdout.write('\n'.join(lines) + '\n')
+        return 0
+    if command == 'verify':
+        return verify(positional[1:])
+    sys.stderr.write(f'fake systemd-analyze: unsupported command {command}\n')
+    return 1
+
+
+def verify(paths: list) -> int:
+    # unknown keys in the type specific sections and services without
+    # ExecStart, in the words of systemd-analyze
+    failed = False
+    for path in paths:
+        time.sleep(float(os.environ.get('FAKE_SYSTEMD_VERIFY_MS', '2')) / 1000)
+        name = os.path.basename(path)
+        try:
+            with open(path) as f:
+                lines = f.read().split('\n')
+        except OSError as error:
+            sys.stderr.write(f'Failed to prepare filename {path}: {error.strerror}\n')
+            failed = True
+            continue
+        section = ''
+        keys = set()
+        continued = False
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if continued:
+                continued = line.endswith('\\')
+                continue
+            continued = line.endswith('\\')
+            if line.startswith('['):
+                section = line[1:-1]
+            elif '=' in line and section not in ('Unit', 'Install'):
+                key = line.partition('=')[0].strip()
+                keys.add(key)
+                if key not in KNOWN_KEYS:
+                    sys.stderr.write(f"{path}:{number}: Unknown key name '{key}' in section '{section}', "
+                                     f"ignoring.\n")
+        if name.endswith('.service') and 'ExecStart' not in keys:
+            sys.stderr.write(f'{name}: Service has no ExecStart=, ExecStop=, or SuccessAction=. Refusing.\n')
+            failed = True
+    return 1 if failed else 0
+
+
+class FakeRunner:
+    # A runner for targets.Target: answers every systemctl call with this
+    # script in a child process after latency seconds, and fails a share of
+    # the calls the way an unreachable host does
+    def __init__(self, units: int = 1000, latency: float = 0.0, failureRate: float = 0.0, seed: int = 0,
+                 root: str = ''):
+        self.units = units
+        self.latency = latency
+        self.failureRate = failureRate
+        self.root = root
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, argv: list, timeout=None, stderr=None) -> subprocess.CompletedProcess:
+        with self._lock:
+            failing = self._random.random() < self.failureRate
+        if failing:
+            if timeout is not None and self.latency > timeout:
+                time.sleep(timeout)
+                raise subprocess.TimeoutExpired(argv, timeout)
+            time.sleep(self.latency)
+            return subprocess.CompletedProcess(argv, 1, b'', b'Failed to connect to bus: Host is down\n'
+                                               if stderr == subprocess.PIPE else None)
+        env = dict(os.environ, FAKE_SYSTEMD_UNITS=str(self.units), FAKE_SYSTEMD_ROOT=self.root,
+                   FAKE_SYSTEMD_LATENCY_MS=str(self.latency * 1000))
+        tool = 'systemd-analyze' if os.path.basename(argv[0]) == 'systemd-analyze' else 'systemctl'
+        return subprocess.run([sys.executable, os.path.abspath(__file__), tool, *argv[1:]],
+                              stdout=subprocess.PIPE, stderr=stderr, env=env, timeout=timeout)
+
+
+def journalctl(args: list, count: int) -> int:
+    unit = args[args.index('-u') + 1] if '-u' in args else 'fake.service'
+    backlog = int(args[args.index('-n') + 1]) if '-n' in args else 100
+    rate = float(os.environ.get('FAKE_JOURNAL_RATE', '1000'))
+    identifier = unit.rpartition('.')[0]
+    line = 0
+
+    def write(lines: int):
+        nonlocal line
+        records = []
+        for _ in range(lines):
+            line += 1
+            records.append(json.dumps({
+                '__REALTIME_TIMESTAMP': str(int(time.time() * 1000000)),
+                'PRIORITY': str((3, 4, 6, 6, 6, 7)[line % 6]),
+                'SYSLOG_IDENTIFIER': identifier,
+                '_PID': str(1000 + unitNumber(unit) % 30000),
+                'MESSAGE': f'{identifier}: handled request {line} in {line % 97} ms',
+            }))
+        sys.stdout.write('\n'.join(records) + '\n')
+        sys.stdout.flush()
+
+    write(backlog)
+    if '-f' not in args:
+        return 0
+    while True:
+        # bursts ten times a second, like a busy service
+        time.sleep(0.1)
+        write(max(1, int(rate / 10)))
+
+
+if __name__ == "__main__":
+    tool = sys.argv[1] if len(sys.argv) > 1 else 'systemctl'
+    spawnLog = os.environ.get('FAKE_SYSTEMD_SPAWN_LOG')
+    if spawnLog:
+        with open(spawnLog, 'a') as f:
+            f.write(' '.join([tool] + sys.argv[2:3]) + '\n')
+    time.sleep(float(os.environ.get('FAKE_SYSTEMD_LATENCY_MS', '0')) / 1000)
+    unitCount = int(os.environ.get('FAKE_SYSTEMD_UNITS', '1000'))
+    try:
+        if tool == 'journalctl':
+            sys.exit(journalctl(sys.argv[2:], unitCount))
+        if tool == 'systemd-analyze':
+            sys.exit(systemdAnalyze(sys.argv[2:], unitCount))
+        sys.exit(systemctl(sys.argv[2:], unitCount, os.environ.get('FAKE_SYSTEMD_ROOT', '')))
+    except (BrokenPipeError, KeyboardInterrupt):
+        sys.exit(0)
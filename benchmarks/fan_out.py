@@ -0,0 +1,99 @@
+# This Python file uses the following encoding: utf-8
+# Runs the multi-target backend against stand-in machines served by
+# fake_systemd.FakeRunner, with latency, failing calls and targets that never
+# answer in time:
+#
+#     python benchmarks/fan_out.py --targets 24 --parallel 8 --latency 0.2 \
+#         --failures 0.1 --slow 2 --timeout 1
+#
+# Prints the wall time of every operation next to the time the calls would
+# take one after another, the highest number of systemctl calls seen running
+# at once, and the errors of the failed targets.
+import argparse
+import os
+import sys
+import threading
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from backend import loadUnits
+from fake_systemd import FakeRunner, unitName
+from targets import FanOutBackend, Target
+
+
+class CountingRunner:
+    # wraps a runner to count the calls running at the same time over all
+    # targets
+    running = 0
+    peak = 0
+    calls = 0
+    lock = threading.Lock()
+
+    def __init__(self, runner):
+        self.runner = runner
+
+    def __call__(self, argv: list, timeout=None, stderr=None):
+        with CountingRunner.lock:
+            CountingRunner.calls += 1
+            CountingRunner.running += 1
+            CountingRunner.peak = max(CountingRunner.peak, CountingRunner.running)
+        try:
+            return self.runner(argv, timeout, stderr)
+        finally:
+            with CountingRunner.lock:
+                CountingRunner.running -= 1
+
+
+def createTargets(args) -> list:
+    targets = []
+    for i in range(args.targets):
+        slow = i < args.slow
+        runner = FakeRunner(args.units, args.timeout * 2 if slow else args.latency,
+                            1.0 if slow else args.failures, seed=i)
+        targets.append(Target(f'fake{i:02d}', (f'--machine=fake{i:02d}',), CountingRunner(runner), args.timeout))
+    return targets
+
+
+def measure(name: str, fn, *args):
+    CountingRunner.peak = 0
+    CountingRunner.calls = 0
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    except Exception as e:
+        result = e
+    wall = time.perf_counter() - start
+    print(f'{name:18} {wall * 1000:8.0f} ms  {CountingRunner.calls:4d} calls, at most {CountingRunner.peak} '
+          f'at once (one after another: about {CountingRunner.calls * arguments.latency * 1000:.0f} ms)')
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--targets', type=int, default=24)
+    parser.add_argument('--units', type=int, default=500, help='units per target')
+    parser.add_argument('--parallel', type=int, default=8, help='targets queried at once')
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds per systemctl call')
+    parser.add_argument('--failures', type=float, default=0.1, help='share of failing calls')
+    parser.add_argument('--slow', type=int, default=2, help='targets that never answer in time')
+    parser.add_argument('--timeout', type=float, default=1.0, help='seconds per systemctl call')
+    arguments = parser.parse_args()
+
+    backend = FanOutBackend(createTargets(arguments), arguments.parallel)
+    units = measure('load unit list', loadUnits, backend)
+    if isinstance(units, Exception):
+        sys.exit(f'loading failed: {units}')
+    print(f'{len(units)} units')
+    states = measure('unit on all targets', backend.unitStates, unitName(1))
+    for target, properties, error in states:
+        if error:
+            print(f'  {target}: {error}')
+    names = [unitName(number) for number in range(10)] + ['missing.service']
+    results = measure('bulk restart', backend.bulkAction, 'restart', names)
+    for name, (succeeded, detail) in results.items():
+        if not succeeded:
+            print(f'  {name}: {detail[:120]}')
+    backend.close()
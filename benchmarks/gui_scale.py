@@ -0,0 +1,291 @@
+# This Python file uses the following encoding: utf-8
+# Drives widget.py headlessly against the fake systemctl/journalctl of
+# fake_systemd.py at several unit counts and writes a JSON report with the
+# wall time, the number of spawned processes and the peak RSS of every
+# scenario:
+#
+#     python benchmarks/gui_scale.py --units 100,1000,10000,50000 --latency 5 \
+#         --output report.json
+#     python benchmarks/gui_scale.py --units 10000 --baseline report.json
+#
+# Every unit count runs in its own process, so peak RSS is per scale.
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_systemd
+
+REPORT_VERSION = 1
+QUERIES = ('network-user', 'docker', 'postgres-backup-1', 'journ', 'zzz')
+CONTENT_QUERIES = ('ExecStart:/usr/bin/sleep', 'Environment:overridden=1', 'OnCalendar:hourly Persistent:true',
+                   'Service.Restart:', 'LEVEL*')
+SELECTED_ROWS = 20
+TIMEOUT = 120.0
+
+
+def writeFakeTools(binDirectory: str):
+    # systemctl, journalctl and systemd-analyze on PATH, all ending up in
+    # fake_systemd.py
+    script = os.path.join(BENCHMARK_DIR, 'fake_systemd.py')
+    for tool in ('systemctl', 'journalctl', 'systemd-analyze'):
+        path = os.path.join(binDirectory, tool)
+        with open(path, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" {tool} "$@"\n')
+        os.chmod(path, 0o755)
+
+
+def summarize(samples: list, spawns: int) -> dict:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'wall': sum(ordered),
+        'median': statistics.median(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+        'spawns': spawns,
+    }
+
+
+def runScenarios(count: int, root: str, spawnLog: str) -> dict:
+    from PySide6.QtCore import QItemSelectionModel, Qt
+    from PySide6.QtWidgets import QApplication
+
+    import unitfile
+    import widget as gui
+
+    unitfile.UNIT_PATHS = (os.path.join(root, fake_systemd.UNIT_DIRECTORY),)
+    app = QApplication(sys.argv[:1])
+    gui.widget = gui.Widget()
+    gui.connectSignals()
+    gui.widget.resize(900, 740)
+    gui.widget.show()
+    ui = gui.widget.ui
+    executor = gui.widget.executor
+
+    def spawns() -> int:
+        try:
+            with open(spawnLog) as f:
+                return sum(1 for _ in f)
+        except OSError:
+            return 0
+
+    def waitFor(done) -> bool:
+        deadline = time.perf_counter() + TIMEOUT
+        while not done():
+            if time.perf_counter() > deadline:
+                return False
+            app.processEvents()
+            time.sleep(0.001)
+        app.processEvents()
+        return True
+
+    def measure(action, done=lambda: True) -> tuple:
+        before = spawns()
+        start = time.perf_counter()
+        action()
+        completed = waitFor(done)
+        return time.perf_counter() - start, spawns() - before, completed
+
+    results = {}
+    guiTimes = []
+    onUnitsLoaded = gui.onUnitsLoaded
+
+    def timedUnitsLoaded(result):
+        start = time.perf_counter()
+        onUnitsLoaded(result)
+        guiTimes.append(time.perf_counter() - start)
+
+    gui.onUnitsLoaded = timedUnitsLoaded
+
+    # loading the list: the worker part (systemctl, parsing, diff, index)
+    # and the GUI thread part (placing the units into the model)
+    for name in ('load', 'refresh'):
+        wall, spawned, completed = measure(gui.onLoad, lambda: not executor.isBusy('list'))
+        results[name] = {'wall': wall, 'gui': guiTimes[-1] if guiTimes else None,
+                         'spawns': spawned, 'completed': completed}
+    results['rows'] = gui.widget.proxyModel.rowCount()
+
+    samples = []
+    before = spawns()
+    for query in QUERIES:
+        typed = [query[:i] for i in range(1, len(query) + 1)]
+        for text in typed + typed[-2::-1] + ['']:
+            ui.searchBar.blockSignals(True)
+            ui.searchBar.setText(text)
+            ui.searchBar.blockSignals(False)
+            samples.append(measure(gui.onSearchBarChanged)[0])
+    results['search keystroke'] = summarize(samples, spawns() - before)
+
+    # indexing every unit file, then searching their contents
+    wall, spawned, completed = measure(gui.updateContents, lambda: not executor.isBusy('contents'))
+    results['content index'] = {'wall': wall, 'spawns': spawned, 'completed': completed}
+    samples = []
+    before = spawns()
+    gui.widget.contentSearchAction.setChecked(True)
+    for query in CONTENT_QUERIES + ('',):
+        ui.searchBar.blockSignals(True)
+        ui.searchBar.setText(query)
+        ui.searchBar.blockSignals(False)
+        samples.append(measure(gui.onSearchBarChanged)[0])
+    gui.widget.contentSearchAction.setChecked(False)
+    results['content search'] = summarize(samples, spawns() - before)
+
+    samples = []
+    before = spawns()
+    for index in list(range(1, ui.comboBox.count())) + [0]:
+        samples.append(measure(lambda: ui.comboBox.setCurrentIndex(index))[0])
+    results['filter by type'] = summarize(samples, spawns() - before)
+
+    samples = []
+    before = spawns()
+    header = ui.tableView.horizontalHeader()
+    for column in list(range(1, gui.widget.proxyModel.columnCount())) + [0]:
+        for order in (Qt.DescendingOrder, Qt.AscendingOrder):
+            samples.append(measure(lambda: header.setSortIndicator(column, order))[0])
+    results['sort by column'] = summarize(samples, spawns() - before)
+
+    rowCount = gui.widget.proxyModel.rowCount()
+    rows = sorted({row * rowCount // SELECTED_ROWS for row in range(SELECTED_ROWS)}) if rowCount else []
+
+    def selectRow(row: int):
+        index = gui.widget.proxyModel.index(row, 0)
+        ui.tableView.selectionModel().select(index, QItemSelectionModel.ClearAndSelect
+                                             | QItemSelectionModel.Rows)
+
+    for name in ('select row', 'select row (cached)'):
+        samples = []
+        before = spawns()
+        for row in rows:
+            samples.append(measure(lambda: selectRow(row), lambda: not executor.isBusy('selection'))[0])
+        results[name] = summarize(samples, spawns() - before) if samples else None
+
+    if rows:
+        selectRow(rows[len(rows) // 2])
+        waitFor(lambda: not executor.isBusy('selection'))
+        wall, spawned, completed = measure(
+            lambda: ui.detailTabs.setCurrentWidget(ui.dependenciesTab),
+            lambda: gui.widget.dependencyGraph is not None)
+        results['dependency graph'] = {'wall': wall, 'spawns': spawned, 'completed': completed}
+        wall, spawned, completed = measure(
+            lambda: ui.detailTabs.setCurrentWidget(ui.logsTab),
+            lambda: gui.widget.journalView.model.rowCount() > 0)
+        results['first log lines'] = {'wall': wall, 'spawns': spawned, 'completed': completed}
+        gui.widget.journalView.stop()
+        ui.detailTabs.setCurrentIndex(0)
+
+    results['peak rss kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return results
+
+
+def runScale(count: int, latency: float) -> dict:
+    with tempfile.TemporaryDirectory(prefix='systemdgui-bench-') as directory:
+        root = os.path.join(directory, 'root')
+        binDirectory = os.path.join(directory, 'bin')
+        os.makedirs(binDirectory)
+        writeFakeTools(binDirectory)
+        start = time.perf_counter()
+        fake_systemd.generateUnitTree(root, count)
+        generated = time.perf_counter() - start
+
+        env = dict(os.environ)
+        env.update({
+            'PATH': binDirectory + os.pathsep + env.get('PATH', ''),
+            'QT_QPA_PLATFORM': 'offscreen',
+            'SYSTEMDGUI_BACKEND': 'subprocess',
+            'XDG_CACHE_HOME': os.path.join(directory, 'cache'),
+            'FAKE_SYSTEMD_UNITS': str(count),
+            'FAKE_SYSTEMD_ROOT': root,
+            'FAKE_SYSTEMD_LATENCY_MS': str(latency),
+            'FAKE_SYSTEMD_SPAWN_LOG': os.path.join(directory, 'spawns.log'),
+        })
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', '--units', str(count),
+                                '--root', root], env=env, stdout=subprocess.PIPE, text=True)
+        if child.returncode != 0:
+            raise RuntimeError(f'benchmark for {count} units failed with exit code {child.returncode}')
+        results = json.loads(child.stdout.strip().split('\n')[-1])
+        results['unit tree generation'] = generated
+        return results
+
+
+def gitRevision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def wallTime(result) -> float:
+    # repeated operations are compared by their median
+    if isinstance(result, dict):
+        return result.get('median', result.get('wall')) or 0.0
+    return 0.0
+
+
+def printReport(report: dict, baseline: dict = None, threshold: float = 1.2):
+    previous = {}
+    if baseline is not None:
+        previous = {scale['units']: scale['results'] for scale in baseline.get('scales', [])}
+    for scale in report['scales']:
+        print(f"{scale['units']} units, peak RSS {scale['results']['peak rss kb'] / 1024:.0f} MB")
+        old = previous.get(scale['units'], {})
+        for name, result in scale['results'].items():
+            if not isinstance(result, dict):
+                continue
+            line = f"  {name:22} {wallTime(result) * 1000:10.1f} ms {result.get('spawns', 0):6d} spawns"
+            if 'p95' in result:
+                line += f"  (median of {result['count']}, p95 {result['p95'] * 1000:.1f} ms)"
+            if name in old and wallTime(old[name]):
+                ratio = wallTime(result) / wallTime(old[name])
+                line += f'   x{ratio:.2f}' + ('  REGRESSION' if ratio > threshold else '')
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--units', default='100,1000,10000,50000',
+                        help='comma separated unit counts')
+    parser.add_argument('--latency', type=float, default=0.0, help='extra ms per systemctl call')
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--baseline', help='JSON report of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='slowdown ratio reported as a regression')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--root', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(runScenarios(int(args.units), args.root, os.environ['FAKE_SYSTEMD_SPAWN_LOG'])))
+        sys.exit(0)
+
+    report = {
+        'version': REPORT_VERSION,
+        'revision': gitRevision(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'latencyMs': args.latency,
+        'scales': [],
+    }
+    for count in (int(value) for value in args.units.split(',')):
+        report['scales'].append({'units': count, 'results': runScale(count, args.latency)})
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    printReport(report, baseline, args.threshold)
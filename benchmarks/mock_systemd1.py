@@ -0,0 +1,129 @@
+# This Python file uses the following encoding: utf-8
+# A stand-in for org.freedesktop.systemd1 that serves a synthetic set of units
+# on any bus, e.g. a private dbus-daemon started by compare_backends.py:
+#
+#     python benchmarks/mock_systemd1.py --bus unix:path=/tmp/bus --units 2000
+import argparse
+import itertools
+import sys
+
+from jeepney import (DBusAddress, HeaderFields, MessageType, new_error, new_method_return,
+                     new_signal)
+from jeepney.bus_messages import message_bus
+from jeepney.io.blocking import open_dbus_connection
+
+SERVICE = 'org.freedesktop.systemd1'
+MANAGER_PATH = '/org/freedesktop/systemd1'
+MANAGER_INTERFACE = 'org.freedesktop.systemd1.Manager'
+UNIT_PREFIX = '/org/freedesktop/systemd1/unit/'
+UNIT_TYPES = ('service', 'socket', 'timer', 'mount', 'target', 'path')
+
+
+def escapeUnitName(name: str) -> str:
+    return ''.join(c if c.isalnum() else '_%02x' % ord(c) for c in name)
+
+
+class MockSystemd:
+    def __init__(self, count: int):
+        self.units = {}
+        for i in range(count):
+            name = f'mock-{i:05d}.{UNIT_TYPES[i % len(UNIT_TYPES)]}'
+            self.units[name] = {
+                'Id': name,
+                'Description': f'Mock unit number {i}',
+                'LoadState': 'loaded',
+                'ActiveState': 'active' if i % 3 else 'inactive',
+                'SubState': 'running' if i % 3 else 'dead',
+                'UnitFileState': 'enabled' if i % 2 else 'disabled',
+                'FragmentPath': f'/usr/lib/systemd/system/{name}',
+                'After': ['basic.target'],
+                'Before': [],
+                'Requires': [],
+                'Wants': [f'mock-{(i + 1) % count:05d}.service'],
+                'Conflicts': ['shutdown.target'],
+            }
+        self.byPath = {UNIT_PREFIX + escapeUnitName(name): name for name in self.units}
+        self.jobIds = itertools.count(1)
+
+    def unitProperties(self, name: str) -> dict:
+        result = {}
+        for key, value in self.units[name].items():
+            result[key] = ('as', value) if isinstance(value, list) else ('s', value)
+        return result
+
+    def handle(self, connection, message):
+        fields = message.header.fields
+        member = fields.get(HeaderFields.member)
+        path = fields.get(HeaderFields.path)
+        body = message.body
+
+        if member == 'GetAll' and path in self.byPath:
+            return new_method_return(message, 'a{sv}', (self.unitProperties(self.byPath[path]),))
+        if path != MANAGER_PATH:
+            return new_error(message, 'org.freedesktop.DBus.Error.UnknownObject')
+        if member in ('Subscribe', 'Reload'):
+            return new_method_return(message)
+        if member == 'ListUnitFiles':
+            files = [(unit['FragmentPath'], unit['UnitFileState']) for unit in self.units.values()]
+            return new_method_return(message, 'a(ss)', (files,))
+        if member == 'ListUnits':
+            rows = [(name, unit['Description'], unit['LoadState'], unit['ActiveState'],
+                     unit['SubState'], '', UNIT_PREFIX + escapeUnitName(name), 0, '', '/')
+                    for name, unit in self.units.items()]
+            return new_method_return(message, 'a(ssssssouso)', (rows,))
+        if member in ('GetUnit', 'LoadUnit'):
+            if body[0] not in self.units:
+                return new_error(message, 'org.freedesktop.systemd1.NoSuchUnit')
+            return new_method_return(message, 'o', (UNIT_PREFIX + escapeUnitName(body[0]),))
+        if member in ('StartUnit', 'StopUnit', 'RestartUnit'):
+            name = body[0]
+            if name not in self.units:
+                return new_error(message, 'org.freedesktop.systemd1.NoSuchUnit')
+            started = member != 'StopUnit'
+            self.units[name]['ActiveState'] = 'active' if started else 'inactive'
+            self.units[name]['SubState'] = 'running' if started else 'dead'
+            jobId = next(self.jobIds)
+            jobPath = f'/org/freedesktop/systemd1/job/{jobId}'
+            connection.send(new_method_return(message, 'o', (jobPath,)))
+            unit = DBusAddress(UNIT_PREFIX + escapeUnitName(name), interface='org.freedesktop.DBus.Properties')
+            changed = {key: ('s', self.units[name][key]) for key in ('ActiveState', 'SubState')}
+            connection.send(new_signal(unit, 'PropertiesChanged', 'sa{sv}as',
+                                       ('org.freedesktop.systemd1.Unit', changed, [])))
+            manager = DBusAddress(MANAGER_PATH, interface=MANAGER_INTERFACE)
+            return new_signal(manager, 'JobRemoved', 'uoss', (jobId, jobPath, name, 'done'))
+        if member in ('EnableUnitFiles', 'DisableUnitFiles'):
+            state = 'enabled' if member == 'EnableUnitFiles' else 'disabled'
+            for name in body[0]:
+                if name in self.units:
+                    self.units[name]['UnitFileState'] = state
+            manager = DBusAddress(MANAGER_PATH, interface=MANAGER_INTERFACE)
+            connection.send(new_signal(manager, 'UnitFilesChanged'))
+            if member == 'EnableUnitFiles':
+                return new_method_return(message, 'ba(sss)', (False, []))
+            return new_method_return(message, 'a(sss)', ([],))
+        return new_error(message, 'org.freedesktop.DBus.Error.UnknownMethod')
+
+
+def serve(bus: str, count: int):
+    connection = open_dbus_connection(bus=bus)
+    connection.send_and_get_reply(message_bus.RequestName(SERVICE))
+    mock = MockSystemd(count)
+    print('ready', flush=True)
+    while True:
+        message = connection.receive()
+        if message.header.message_type != MessageType.method_call:
+            continue
+        reply = mock.handle(connection, message)
+        if reply is not None:
+            connection.send(reply)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bus', required=True)
+    parser.add_argument('--units', type=int, default=1000)
+    args = parser.parse_args()
+    try:
+        serve(args.bus, args.units)
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,75 @@
+# This Python file uses the following encoding: utf-8
+# Measures per-keystroke search latency (index lookup + proxy refilter) on a
+# synthetic unit list:
+#
+#     QT_QPA_PLATFORM=offscreen python benchmarks/search_latency.py --units 20000
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+from search import UnitSearchIndex
+from unitmodel import UnitTableModel, UnitFilterProxyModel
+from units import UNIT_TYPES, Unit
+
+WORDS = ('systemd', 'network', 'user', 'session', 'getty', 'dbus', 'docker', 'worker', 'cron',
+         'journal', 'udev', 'login', 'nginx', 'postgres', 'backup', 'mount', 'swap', 'tmp')
+TYPES = ('service', 'socket', 'timer', 'mount', 'target', 'path', 'slice')
+
+
+def syntheticUnits(count: int) -> list:
+    generator = random.Random(0)
+    units = []
+    for i in range(count):
+        unitType = TYPES[i % len(TYPES)]
+        name = f'{generator.choice(WORDS)}-{generator.choice(WORDS)}@{i}.{unitType}'
+        units.append(Unit(name, UNIT_TYPES[unitType], f'{generator.choice(WORDS).title()} helper {i}'))
+    return units
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--units', type=int, default=20000)
+    parser.add_argument('--fuzzy', action='store_true')
+    parser.add_argument('--descriptions', action='store_true')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    units = syntheticUnits(args.units)
+    start = time.perf_counter()
+    index = UnitSearchIndex(units)
+    index.search('warm-up', fuzzy=args.fuzzy, descriptions=args.descriptions)
+    buildTime = time.perf_counter() - start
+
+    model = UnitTableModel()
+    model.setUnits(units)
+    proxy = UnitFilterProxyModel()
+    proxy.setSourceModel(model)
+
+    latencies = []
+    for query in ('network-user', 'docker', 'postgres-backup@1', 'journ', 'getty-cron'):
+        # type the query, then delete it again
+        typed = [query[:i] for i in range(1, len(query) + 1)]
+        for text in typed + typed[-2::-1] + ['']:
+            start = time.perf_counter()
+            proxy.setAcceptedRows(index.search(text, fuzzy=args.fuzzy, descriptions=args.descriptions))
+            app.processEvents()
+            latencies.append(time.perf_counter() - start)
+
+    print(f'units            {args.units}')
+    print(f'index build      {buildTime * 1000:.1f}ms')
+    print(f'keystrokes       {len(latencies)}')
+    print(f'latency median   {statistics.median(latencies) * 1000:.2f}ms')
+    print(f'latency p95      {percentile(latencies, 0.95) * 1000:.2f}ms')
+    print(f'latency max      {max(latencies) * 1000:.2f}ms')
@@ -0,0 +1,110 @@
+# This Python file uses the following encoding: utf-8
+# Checks unitwatch.UnitFileWatcher against a unit tree written by
+# fake_systemd.generateUnitTree in a temporary directory:
+#
+#     python benchmarks/unit_watch.py --units 2000 --burst 300
+#
+# Rewrites a burst of unit files the way a package upgrade does (a temporary
+# file renamed over the old one), then edits drop-ins, adds and removes a
+# unit, and prints for every step how many batches arrived, how long after
+# the last write, which units they resolve to and which of those the fake
+# systemctl reports as needing a daemon-reload.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from backend import SubprocessBackend
+from core import checkDaemonReload
+from unitfile import ownerRows
+from unitwatch import COALESCE_MS, UnitFileWatcher
+from fake_systemd import UNIT_DIRECTORY, FakeRunner, generateUnitTree, unitName
+
+
+def replace(path: str, text: str):
+    temporary = path + '.tmp-upgrade'
+    with open(temporary, 'w') as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+def collect(watcher: UnitFileWatcher, edit, quiet: float) -> tuple:
+    # (batches, seconds from the end of edit to the last batch)
+    batches = []
+    watcher.changed.connect(lambda changes: batches.append((time.perf_counter(), changes)))
+    loop = QEventLoop()
+    QTimer.singleShot(0, edit)
+    QTimer.singleShot(int(quiet * 1000), loop.quit)
+    loop.exec()
+    watcher.changed.disconnect()
+    last = max((stamp for stamp, _ in batches), default=edit.finished)
+    return [changes for _, changes in batches], last - edit.finished
+
+
+class Edit:
+    # runs fn from the event loop and notes when it finished
+    def __init__(self, fn):
+        self.fn = fn
+        self.finished = None
+
+    def __call__(self):
+        self.fn()
+        self.finished = time.perf_counter()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--units', type=int, default=2000)
+    parser.add_argument('--burst', type=int, default=300)
+    arguments = parser.parse_args()
+    app = QCoreApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory(prefix='unitwatch') as root:
+        generateUnitTree(root, arguments.units)
+        directory = os.path.join(root, UNIT_DIRECTORY)
+        names = sorted(unitName(number) for number in range(arguments.units))
+        backend = SubprocessBackend(runner=FakeRunner(arguments.units, root=root))
+        watcher = UnitFileWatcher((directory,))
+        print(f'{arguments.units} units, {len(watcher.directories)} directories watched')
+
+        def burst():
+            for number in range(arguments.burst):
+                path = os.path.join(directory, unitName(number))
+                replace(path, open(path).read() + '# upgraded\n')
+
+        def dropIns():
+            # a new drop-in directory, an edit to an existing one and a
+            # drop-in for every service
+            os.makedirs(os.path.join(directory, unitName(1) + '.d'), exist_ok=True)
+            replace(os.path.join(directory, unitName(1) + '.d', 'limits.conf'), '[Service]\nMemoryMax=1G\n')
+            replace(os.path.join(directory, unitName(0) + '.d', 'override.conf'), '[Service]\nNice=5\n')
+            os.makedirs(os.path.join(directory, 'service.d'), exist_ok=True)
+            replace(os.path.join(directory, 'service.d', 'all.conf'), '[Service]\nTasksMax=64\n')
+
+        def addRemove():
+            replace(os.path.join(directory, 'added.service'), '[Service]\nExecStart=/bin/true\n')
+            os.unlink(os.path.join(directory, unitName(arguments.units - 1)))
+
+        steps = (('burst', burst), ('drop-ins', dropIns), ('add/remove', addRemove))
+        for label, fn in steps:
+            edit = Edit(fn)
+            batches, latency = collect(watcher, edit, quiet=COALESCE_MS / 1000 + 2.5)
+            owners = set().union(*(changes.owners for changes in batches)) if batches else set()
+            rows = ownerRows(owners, names)
+            affected = [names[row] for row in rows]
+            start = time.perf_counter()
+            checked, stale = checkDaemonReload(backend, affected)
+            checkTime = time.perf_counter() - start
+            print(f'{label:10} {len(batches)} batches, last {latency * 1000:5.0f} ms after the edit, '
+                  f'{len(owners)} owners -> {len(affected)} units, {len(stale)} need daemon-reload '
+                  f'(checked in {checkTime * 1000:.0f} ms), '
+                  f'added/removed: {any(changes.filesAddedOrRemoved for changes in batches)}, '
+                  f'overflow: {any(changes.overflow for changes in batches)}')
+        watcher.close()
@@ -0,0 +1,101 @@
+# This Python file uses the following encoding: utf-8
+# Times verify.verifyUnitFiles over a unit tree written by
+# fake_systemd.generateUnitTree, with the fake systemd-analyze verify:
+#
+#     python benchmarks/verify_units.py --units 5000 --broken 50
+#
+# Breaks a share of the unit files (an unknown key, a section of another
+# unit type, a service without ExecStart, a line without "="), then verifies
+# everything with one worker and with all of them, again with the results
+# cached, and once more after editing a few files. Prints the time, the
+# systemd-analyze processes started and the units with findings per pass.
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from verify import ERROR, VERIFY_WORKERS, VerifyCache, formatFinding, verifyUnitFiles
+from fake_systemd import TYPES, UNIT_DIRECTORY, FakeRunner, unitName, generateUnitTree
+
+BREAKAGES = (
+    ('Unit', 'Descripton=typo\n'),
+    ('Service', 'ExecStrat=/usr/bin/true\n'),
+    ('Timer', '[Timer]\nOnCalendar=daily\n'),
+    ('Unit', 'this line has no equals sign\n'),
+)
+
+
+class CountingRunner:
+    def __init__(self, runner):
+        self.runner = runner
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, argv: list, timeout=None, stderr=None):
+        with self._lock:
+            self.calls += 1
+        return self.runner(argv, timeout, stderr)
+
+
+def breakUnit(path: str, section: str, line: str):
+    with open(path) as f:
+        text = f.read()
+    if section == 'Service':
+        # the only ExecStart becomes a typo, systemd-analyze refuses the unit
+        text = text.replace('ExecStart=', 'ExecStrat=')
+    elif section == 'Timer':
+        text += line
+    else:
+        text = text.replace(f'[{section}]\n', f'[{section}]\n{line}', 1)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--units', type=int, default=5000)
+    parser.add_argument('--broken', type=int, default=50)
+    parser.add_argument('--edits', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=VERIFY_WORKERS)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='verify') as root:
+        generateUnitTree(root, arguments.units)
+        directory = os.path.join(root, UNIT_DIRECTORY)
+        searchPaths = (directory,)
+        names = sorted(unitName(number) for number in range(arguments.units))
+        step = max(1, arguments.units // max(1, arguments.broken))
+        for index, number in enumerate(range(0, arguments.units, step)[:arguments.broken]):
+            section, line = BREAKAGES[index % len(BREAKAGES)]
+            if section == 'Service':
+                # the closest service at or before it
+                number -= number % len(TYPES)
+            breakUnit(os.path.join(directory, unitName(number)), section, line)
+        cachePath = os.path.join(root, 'verify.cache')
+
+        def timePass(label: str, workers: int, cache):
+            runner = CountingRunner(FakeRunner(arguments.units, root=root))
+            start = time.perf_counter()
+            checked, findings, cache = verifyUnitFiles(names, cache, searchPaths, runner, workers, cachePath)
+            took = time.perf_counter() - start
+            errors = sum(any(finding[0] == ERROR for finding in found) for found in findings.values())
+            print(f'{label:22} {took * 1000:7.0f} ms, {runner.calls:4} systemd-analyze runs, '
+                  f'{len(checked)} checked, {len(findings)} with findings ({errors} with errors)')
+            return findings, cache
+
+        timePass('cold, 1 worker', 1, VerifyCache())
+        findings, cache = timePass(f'cold, {arguments.workers} workers', arguments.workers, VerifyCache())
+        timePass('cached', arguments.workers, cache)
+        timePass('cache from disk', arguments.workers, None)
+        for number in range(arguments.edits):
+            with open(os.path.join(directory, unitName(number)), 'a') as f:
+                f.write('# edited\n')
+        timePass(f'{arguments.edits} files edited', arguments.workers, cache)
+        for name in sorted(findings)[:len(BREAKAGES) + 1]:
+            print(f'  {name}: ' + '; '.join(map(formatFinding, findings[name])))
@@ -0,0 +1,146 @@
+# This Python file uses the following encoding: utf-8
+import re
+import subprocess
+from typing import Union
+
+from backend import Backend, SubprocessBackend
+from instrumentation import timed
+
+# when every unit started and stopped, in microseconds since boot
+BOOT_PROPERTIES = ('InactiveExitTimestampMonotonic', 'ActiveEnterTimestampMonotonic',
+                   'ActiveExitTimestampMonotonic', 'InactiveEnterTimestampMonotonic')
+TIMESPAN_UNITS = {'us': 1e-6, 'µs': 1e-6, 'ms': 1e-3, 's': 1.0, 'min': 60.0, 'h': 3600.0, 'd': 86400.0,
+                  'w': 604800.0, 'month': 2629800.0, 'y': 31557600.0}
+TIMESPAN_PART = re.compile(r'(\d+(?:\.\d+)?)(us|µs|ms|s|min|h|d|w|month|y)')
+CHAIN_LINE = re.compile(r'^(?P<indent>[\s│]*)(?P<branch>[└├]─)?(?P<unit>\S+)'
+                        r'(?: @(?P<at>[^+]+?))?(?: \+(?P<took>.+?))?\s*$')
+CHUNK_SIZE = 1000
+
+
+def parseTimespan(text: str) -> Union[float, None]:
+    # "1min 2.345s", "561ms" as printed by systemd, in seconds
+    parts = text.split()
+    if not parts:
+        return None
+    total = 0.0
+    for part in parts:
+        match = TIMESPAN_PART.fullmatch(part)
+        if match is None:
+            return None
+        total += float(match.group(1)) * TIMESPAN_UNITS[match.group(2)]
+    return total
+
+
+def parseBlame(output: str) -> dict:
+    # `systemd-analyze blame`: "  1.234s unit" per line, slowest first
+    result = {}
+    for line in output.split('\n'):
+        timespan, _, name = line.strip().rpartition(' ')
+        seconds = parseTimespan(timespan)
+        if seconds is not None and name:
+            result[name] = seconds
+    return result
+
+
+def parseCriticalChain(output: str) -> list:
+    # `systemd-analyze critical-chain`: the default target first, then what
+    # it waited for, one level deeper per line; (depth, unit, at, took)
+    chain = []
+    for line in output.split('\n'):
+        if not line.strip() or line.startswith('The time'):
+            continue
+        match = CHAIN_LINE.match(line)
+        if match is None:
+            continue
+        at = parseTimespan(match.group('at') or '')
+        took = parseTimespan(match.group('took') or '')
+        depth = len(match.group('indent')) // 2 + (1 if match.group('branch') else 0)
+        chain.append((depth, match.group('unit'), at, took))
+    return chain
+
+
+class BootEntry:
+    # One unit of the boot: when it began activating, became active, began
+    # and finished deactivating, in seconds since boot (None when it never
+    # did), plus the blame time and whether it is on the critical chain
+    __slots__ = ('name', 'activating', 'active', 'deactivating', 'inactive', 'blame', 'critical')
+
+    def __init__(self, name: str, activating: Union[float, None], active: Union[float, None],
+                 deactivating: Union[float, None], inactive: Union[float, None]):
+        self.name = name
+        self.activating = activating
+        self.active = active
+        self.deactivating = deactivating
+        self.inactive = inactive
+        self.blame = None
+        self.critical = False
+
+    def activationTime(self) -> Union[float, None]:
+        if self.activating is None or self.active is None or self.active < self.activating:
+            return None
+        return self.active - self.activating
+
+
+class BootAnalysis:
+    def __init__(self, entries: list, chain: list, finished: Union[float, None], errors: list):
+        # entries sorted by the time they began activating
+        self.entries = entries
+        self.chain = chain
+        self.finished = finished
+        self.errors = errors
+
+
+def _seconds(value: Union[str, None]) -> Union[float, None]:
+    try:
+        microseconds = int(value)
+    except (TypeError, ValueError):
+        return None
+    return microseconds / 1e6 if microseconds > 0 else None
+
+
+def runAnalyze(backend: Backend, *args) -> str:
+    # systemd-analyze against the same machine as the backend; the D-Bus
+    # backend is always local
+    if hasattr(backend, 'backends'):
+        backend = backend.backends[0]
+    if not isinstance(backend, SubprocessBackend):
+        backend = SubprocessBackend()
+    result = backend.run(*args, '--no-pager', stderr=subprocess.PIPE, tool='systemd-analyze')
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors='replace').strip()
+                           or f'systemd-analyze {args[0]} failed')
+    return result.stdout.decode(errors='replace')
+
+
+@timed('worker')
+def loadBootAnalysis(backend: Backend, names: list) -> BootAnalysis:
+    # the timestamps of all units come from one bulk property fetch, blame
+    # and the critical chain from systemd-analyze; a failing systemd-analyze
+    # (e.g. while the boot is not finished) only costs its part
+    properties = {}
+    for start in range(0, len(names), CHUNK_SIZE):
+        properties.update(backend.getProperties(names[start:start + CHUNK_SIZE], BOOT_PROPERTIES))
+    errors = []
+    try:
+        blame = parseBlame(runAnalyze(backend, 'blame'))
+    except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+        blame = {}
+        errors.append(f'blame: {e}')
+    try:
+        chain = parseCriticalChain(runAnalyze(backend, 'critical-chain'))
+    except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+        chain = []
+        errors.append(f'critical-chain: {e}')
+
+    critical = {unit for _, unit, _, _ in chain}
+    entries = []
+    for name, values in properties.items():
+        entry = BootEntry(name, *(_seconds(values.get(key)) for key in BOOT_PROPERTIES))
+        if entry.activating is None and entry.active is None:
+            continue
+        entry.blame = blame.get(name)
+        entry.critical = name in critical
+        entries.append(entry)
+    entries.sort(key=lambda entry: (entry.activating if entry.activating is not None else entry.active, entry.name))
+    finished = chain[0][2] if chain else None
+    return BootAnalysis(entries, chain, finished, errors)
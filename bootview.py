@@ -0,0 +1,334 @@
+# This Python file uses the following encoding: utf-8
+import math
+from typing import Union
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QRectF, Qt, Signal
+from PySide6.QtGui import QColor, QFont, QPainter, QPen
+from PySide6.QtWidgets import (
+    QAbstractScrollArea,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QSplitter,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from boot import BootAnalysis, BootEntry
+
+ROW_HEIGHT = 18
+# the time scale above the rows
+AXIS_HEIGHT = 14
+MIN_SCALE = 2.0
+MAX_SCALE = 20000.0
+ZOOM_STEP = 1.25
+ACTIVATING_COLOR = QColor('#e06c5f')
+ACTIVE_COLOR = QColor('#f3c4bf')
+DEACTIVATING_COLOR = QColor('#7aa6d8')
+GRID_COLOR = QColor('#dddddd')
+FINISHED_COLOR = QColor('#2e7d32')
+CURRENT_COLOR = QColor('#cfe3ff')
+DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+ALIGNMENT_ROLE = Qt.ItemDataRole.TextAlignmentRole
+FONT_ROLE = Qt.ItemDataRole.FontRole
+
+
+def formatSeconds(seconds: Union[float, None]) -> str:
+    return '' if seconds is None else f'{seconds:.3f} s'
+
+
+class BootTableModel(QAbstractTableModel):
+    HEADERS = ('Unit', 'Started at', 'Activation', 'Blame', 'Critical chain')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self._boldFont = QFont()
+        self._boldFont.setBold(True)
+
+    def setEntries(self, entries: list):
+        self.beginResetModel()
+        self.entries = list(entries)
+        self.endResetModel()
+
+    def entryAt(self, row: int) -> BootEntry:
+        return self.entries[row]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    @staticmethod
+    def _value(entry: BootEntry, column: int):
+        if column == 0:
+            return entry.name
+        if column == 1:
+            return entry.activating
+        if column == 2:
+            return entry.activationTime()
+        if column == 3:
+            return entry.blame
+        return entry.critical
+
+    def data(self, index, role=DISPLAY_ROLE):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        column = index.column()
+        if role == DISPLAY_ROLE:
+            value = self._value(entry, column)
+            if column == 0:
+                return value
+            if column == 4:
+                return 'yes' if value else ''
+            return formatSeconds(value)
+        if role == ALIGNMENT_ROLE and column in (1, 2, 3):
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == FONT_ROLE and entry.critical:
+            return self._boldFont
+        return None
+
+    def headerData(self, section: int, orientation, role=DISPLAY_ROLE):
+        if role == DISPLAY_ROLE and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        # units without a value go last whichever way round
+        descending = order == Qt.DescendingOrder
+        present = [entry for entry in self.entries if self._value(entry, column) is not None]
+        missing = [entry for entry in self.entries if self._value(entry, column) is None]
+        present.sort(key=lambda entry: self._value(entry, column), reverse=descending)
+        self.beginResetModel()
+        self.entries = present + missing
+        self.endResetModel()
+
+
+class BootTimeline(QAbstractScrollArea):
+    # A Gantt chart of the boot, one row per unit in the order they started:
+    # activating, active and deactivating as bars, the end of the boot as a
+    # line. Only the rows inside the viewport are painted, so the number of
+    # units does not matter. Ctrl+wheel zooms around the mouse.
+    unitActivated = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.finished = None
+        self.end = 1.0
+        self.scale = 100.0
+        self.currentName = None
+        self._rows = {}
+        self.setMouseTracking(True)
+        self.verticalScrollBar().setSingleStep(ROW_HEIGHT)
+
+    def setAnalysis(self, analysis: BootAnalysis):
+        self.entries = analysis.entries
+        self.finished = analysis.finished
+        self._rows = {entry.name: row for row, entry in enumerate(self.entries)}
+        times = [value for entry in self.entries
+                 for value in (entry.activating, entry.active, entry.deactivating, entry.inactive)
+                 if value is not None]
+        # whatever is still running is drawn up to a bit after the boot
+        self.end = max([self.finished or 0.0] + [entry.active or entry.activating or 0.0 for entry in self.entries]) * 1.05
+        self.end = max(self.end, min(max(times, default=1.0), self.end * 2), 1.0)
+        viewportWidth = max(self.viewport().width() - 20, 100)
+        self.scale = min(max(viewportWidth / self.end, MIN_SCALE), MAX_SCALE)
+        self._updateScrollBars()
+        self.viewport().update()
+
+    def setCurrentUnit(self, name: Union[str, None]):
+        self.currentName = name
+        row = self._rows.get(name)
+        if row is not None:
+            top = row * ROW_HEIGHT
+            scrollBar = self.verticalScrollBar()
+            if not scrollBar.value() <= top <= scrollBar.value() + self.viewport().height() - ROW_HEIGHT - AXIS_HEIGHT:
+                scrollBar.setValue(top - self.viewport().height() // 2)
+            entry = self.entries[row]
+            start = (entry.activating if entry.activating is not None else entry.active) * self.scale
+            horizontal = self.horizontalScrollBar()
+            if not horizontal.value() <= start <= horizontal.value() + self.viewport().width():
+                horizontal.setValue(int(start) - 40)
+        self.viewport().update()
+
+    def _updateScrollBars(self):
+        viewport = self.viewport()
+        self.verticalScrollBar().setRange(0, max(0, len(self.entries) * ROW_HEIGHT + AXIS_HEIGHT - viewport.height()))
+        self.verticalScrollBar().setPageStep(viewport.height())
+        self.horizontalScrollBar().setRange(0, max(0, int(self.end * self.scale) + 200 - viewport.width()))
+        self.horizontalScrollBar().setPageStep(viewport.width())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._updateScrollBars()
+
+    def _gridStep(self) -> float:
+        # about one line every 80 pixels, at 1, 2 or 5 times a power of ten
+        raw = 80 / self.scale
+        power = 10 ** math.floor(math.log10(raw))
+        return next(step * power for step in (1, 2, 5, 10) if step * power >= raw)
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        width = self.viewport().width()
+        height = self.viewport().height()
+        left = self.horizontalScrollBar().value()
+        top = self.verticalScrollBar().value()
+        painter.fillRect(0, 0, width, height, self.palette().base())
+
+        step = self._gridStep()
+        gridTimes = []
+        time = math.floor(left / self.scale / step) * step
+        while time * self.scale - left < width:
+            gridTimes.append(time)
+            time += step
+        painter.setPen(QPen(GRID_COLOR))
+        for time in gridTimes:
+            x = int(time * self.scale - left)
+            painter.drawLine(x, 0, x, height)
+
+        first = top // ROW_HEIGHT
+        last = min(len(self.entries), (top + height - AXIS_HEIGHT) // ROW_HEIGHT + 1)
+        metrics = painter.fontMetrics()
+        for row in range(first, last):
+            entry = self.entries[row]
+            y = AXIS_HEIGHT + row * ROW_HEIGHT - top
+            if entry.name == self.currentName:
+                painter.fillRect(0, y, width, ROW_HEIGHT, CURRENT_COLOR)
+            segments = ((entry.activating, entry.active, ACTIVATING_COLOR),
+                        (entry.active, entry.deactivating or self.end, ACTIVE_COLOR),
+                        (entry.deactivating, entry.inactive, DEACTIVATING_COLOR))
+            for start, end, color in segments:
+                if start is None or end is None or end < start:
+                    continue
+                x = start * self.scale - left
+                barWidth = max((end - start) * self.scale, 1.0)
+                if x + barWidth < 0 or x > width:
+                    continue
+                painter.fillRect(QRectF(x, y + 3, barWidth, ROW_HEIGHT - 6), color)
+            start = entry.activating if entry.activating is not None else entry.active
+            label = entry.name
+            if entry.activationTime():
+                label += f' ({entry.activationTime() * 1000:.0f} ms)'
+            painter.setPen(QPen(Qt.black))
+            font = painter.font()
+            font.setBold(entry.critical)
+            painter.setFont(font)
+            x = start * self.scale - left + 4
+            if x < width and x + metrics.horizontalAdvance(label) > 0:
+                painter.drawText(int(x), y + ROW_HEIGHT - 5, label)
+
+        if self.finished is not None:
+            x = int(self.finished * self.scale - left)
+            painter.setPen(QPen(FINISHED_COLOR, 2))
+            painter.drawLine(x, 0, x, height)
+        # the time scale stays on top of the bars
+        painter.fillRect(0, 0, width, AXIS_HEIGHT, self.palette().base())
+        painter.setPen(QPen(Qt.gray))
+        font = painter.font()
+        font.setBold(False)
+        painter.setFont(font)
+        for time in gridTimes:
+            painter.drawText(int(time * self.scale - left) + 2, 11, f'{time:g} s')
+        painter.end()
+
+    def wheelEvent(self, event):
+        if not event.modifiers() & Qt.ControlModifier:
+            super().wheelEvent(event)
+            return
+        # zoom around the time under the mouse
+        x = event.position().x()
+        time = (self.horizontalScrollBar().value() + x) / self.scale
+        factor = ZOOM_STEP if event.angleDelta().y() > 0 else 1 / ZOOM_STEP
+        self.scale = min(max(self.scale * factor, MIN_SCALE), MAX_SCALE)
+        self._updateScrollBars()
+        self.horizontalScrollBar().setValue(int(time * self.scale - x))
+        self.viewport().update()
+        event.accept()
+
+    def mousePressEvent(self, event):
+        row = int(event.position().y() - AXIS_HEIGHT + self.verticalScrollBar().value()) // ROW_HEIGHT
+        if event.button() == Qt.LeftButton and 0 <= row < len(self.entries):
+            self.currentName = self.entries[row].name
+            self.viewport().update()
+            self.unitActivated.emit(self.currentName)
+
+    def mouseMoveEvent(self, event):
+        row = int(event.position().y() - AXIS_HEIGHT + self.verticalScrollBar().value()) // ROW_HEIGHT
+        if 0 <= row < len(self.entries):
+            entry = self.entries[row]
+            self.viewport().setToolTip(
+                f'{entry.name}\nactivating {formatSeconds(entry.activating)}, active {formatSeconds(entry.active)}'
+                + (f'\nblame {formatSeconds(entry.blame)}' if entry.blame is not None else ''))
+        else:
+            self.viewport().setToolTip('')
+
+
+class BootView(QWidget):
+    # The boot tab: a summary, the sortable table and the timeline side by
+    # side; clicking a unit in either asks for it to be selected
+    unitActivated = Signal(str)
+    refreshRequested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.summaryLabel = QLabel(self)
+        self.summaryLabel.setWordWrap(True)
+        self.refreshButton = QPushButton('Refresh', self)
+        self.refreshButton.clicked.connect(self.refreshRequested)
+        self.model = BootTableModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.clicked.connect(lambda index: self.unitActivated.emit(self.model.entryAt(index.row()).name))
+        self.timeline = BootTimeline(self)
+        self.timeline.unitActivated.connect(self.unitActivated)
+
+        header = QHBoxLayout()
+        header.addWidget(self.summaryLabel, 1)
+        header.addWidget(self.refreshButton)
+        splitter = QSplitter(Qt.Horizontal, self)
+        splitter.addWidget(self.table)
+        splitter.addWidget(self.timeline)
+        splitter.setStretchFactor(1, 2)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(header)
+        layout.addWidget(splitter, 1)
+
+    def setLoading(self):
+        self.summaryLabel.setText('Analysing the boot...')
+        self.refreshButton.setEnabled(False)
+
+    def setAnalysis(self, analysis: BootAnalysis):
+        self.refreshButton.setEnabled(True)
+        self.model.setEntries(analysis.entries)
+        header = self.table.horizontalHeader()
+        if header.sortIndicatorSection() >= 0:
+            self.model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+        self.timeline.setAnalysis(analysis)
+        parts = [f'{len(analysis.entries)} units']
+        if analysis.finished is not None:
+            parts.append(f'boot finished after {analysis.finished:.3f} s')
+        if analysis.chain:
+            slowest = max((step for step in analysis.chain if step[3]), key=lambda step: step[3], default=None)
+            if slowest is not None:
+                parts.append(f'slowest on the critical chain: {slowest[1]} (+{slowest[3]:.3f} s)')
+        parts += analysis.errors
+        self.summaryLabel.setText(', '.join(parts))
+
+    def setError(self, message: str):
+        self.refreshButton.setEnabled(True)
+        self.summaryLabel.setText(message)
+
+    def setCurrentUnit(self, name: Union[str, None]):
+        self.timeline.setCurrentUnit(name)
@@ -0,0 +1,215 @@
+# This Python file uses the following encoding: utf-8
+import array
+import os
+import re
+import resource
+import threading
+import time
+from typing import Union
+
+from backend import Backend
+from instrumentation import timed
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+# unit types systemd puts into a cgroup of their own
+CGROUP_TYPES = ('service', 'scope', 'slice', 'socket', 'mount', 'swap')
+HISTORY_LENGTH = 120
+CHUNK_SIZE = 1000
+READ_SIZE = 4096
+IO_BYTES = re.compile(rb'[rw]bytes=(\d+)')
+# descriptors left for everything else when deciding how many files stay open
+RESERVED_FILES = 256
+
+
+def cgroupRoot() -> str:
+    return os.environ.get('SYSTEMDGUI_CGROUP_ROOT', CGROUP_ROOT)
+
+
+def cgroupsAvailable(root: Union[str, None] = None) -> bool:
+    # only the unified (v2) hierarchy is supported
+    return os.path.exists(os.path.join(root or cgroupRoot(), 'cgroup.controllers'))
+
+
+def hasCgroup(name: str) -> bool:
+    return name.rpartition('.')[2] in CGROUP_TYPES
+
+
+@timed('worker')
+def mapControlGroups(backend: Backend, names: list) -> dict:
+    # {unit: its cgroup relative to the root}, for units that have one
+    result = {}
+    for start in range(0, len(names), CHUNK_SIZE):
+        properties = backend.getProperties(names[start:start + CHUNK_SIZE], ('ControlGroup',))
+        for name, values in properties.items():
+            path = values.get('ControlGroup')
+            if path:
+                result[name] = path.lstrip('/')
+    return result
+
+
+class RingBuffer:
+    # The last `capacity` values, in a preallocated array
+    __slots__ = ('_values', '_next', '_count')
+
+    def __init__(self, capacity: int = HISTORY_LENGTH):
+        self._values = array.array('d', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        self._count = min(self._count + 1, len(self._values))
+
+    def values(self) -> list:
+        # oldest first
+        if self._count < len(self._values):
+            return self._values[:self._count].tolist()
+        return (self._values[self._next:] + self._values[:self._next]).tolist()
+
+
+class CgroupFile:
+    # One accounting file. While a descriptor is kept it is re-read with
+    # pread, otherwise the file is opened for every read; None when the file
+    # is missing (controller not enabled, unit stopped)
+    __slots__ = ('path', 'keepOpen', '_fd')
+
+    def __init__(self, path: str, keepOpen: bool):
+        self.path = path
+        self.keepOpen = keepOpen
+        self._fd = None
+
+    def read(self) -> Union[bytes, None]:
+        try:
+            if self._fd is None:
+                fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+                if not self.keepOpen:
+                    try:
+                        return os.read(fd, READ_SIZE)
+                    finally:
+                        os.close(fd)
+                self._fd = fd
+            return os.pread(self._fd, READ_SIZE, 0)
+        except OSError:
+            # the cgroup went away with the unit, try again next time
+            self.close()
+            return None
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def readInt(data: Union[bytes, None]) -> Union[int, None]:
+    try:
+        return int(data)
+    except (TypeError, ValueError):
+        return None
+
+
+def readCpuUsage(data: Union[bytes, None]) -> Union[int, None]:
+    # usage_usec is the first line of cpu.stat
+    if not data or not data.startswith(b'usage_usec '):
+        return None
+    return readInt(data[11:data.find(b'\n')])
+
+
+def readIoBytes(data: Union[bytes, None]) -> Union[int, None]:
+    # io.stat: "MAJ:MIN rbytes=N wbytes=N rios=N ..." per device
+    if data is None:
+        return None
+    return sum(map(int, IO_BYTES.findall(data)))
+
+
+class UnitResources:
+    # What the cgroup of one unit used at the last sample: cpu in percent of
+    # one core, io in bytes per second since the sample before
+    __slots__ = ('name', 'files', 'cpu', 'memory', 'io', 'tasks', 'cpuHistory', 'memoryHistory',
+                 '_lastTime', '_lastCpu', '_lastIo')
+
+    def __init__(self, name: str, directory: str, keepOpen: bool):
+        self.name = name
+        self.files = tuple(CgroupFile(os.path.join(directory, file), keepOpen)
+                           for file in ('cpu.stat', 'memory.current', 'io.stat', 'pids.current'))
+        self.cpu = None
+        self.memory = None
+        self.io = None
+        self.tasks = None
+        self.cpuHistory = RingBuffer()
+        self.memoryHistory = RingBuffer()
+        self._lastTime = None
+        self._lastCpu = None
+        self._lastIo = None
+
+    def sample(self, now: float):
+        cpuFile, memoryFile, ioFile, tasksFile = self.files
+        cpu = readCpuUsage(cpuFile.read())
+        io = readIoBytes(ioFile.read())
+        self.memory = readInt(memoryFile.read())
+        self.tasks = readInt(tasksFile.read())
+        elapsed = now - self._lastTime if self._lastTime is not None else 0
+        if elapsed > 0:
+            self.cpu = (None if cpu is None or self._lastCpu is None
+                        else max(cpu - self._lastCpu, 0) / 1e4 / elapsed)
+            self.io = None if io is None or self._lastIo is None else max(io - self._lastIo, 0) / elapsed
+            self.cpuHistory.append(self.cpu or 0.0)
+            self.memoryHistory.append(self.memory or 0)
+        self._lastTime = now
+        self._lastCpu = cpu
+        self._lastIo = io
+
+    def close(self):
+        for file in self.files:
+            file.close()
+
+
+class CgroupSampler:
+    # Samples the accounting files of a set of units. setUnits and sample
+    # may be called from different threads. As many files as the descriptor
+    # limit allows stay open between samples.
+    def __init__(self, root: Union[str, None] = None):
+        self.root = root or cgroupRoot()
+        self.units = {}
+        self._lock = threading.Lock()
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        self.openFileBudget = max(0, (soft if soft != resource.RLIM_INFINITY else 65536) - RESERVED_FILES)
+
+    def setUnits(self, cgroups: dict):
+        # {unit: cgroup path}; history is kept for units that stay
+        with self._lock:
+            for name in list(self.units):
+                if name not in cgroups:
+                    self.units.pop(name).close()
+            openFiles = sum(len(unit.files) for unit in self.units.values() if unit.files[0].keepOpen)
+            for name, path in cgroups.items():
+                if name in self.units:
+                    continue
+                keepOpen = openFiles + 4 <= self.openFileBudget
+                openFiles += 4 if keepOpen else 0
+                self.units[name] = UnitResources(name, os.path.join(self.root, path), keepOpen)
+
+    @timed('worker')
+    def sample(self) -> list:
+        # (name, cpu, memory, io, tasks, cpu history, memory history) per
+        # unit that has any accounting at all; the histories are the ring
+        # buffers themselves, copying them out is left to whoever shows them
+        with self._lock:
+            now = time.monotonic()
+            rows = []
+            for unit in self.units.values():
+                unit.sample(now)
+                if unit.memory is None and unit.tasks is None and unit.cpu is None:
+                    continue
+                rows.append((unit.name, unit.cpu, unit.memory, unit.io, unit.tasks,
+                             unit.cpuHistory, unit.memoryHistory))
+            return rows
+
+    def close(self):
+        with self._lock:
+            for unit in self.units.values():
+                unit.close()
+            self.units = {}
@@ -0,0 +1,154 @@
+# This Python file uses the following encoding: utf-8
+# Command line client of the same engine as the window, for scripts and
+# audits without a display. Every result is one JSON object per line:
+#
+#     python cli.py list --type service --state active=failed
+#     python cli.py list --search nginx --properties MainPID,ExecMainStartTimestamp
+#     python cli.py list --content 'ExecStart:/usr/bin/foo MemoryMax:'
+#     python cli.py show sshd.service cron.service
+#     python cli.py restart --machine=web1 --machine=web2 nginx.service
+#     systemctl list-units --plain --no-legend | cut -d' ' -f1 | python cli.py show -
+#
+# The exit code is 1 when a unit was not found or an action failed.
+import argparse
+import json
+import sys
+
+from units import UNIT_TYPES, UnitType
+from backend import BULK_ACTIONS
+from core import BATCH_SIZE, PARALLEL_BATCHES, STATE_FIELDS, UnitEngine
+from properties import DETAIL_PROPERTIES
+from targets import createTargetBackend
+
+
+def unitRecord(unit) -> dict:
+    return {'unit': unit.name, 'load': unit.loadState, 'active': unit.activeState, 'sub': unit.subState,
+            'enabled': unit.unitFileState, 'description': unit.description}
+
+
+def writeRecord(record: dict):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def readNames(names: list) -> list:
+    # "-" stands for unit names on stdin, one per line
+    result = []
+    for name in names:
+        if name == '-':
+            result += [line.strip() for line in sys.stdin if line.strip()]
+        else:
+            result.append(name)
+    return result
+
+
+def parseStateFilters(specs: list) -> dict:
+    # "active=failed,activating" -> {'activeState': {'failed', 'activating'}}
+    filters = {}
+    for spec in specs:
+        key, sep, values = spec.partition('=')
+        if not sep or key not in STATE_FIELDS:
+            raise ValueError(f'--state expects one of {", ".join(STATE_FIELDS)}=VALUE[,VALUE...], got {spec}')
+        filters.setdefault(STATE_FIELDS[key], set()).update(values.split(','))
+    return filters
+
+
+def streamProperties(engine: UnitEngine, names: list, properties: tuple, args, extra=None) -> int:
+    missing = 0
+    for name, values in engine.streamProperties(names, properties, args.batch, args.jobs):
+        record = dict(extra[name]) if extra else {'unit': name}
+        if values is None or values.get('LoadState') == 'not-found':
+            missing += 1
+            record['error'] = 'not found'
+        else:
+            record['properties'] = values
+        writeRecord(record)
+    sys.stdout.flush()
+    return missing
+
+
+def listUnits(engine: UnitEngine, args) -> int:
+    engine.load()
+    if args.content:
+        engine.loadContentIndex()
+    unitType = UNIT_TYPES[args.type] if args.type else UnitType.ALL
+    selected = engine.select(unitType, args.search or '', args.fuzzy, args.descriptions,
+                             parseStateFilters(args.state), args.content)
+    if not args.properties:
+        for unit in selected:
+            writeRecord(unitRecord(unit))
+        return 0
+    records = {unit.name: unitRecord(unit) for unit in selected}
+    streamProperties(engine, list(records), tuple(args.properties.split(',')), args, records)
+    return 0
+
+
+def showUnits(engine: UnitEngine, args) -> int:
+    properties = tuple(args.properties.split(',')) if args.properties else DETAIL_PROPERTIES
+    if 'LoadState' not in properties:
+        properties += ('LoadState',)
+    return 1 if streamProperties(engine, readNames(args.names), properties, args) else 0
+
+
+def runAction(engine: UnitEngine, args) -> int:
+    names = readNames(args.names)
+    failed = 0
+    for start in range(0, len(names), args.batch):
+        batch = names[start:start + args.batch]
+        results = engine.runAction(args.command, batch)
+        for name in batch:
+            succeeded, detail = results.get(name, (False, 'no result'))
+            failed += not succeeded
+            writeRecord({'unit': name, 'action': args.command, 'ok': succeeded, 'detail': detail})
+        sys.stdout.flush()
+    return 1 if failed else 0
+
+
+def createParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Query and control systemd units, one JSON object per line.')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--machine', action='append', default=[], help='container to manage, repeatable')
+    common.add_argument('--host', action='append', default=[], help='[USER@]HOST to manage over ssh, repeatable')
+    common.add_argument('--batch', type=int, default=BATCH_SIZE, help='units per systemctl call')
+    common.add_argument('--jobs', type=int, default=PARALLEL_BATCHES, help='calls running at once')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    listing = commands.add_parser('list', parents=[common], help='list units')
+    listing.add_argument('--type', choices=sorted(UNIT_TYPES))
+    listing.add_argument('--search', help='text the unit name contains')
+    listing.add_argument('--fuzzy', action='store_true', help='match the search text as a subsequence')
+    listing.add_argument('--descriptions', action='store_true', help='match the search text in descriptions')
+    listing.add_argument('--content', help='only units whose unit files match, e.g. "ExecStart:/usr/bin/foo"')
+    listing.add_argument('--state', action='append', default=[],
+                         help='only units in these states, e.g. active=failed,activating; repeatable')
+    listing.add_argument('--properties', help='comma separated properties to fetch for every listed unit')
+    listing.set_defaults(run=listUnits)
+
+    show = commands.add_parser('show', parents=[common], help='properties of units')
+    show.add_argument('names', nargs='+', help='unit names, - reads them from stdin')
+    show.add_argument('--properties', help='comma separated properties, by default those of the window')
+    show.set_defaults(run=showUnits)
+
+    for action in BULK_ACTIONS:
+        command = commands.add_parser(action, parents=[common], help=f'{action} units')
+        command.add_argument('names', nargs='+', help='unit names, - reads them from stdin')
+        command.set_defaults(run=runAction)
+    return parser
+
+
+def main(argv: list) -> int:
+    args = createParser().parse_args(argv)
+    targets = [f'--machine={machine}' for machine in args.machine] + [f'--host={host}' for host in args.host]
+    engine = UnitEngine(createTargetBackend(targets))
+    try:
+        return args.run(engine, args)
+    except (ValueError, RuntimeError) as e:
+        writeRecord({'error': str(e)})
+        return 2
+    except BrokenPipeError:
+        return 0
+    finally:
+        engine.backend.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
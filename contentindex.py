@@ -0,0 +1,248 @@
+# This Python file uses the following encoding: utf-8
+# An inverted index over the contents of every unit file and drop-in, for
+# questions like "which units run /usr/bin/foo" or "which units set
+# MemoryMax". A query is a list of terms that all have to match:
+#
+#     ExecStart:/usr/bin/foo    the key holds this word
+#     MemoryMax:                the key is set at all
+#     Service.MemoryMax:        ... in that section
+#     Environment:LEVEL*        a word of the key starts with LEVEL
+#     /usr/bin/foo nginx*       a word anywhere, or a word prefix
+#
+# Matching is case insensitive. Files are indexed by their owner (see
+# unitfile.ownerRows), unitsMatching() resolves owners against a unit list.
+import bisect
+import json
+import mmap
+import os
+import re
+import zlib
+from typing import Union
+
+import unitfile
+from unitfile import ownerRows, parseUnitText
+from snapshot import cacheDirectory
+from instrumentation import timed
+
+CONTENT_INDEX_VERSION = 1
+# files larger than this are mapped instead of read
+MMAP_THRESHOLD = 64 * 1024
+WORD = re.compile(r'[^\s=;,"\'()\[\]]+')
+QUERY_TERM = re.compile(r'^(?:(?P<section>[\w-]+)\.)?(?P<key>[\w-]+):(?P<value>.*)$')
+# what a search bar text needs for content search to be taken for granted:
+# a term spelled the way unit file keys are; device units have ":" in their
+# names, "sys-devices-pci0000:00-..." is not a key
+CONTENT_TERM = re.compile(r'^(?:[A-Z][A-Za-z]*\.)?[A-Z][A-Za-z0-9]*:')
+
+
+def contentIndexPath() -> str:
+    return os.path.join(cacheDirectory(), 'contents.index')
+
+
+def isContentQuery(text: str, names: Union[list, None] = None) -> bool:
+    # whether text has a Key:value term that is not the start of one of
+    # names
+    terms = [term for term in text.split() if CONTENT_TERM.match(term)]
+    if terms and names:
+        terms = [term for term in terms if not any(name.startswith(term) for name in names)]
+    return bool(terms)
+
+
+def valueWords(value: str) -> set:
+    # the words of a value, and every component of the paths among them
+    words = set()
+    for word in WORD.findall(value.lower()):
+        words.add(word)
+        if '/' in word:
+            words.update(part for part in word.split('/') if part)
+    return words
+
+
+def fileTokens(text: str) -> list:
+    # "section.key=" and "key=" for every assignment, "key=word" and "word"
+    # for every word of its value
+    tokens = set()
+    for section, keys in parseUnitText(text).sections.items():
+        section = section.lower()
+        for key, values in keys.items():
+            key = key.lower()
+            tokens.add(f'{section}.{key}=')
+            tokens.add(key + '=')
+            for value in values:
+                for word in valueWords(value):
+                    tokens.add(word)
+                    tokens.add(f'{key}={word}')
+    return sorted(tokens)
+
+
+def readText(path: str, size: int) -> Union[str, None]:
+    try:
+        with open(path, 'rb') as f:
+            if size < MMAP_THRESHOLD:
+                return f.read().decode(errors='replace')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[:].decode(errors='replace')
+    except (OSError, ValueError):
+        return None
+
+
+def isUnitFileName(name: str) -> bool:
+    prefix, dot, suffix = name.rpartition('.')
+    return bool(dot and prefix and suffix not in ('d', 'wants', 'requires', 'upholds'))
+
+
+def scanUnitFiles(searchPaths: tuple) -> dict:
+    # {path: (mtime, size, owner)} for every fragment and drop-in; a name
+    # higher up the search path hides the same name further down, like it
+    # does for systemd
+    found = {}
+    seen = set()
+    for basePath in searchPaths:
+        try:
+            entries = list(os.scandir(basePath))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if not entry.name.endswith('.d'):
+                        continue
+                    owner = entry.name[:-2]
+                    for dropIn in os.scandir(entry.path):
+                        if dropIn.name.endswith('.conf') and (owner, dropIn.name) not in seen and dropIn.is_file():
+                            seen.add((owner, dropIn.name))
+                            stat = dropIn.stat()
+                            found[dropIn.path] = (stat.st_mtime_ns, stat.st_size, owner)
+                elif isUnitFileName(entry.name) and entry.name not in seen and entry.is_file():
+                    seen.add(entry.name)
+                    stat = entry.stat()
+                    found[entry.path] = (stat.st_mtime_ns, stat.st_size, entry.name)
+            except OSError:
+                continue
+    return found
+
+
+class ContentIndex:
+    # files maps every indexed path to (mtime, size, owner, tokens), the
+    # postings map tokens to the owners whose files contain them. Updating
+    # builds a new index, so a search never sees one half done.
+    def __init__(self, files: Union[dict, None] = None):
+        self.files = files or {}
+        self.postings = {}
+        for path, (_, _, owner, tokens) in self.files.items():
+            for token in tokens:
+                owners = self.postings.get(token)
+                if owners is None:
+                    self.postings[token] = {owner}
+                else:
+                    owners.add(owner)
+        self._vocabulary = None
+        self._positions = (None, {})
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def _prefixed(self, prefix: str) -> set:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        owners = set()
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            owners |= self.postings[token]
+        return owners
+
+    def _lookup(self, token: str) -> set:
+        if token.endswith('*'):
+            return self._prefixed(token[:-1])
+        return self.postings.get(token, set())
+
+    def _termOwners(self, term: str) -> set:
+        match = QUERY_TERM.match(term)
+        if match is None:
+            return self._lookup(term)
+        key = match.group('key')
+        owners = None
+        if match.group('section'):
+            owners = self._lookup(f'{match.group("section")}.{key}=')
+        # no value at all stands for the key being set
+        for word in valueWords(match.group('value')) or {''}:
+            found = self._lookup(f'{key}={word}')
+            owners = found if owners is None else owners & found
+        return owners
+
+    @timed('search')
+    def search(self, query: str) -> set:
+        # the owners whose files match every term of the query
+        result = None
+        for term in query.lower().split():
+            owners = self._termOwners(term)
+            result = owners if result is None else result & owners
+            if not result:
+                return set()
+        return result or set()
+
+    def ownersChangedSince(self, seconds: float) -> set:
+        # the owners of files modified after seconds since the epoch
+        since = int(seconds * 1e9)
+        return {owner for mtime, _, owner, _ in self.files.values() if mtime > since}
+
+    def unitsMatching(self, query: str, names: list) -> list:
+        # positions in names of the units any matching file applies to
+        owners = self.search(query)
+        if not owners:
+            return []
+        if self._positions[0] is not names:
+            self._positions = (names, {name: row for row, name in enumerate(names)})
+        return ownerRows(owners, names, self._positions[1])
+
+
+@timed('worker')
+def updateContentIndex(previous: Union[ContentIndex, None] = None, searchPaths: Union[tuple, None] = None,
+                       path: Union[str, None] = None) -> ContentIndex:
+    # rereads only the files whose mtime or size changed since previous (or
+    # the copy saved by the last run) and saves the result
+    searchPaths = searchPaths or unitfile.UNIT_PATHS
+    if previous is None:
+        previous = loadContentIndex(path) or ContentIndex()
+    files = {}
+    for filePath, (mtime, size, owner) in scanUnitFiles(searchPaths).items():
+        known = previous.files.get(filePath)
+        if known is not None and known[0] == mtime and known[1] == size and known[2] == owner:
+            files[filePath] = known
+            continue
+        text = readText(filePath, size)
+        if text is not None:
+            files[filePath] = (mtime, size, owner, fileTokens(text))
+    if files.keys() == previous.files.keys() and all(files[key] is previous.files[key] for key in files):
+        return previous
+    index = ContentIndex(files)
+    saveContentIndex(index, path)
+    return index
+
+
+def saveContentIndex(index: ContentIndex, path: Union[str, None] = None):
+    path = path or contentIndexPath()
+    data = {'version': CONTENT_INDEX_VERSION, 'files': index.files}
+    payload = zlib.compress(json.dumps(data, separators=(',', ':')).encode(), 1)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(payload)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+
+
+def loadContentIndex(path: Union[str, None] = None) -> Union[ContentIndex, None]:
+    path = path or contentIndexPath()
+    try:
+        with open(path, 'rb') as f:
+            data = json.loads(zlib.decompress(f.read()))
+    except (OSError, ValueError, zlib.error):
+        return None
+    if not isinstance(data, dict) or data.get('version') != CONTENT_INDEX_VERSION:
+        return None
+    return ContentIndex({filePath: tuple(entry) for filePath, entry in data['files'].items()})
@@ -0,0 +1,200 @@
+# This Python file uses the following encoding: utf-8
+import concurrent.futures
+from typing import Iterator, Union
+
+from units import Unit, UnitType, diffUnits, unitTypeOf
+from backend import BULK_ACTIONS, Backend, loadUnits
+from properties import DETAIL_PROPERTIES, PropertiesCache
+from search import UnitSearchIndex
+from contentindex import updateContentIndex
+from unitfile import loadUnitSettings
+from snapshot import saveSnapshot
+from instrumentation import timed
+
+BATCH_SIZE = 500
+PARALLEL_BATCHES = 4
+# what a row of the unit list shows
+LIST_PROPERTIES = ('Description', 'UnitFileState', 'LoadState', 'ActiveState', 'SubState')
+# names of the unit fields on the command line
+STATE_FIELDS = {'load': 'loadState', 'active': 'activeState', 'sub': 'subState', 'enabled': 'unitFileState'}
+
+
+def filterRows(units: list, rows: Union[list, range], unitType: UnitType = UnitType.ALL,
+               fieldFilters: Union[dict, None] = None) -> list:
+    # rows of units of the given type whose fields hold one of the accepted
+    # values, fieldFilters maps Unit attributes to sets of values
+    if unitType != UnitType.ALL:
+        rows = [row for row in rows if units[row].unitType == unitType]
+    for field, values in (fieldFilters or {}).items():
+        rows = [row for row in rows if getattr(units[row], field) in values]
+    return list(rows)
+
+
+@timed('worker')
+def refreshUnits(backend: Backend, current: list, scope: Union[str, None] = None) -> tuple:
+    # a fresh unit list, how it differs from current and its search index;
+    # the list is also kept as the snapshot for scope unless scope is None
+    fresh = loadUnits(backend)
+    if scope is not None:
+        saveSnapshot(fresh, scope)
+    return fresh, diffUnits(current, fresh), UnitSearchIndex(fresh)
+
+
+@timed('worker')
+def refreshNamedUnits(backend: Backend, current: list, names: list) -> tuple:
+    # like refreshUnits for the units systemd announced or dropped, the rest
+    # of current is kept as it is; names are handed back with the result.
+    # A name is dropped when systemd knows nothing about it any more.
+    properties = backend.getProperties(names, LIST_PROPERTIES)
+    units = {unit.name: unit for unit in current}
+    for name in names:
+        values = properties.get(name)
+        if values is None or (values.get('LoadState') == 'not-found' and values.get('ActiveState') == 'inactive'):
+            units.pop(name, None)
+        else:
+            units[name] = Unit(name, unitTypeOf(name), values.get('Description', ''), values.get('UnitFileState', ''),
+                               values.get('LoadState', ''), values.get('ActiveState', ''), values.get('SubState', ''))
+    fresh = sorted(units.values(), key=lambda x: x.name)
+    return fresh, diffUnits(current, fresh), UnitSearchIndex(fresh), names
+
+
+@timed('worker')
+def fetchUnitDetails(backend: Backend, name: str) -> Union[tuple, None]:
+    properties = backend.getProperties([name]).get(name)
+    if properties is None:
+        return None
+    return properties, loadUnitSettings(name, properties.get('FragmentPath'))
+
+
+@timed('worker')
+def checkDaemonReload(backend: Backend, names: list) -> tuple:
+    # (names checked, those whose files changed since systemd loaded them)
+    stale = set()
+    for start in range(0, len(names), BATCH_SIZE):
+        properties = backend.getProperties(names[start:start + BATCH_SIZE], ('NeedDaemonReload',))
+        stale.update(name for name, values in properties.items() if values.get('NeedDaemonReload') == 'yes')
+    return set(names), stale
+
+
+@timed('worker')
+def buildGraph(backend: Backend, names: list) -> tuple:
+    from depgraph import buildDependencyGraph
+    graph = buildDependencyGraph(backend, names)
+    return graph, graph.findCycles()
+
+
+class UnitEngine:
+    # The unit list of one backend and everything done with it, without any
+    # GUI: the window and cli.py are both clients of this. Methods that talk
+    # to the backend block; the window runs the module level functions above
+    # on its executor and hands the results back here.
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        self.units = []
+        self.searchIndex = UnitSearchIndex([])
+        self.propertiesCache = PropertiesCache()
+        self.settingsCache = PropertiesCache()
+        self.contentIndex = None
+        self._names = None
+
+    def load(self, scope: Union[str, None] = None):
+        fresh, _, searchIndex = refreshUnits(self.backend, self.units, scope)
+        self.setUnits(fresh, searchIndex)
+
+    def setUnits(self, units: list, searchIndex: Union[UnitSearchIndex, None] = None):
+        self.units = units
+        self.searchIndex = searchIndex or UnitSearchIndex(units)
+        self._names = None
+        self.invalidate()
+
+    def loadContentIndex(self):
+        # blocking; the window runs updateContentIndex on its executor and
+        # sets contentIndex itself
+        self.contentIndex = updateContentIndex(self.contentIndex)
+
+    def invalidate(self, name: Union[str, None] = None):
+        self.propertiesCache.invalidate(name)
+        self.settingsCache.invalidate(name)
+
+    def matchingRows(self, text: str = '', fuzzy: bool = False, descriptions: bool = False) -> Union[list, None]:
+        # None when the text does not filter anything out
+        return self.searchIndex.search(text, fuzzy=fuzzy, descriptions=descriptions)
+
+    def contentRows(self, query: str) -> list:
+        # rows of the units whose files match, see contentindex; nothing
+        # matches before the index is there
+        if self.contentIndex is None:
+            return []
+        return self.contentIndex.unitsMatching(query, self.unitNames())
+
+    def unitNames(self) -> list:
+        # the same list object until the units change
+        if self._names is None:
+            self._names = [unit.name for unit in self.units]
+        return self._names
+
+    def select(self, unitType: UnitType = UnitType.ALL, text: str = '', fuzzy: bool = False,
+               descriptions: bool = False, fieldFilters: Union[dict, None] = None,
+               content: Union[str, None] = None) -> list:
+        rows = self.matchingRows(text, fuzzy, descriptions)
+        rows = range(len(self.units)) if rows is None else rows
+        if content:
+            matching = set(self.contentRows(content))
+            rows = [row for row in rows if row in matching]
+        return [self.units[row] for row in filterRows(self.units, rows, unitType, fieldFilters)]
+
+    def cachedDetails(self, name: str) -> Union[tuple, None]:
+        properties = self.propertiesCache.get(name)
+        settings = self.settingsCache.get(name)
+        if properties is None or settings is None:
+            return None
+        return properties, settings
+
+    def storeDetails(self, name: str, properties: dict, settings):
+        self.propertiesCache.put(name, properties)
+        self.settingsCache.put(name, settings)
+
+    def applySystemdChanges(self, changes) -> set:
+        # keeps the cached properties in line with a monitor.SystemdChanges
+        # batch and returns the units whose details need reloading
+        affected = changes.newUnits | changes.removedUnits | changes.invalidated
+        for name in affected:
+            self.propertiesCache.invalidate(name)
+        for name, values in changes.properties.items():
+            cached = self.propertiesCache.get(name)
+            if cached is not None:
+                cached.update((key, value) for key, value in values.items() if key in cached)
+        return affected | set(changes.properties)
+
+    def streamProperties(self, names: list, properties: tuple = DETAIL_PROPERTIES, batchSize: int = BATCH_SIZE,
+                         parallel: int = PARALLEL_BATCHES) -> Iterator[tuple]:
+        # (name, properties) for every name, a batch of names per backend
+        # call and up to `parallel` calls at once; batches are handed out as
+        # they complete, so the order is not kept. Names the backend knows
+        # nothing about come back with None.
+        batches = [names[start:start + batchSize] for start in range(0, len(names), batchSize)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, parallel),
+                                                   thread_name_prefix='properties') as pool:
+            pending = {}
+            for batch in batches:
+                pending[pool.submit(self.backend.getProperties, batch, properties)] = batch
+                if len(pending) < parallel:
+                    continue
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield from self._batchResult(pending.pop(future), future)
+            for future in concurrent.futures.as_completed(pending):
+                yield from self._batchResult(pending[future], future)
+
+    @staticmethod
+    def _batchResult(batch: list, future) -> Iterator[tuple]:
+        values = future.result()
+        for name in batch:
+            yield name, values.get(name)
+
+    def runAction(self, action: str, names: list) -> dict:
+        # {name: (succeeded, detail)}, see Backend.bulkAction; may run on a
+        # worker, so the caller invalidates the cached details afterwards
+        if action not in BULK_ACTIONS:
+            raise ValueError(f'unknown action: {action}')
+        return self.backend.bulkAction(action, names)
@@ -0,0 +1,97 @@
+# This Python file uses the following encoding: utf-8
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from instrumentation import recorder
+
+REFRESH_MS = 500
+COLUMNS = ('Span', 'Calls', 'Total ms', 'p50 ms', 'p95 ms', 'Max ms')
+
+
+class DebugPanel(QWidget):
+    # Live view of the recorder: per span counters and percentiles, plus
+    # the switch to start recording and the Chrome trace export
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle('Instrumentation')
+        self.resize(720, 480)
+        self.recordBox = QCheckBox('Record', self)
+        self.recordBox.setChecked(recorder.enabled)
+        self.recordBox.toggled.connect(self.setRecording)
+        self.resetButton = QPushButton('Reset', self)
+        self.resetButton.clicked.connect(self.reset)
+        self.exportButton = QPushButton('Export trace...', self)
+        self.exportButton.clicked.connect(self.exportTrace)
+        self.summaryLabel = QLabel(self)
+        self.table = QTableWidget(0, len(COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.recordBox)
+        buttons.addStretch(1)
+        buttons.addWidget(self.resetButton)
+        buttons.addWidget(self.exportButton)
+        layout = QVBoxLayout(self)
+        layout.addLayout(buttons)
+        layout.addWidget(self.summaryLabel)
+        layout.addWidget(self.table, 1)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def setRecording(self, enabled: bool):
+        recorder.enabled = enabled
+        self.refresh()
+
+    def reset(self):
+        recorder.reset()
+        self.refresh()
+
+    def exportTrace(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Export trace', 'systemdGUI-trace.json', 'JSON (*.json)')
+        if path:
+            recorder.exportChromeTrace(path)
+
+    def refresh(self):
+        rows = recorder.statistics()
+        commands = [row for row in rows if row[1] == 'command']
+        self.summaryLabel.setText(
+            f'{"recording" if recorder.enabled else "not recording"}, '
+            f'{sum(row[2] for row in commands)} commands taking {sum(row[3] for row in commands) * 1000:.0f} ms, '
+            f'{recorder.commandBytes / 1024:.0f} KiB of output, {len(recorder.events)} events')
+        self.table.setRowCount(len(rows))
+        for i, (name, category, count, total, p50, p95, longest) in enumerate(rows):
+            values = (f'{name} ({category})', str(count), f'{total * 1000:.1f}', f'{p50 * 1000:.2f}',
+                      f'{p95 * 1000:.2f}', f'{longest * 1000:.2f}')
+            for column, value in enumerate(values):
+                item = self.table.item(i, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if column:
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    self.table.setItem(i, column, item)
+                item.setText(value)
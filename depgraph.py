@@ -0,0 +1,170 @@
+# This Python file uses the following encoding: utf-8
+from instrumentation import timed
+
+
+# Dependencies that make a unit pull another one into the transaction
+PULL_DEPENDENCIES = ('Requires', 'Requisite', 'Wants', 'BindsTo', 'Upholds')
+# Dependencies that make a unit stop when the unit it refers to stops
+# (PartOf is handled the same way: stopping the target stops the unit)
+STOP_DEPENDENCIES = ('Requires', 'Requisite', 'BindsTo', 'PartOf')
+ORDERING_DEPENDENCIES = ('After', 'Before')
+GRAPH_PROPERTIES = tuple(sorted(set(PULL_DEPENDENCIES + STOP_DEPENDENCIES + ORDERING_DEPENDENCIES
+                                    + ('Conflicts',))))
+
+
+class DependencyGraph:
+    # Forward and reverse adjacency per dependency kind, built from the
+    # properties of all units in one pass
+    def __init__(self, properties: dict):
+        self.forward = {kind: {} for kind in GRAPH_PROPERTIES}
+        self.reverse = {kind: {} for kind in GRAPH_PROPERTIES}
+        for name, values in properties.items():
+            for kind in GRAPH_PROPERTIES:
+                value = values.get(kind)
+                if not value:
+                    continue
+                targets = tuple(value.split())
+                self.forward[kind][name] = targets
+                reverse = self.reverse[kind]
+                for target in targets:
+                    sources = reverse.get(target)
+                    if sources is None:
+                        reverse[target] = [name]
+                    else:
+                        sources.append(name)
+        self.units = set(properties)
+        self._stopImpact = {}
+        self._ordering = None
+
+    def dependencies(self, name: str, kinds: tuple = PULL_DEPENDENCIES) -> list:
+        result = []
+        for kind in kinds:
+            result.extend(self.forward[kind].get(name, ()))
+        return result
+
+    def dependents(self, name: str, kinds: tuple = PULL_DEPENDENCIES) -> list:
+        result = []
+        for kind in kinds:
+            result.extend(self.reverse[kind].get(name, ()))
+        return result
+
+    def pulledInBy(self, name: str) -> dict:
+        # direct answers to "what pulls this in", per dependency kind
+        return {kind: list(self.reverse[kind].get(name, ())) for kind in PULL_DEPENDENCIES
+                if name in self.reverse[kind]}
+
+    def stopImpact(self, name: str) -> frozenset:
+        # Every unit that systemd would stop too when `name` stops, computed
+        # on first use and memoized; closures already known for dependents
+        # are reused instead of walked again
+        cached = self._stopImpact.get(name)
+        if cached is not None:
+            return cached
+        seen = {name}
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            for dependent in self.dependents(current, STOP_DEPENDENCIES):
+                if dependent not in seen and dependent not in self._stopImpact:
+                    seen.add(dependent)
+                    stack.append(dependent)
+                elif dependent in self._stopImpact:
+                    seen.add(dependent)
+                    seen.update(self._stopImpact[dependent])
+        seen.discard(name)
+        result = frozenset(seen)
+        self._stopImpact[name] = result
+        return result
+
+    def _orderingEdges(self) -> dict:
+        # "A After=B" and "B Before=A" both mean B starts before A
+        if self._ordering is None:
+            edges = {}
+            for name, targets in self.forward['After'].items():
+                edges.setdefault(name, set()).update(targets)
+            for name, targets in self.forward['Before'].items():
+                for target in targets:
+                    edges.setdefault(target, set()).add(name)
+            self._ordering = edges
+        return self._ordering
+
+    @timed('worker')
+    def findCycles(self) -> list:
+        # Ordering cycles are strongly connected components of the ordering
+        # graph; iterative Tarjan so that deep chains don't hit the recursion limit
+        edges = self._orderingEdges()
+        index = {}
+        lowLink = {}
+        onStack = set()
+        stack = []
+        cycles = []
+        counter = 0
+        for root in edges:
+            if root in index:
+                continue
+            work = [(root, iter(edges.get(root, ())))]
+            index[root] = lowLink[root] = counter
+            counter += 1
+            stack.append(root)
+            onStack.add(root)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index:
+                        index[child] = lowLink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        onStack.add(child)
+                        work.append((child, iter(edges.get(child, ()))))
+                        advanced = True
+                        break
+                    if child in onStack:
+                        lowLink[node] = min(lowLink[node], index[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowLink[parent] = min(lowLink[parent], lowLink[node])
+                if lowLink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        onStack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in edges.get(node, ()):
+                        cycles.append(sorted(component))
+        return cycles
+
+    def neighbourhood(self, name: str, depth: int = 2, kinds: tuple = PULL_DEPENDENCIES) -> tuple:
+        # Breadth-first layers around `name`: negative layers hold units that
+        # pull it in, positive layers the units it pulls in
+        layers = {name: 0}
+        edges = []
+        for direction in (1, -1):
+            frontier = [name]
+            for distance in range(1, depth + 1):
+                following = []
+                for current in frontier:
+                    if direction > 0:
+                        neighbours = self.dependencies(current, kinds)
+                    else:
+                        neighbours = self.dependents(current, kinds)
+                    for neighbour in neighbours:
+                        edges.append((current, neighbour) if direction > 0 else (neighbour, current))
+                        if neighbour not in layers:
+                            layers[neighbour] = direction * distance
+                            following.append(neighbour)
+                frontier = following
+        return layers, edges
+
+
+@timed('worker')
+def buildDependencyGraph(backend, names: list, chunkSize: int = 1000) -> DependencyGraph:
+    properties = {}
+    for start in range(0, len(names), chunkSize):
+        properties.update(backend.getProperties(names[start:start + chunkSize], GRAPH_PROPERTIES))
+    return DependencyGraph(properties)
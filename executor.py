@@ -0,0 +1,99 @@
+# This Python file uses the following encoding: utf-8
+from typing import Callable, Union
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class _TaskSignals(QObject):
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class _Task(QRunnable):
+    def __init__(self, requestId: int, fn: Callable, args: tuple, signals: _TaskSignals):
+        super().__init__()
+        self.requestId = requestId
+        self.fn = fn
+        self.args = args
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.requestId, str(e))
+            return
+        self.signals.finished.emit(self.requestId, result)
+
+
+class CommandExecutor(QObject):
+    # Runs blocking backend calls on a thread pool. Every request is submitted
+    # under a key ("selection", "list", "action:<unit>", ...); submitting again
+    # under the same key supersedes the previous request, whose result is then
+    # dropped instead of being delivered to the GUI.
+    busyChanged = Signal(str, bool)
+
+    def __init__(self, parent=None, maxThreads: int = 4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(maxThreads)
+        self._nextId = 0
+        self._latest = {}
+        self._requests = {}
+        self._signals = _TaskSignals(self)
+        self._signals.finished.connect(self._onFinished)
+        self._signals.failed.connect(self._onFailed)
+
+    def submit(self, key: str, fn: Callable, *args,
+               onResult: Union[Callable, None] = None,
+               onError: Union[Callable, None] = None) -> int:
+        self._takePending(key)
+        self._nextId += 1
+        requestId = self._nextId
+        task = _Task(requestId, fn, args, self._signals)
+        task.setAutoDelete(False)
+        wasBusy = key in self._latest
+        self._latest[key] = requestId
+        self._requests[requestId] = (key, task, onResult, onError)
+        self.pool.start(task)
+        if not wasBusy:
+            self.busyChanged.emit(key, True)
+        return requestId
+
+    def cancel(self, key: str):
+        # a request that already runs cannot be interrupted, its result is
+        # simply ignored once it arrives
+        self._takePending(key)
+        if self._latest.pop(key, None) is not None:
+            self.busyChanged.emit(key, False)
+
+    def isBusy(self, key: str) -> bool:
+        return key in self._latest
+
+    def _takePending(self, key: str):
+        requestId = self._latest.get(key)
+        if requestId is None:
+            return
+        request = self._requests.get(requestId)
+        if request is not None and self.pool.tryTake(request[1]):
+            del self._requests[requestId]
+
+    def _complete(self, requestId: int) -> Union[tuple, None]:
+        request = self._requests.pop(requestId, None)
+        if request is None:
+            return None
+        key = request[0]
+        if self._latest.get(key) != requestId:
+            return None
+        del self._latest[key]
+        self.busyChanged.emit(key, False)
+        return request
+
+    def _onFinished(self, requestId: int, result: object):
+        request = self._complete(requestId)
+        if request is not None and request[2] is not None:
+            request[2](result)
+
+    def _onFailed(self, requestId: int, message: str):
+        request = self._complete(requestId)
+        if request is not None and request[3] is not None:
+            request[3](message)
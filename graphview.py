@@ -0,0 +1,96 @@
+# This Python file uses the following encoding: utf-8
+from PySide6.QtCore import QLineF, QPointF, Qt, QTimer, Signal
+from PySide6.QtGui import QBrush, QColor, QPainter, QPen
+from PySide6.QtWidgets import QGraphicsScene, QGraphicsView
+
+from depgraph import DependencyGraph
+
+NODE_WIDTH = 220
+NODE_HEIGHT = 24
+LAYER_SPACING = 280
+ROW_SPACING = 34
+ITEMS_PER_TICK = 200
+
+
+class DependencyGraphView(QGraphicsView):
+    # Draws the neighbourhood of one unit in layers: the units that pull it
+    # in on the left, the ones it pulls in on the right. Large neighbourhoods
+    # are added to the scene in chunks from a timer so the GUI stays live.
+    unitActivated = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setScene(QGraphicsScene(self))
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._addChunk)
+        self._pending = []
+        self._positions = {}
+        self._selected = None
+
+    def showUnit(self, graph: DependencyGraph, name: str, depth: int = 2):
+        self._timer.stop()
+        self.scene().clear()
+        self.resetTransform()
+        layers, edges = graph.neighbourhood(name, depth)
+        byLayer = {}
+        for unit, layer in sorted(layers.items(), key=lambda item: (abs(item[1]), item[0])):
+            byLayer.setdefault(layer, []).append(unit)
+        self._positions = {}
+        for layer, members in byLayer.items():
+            top = -len(members) * ROW_SPACING / 2
+            for i, unit in enumerate(members):
+                self._positions[unit] = QPointF(layer * LAYER_SPACING, top + i * ROW_SPACING)
+        # nodes closest to the selected unit first, edges once their ends exist
+        self._pending = [('node', unit) for members in byLayer.values() for unit in members]
+        self._pending += [('edge', edge) for edge in dict.fromkeys(edges)]
+        self._pending.reverse()
+        self._selected = name
+        self._addChunk()
+        self.centerOn(self._positions[name])
+        if self._pending:
+            self._timer.start()
+
+    def _addChunk(self):
+        scene = self.scene()
+        for _ in range(min(ITEMS_PER_TICK, len(self._pending))):
+            kind, value = self._pending.pop()
+            if kind == 'node':
+                position = self._positions[value]
+                brush = QBrush(QColor('#cfe3ff') if value == self._selected else QColor('#f2f2f2'))
+                rect = scene.addRect(position.x() - NODE_WIDTH / 2, position.y() - NODE_HEIGHT / 2,
+                                     NODE_WIDTH, NODE_HEIGHT, QPen(QColor('#777777')), brush)
+                rect.setData(0, value)
+                rect.setToolTip(value)
+                text = scene.addSimpleText(value)
+                text.setParentItem(rect)
+                bounds = text.boundingRect()
+                text.setPos(position.x() - min(bounds.width(), NODE_WIDTH - 8) / 2,
+                            position.y() - bounds.height() / 2)
+            else:
+                source, target = value
+                start = self._positions[source] + QPointF(NODE_WIDTH / 2, 0)
+                end = self._positions[target] - QPointF(NODE_WIDTH / 2, 0)
+                line = scene.addLine(QLineF(start, end), QPen(QColor('#999999')))
+                line.setZValue(-1)
+        if not self._pending:
+            self._timer.stop()
+
+    def mouseDoubleClickEvent(self, event):
+        item = self.itemAt(event.position().toPoint())
+        while item is not None and item.data(0) is None:
+            item = item.parentItem()
+        if item is not None:
+            self.unitActivated.emit(item.data(0))
+            return
+        super().mouseDoubleClickEvent(event)
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            factor = 1.15 if event.angleDelta().y() > 0 else 1 / 1.15
+            self.scale(factor, factor)
+            return
+        super().wheelEvent(event)
@@ -0,0 +1,112 @@
+# This Python file uses the following encoding: utf-8
+import collections
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Callable, Union
+
+MAX_EVENTS = 200000
+MAX_SAMPLES = 2000
+
+
+class Recorder:
+    # Collects timed spans from the GUI thread and the workers: backend
+    # commands with their arguments, and the time spent in slots and model
+    # updates. Nothing is recorded while `enabled` is off, which is the only
+    # thing the instrumented code checks.
+    def __init__(self):
+        self.enabled = bool(os.environ.get('SYSTEMDGUI_TRACE'))
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.events = collections.deque(maxlen=MAX_EVENTS)
+            self.samples = {}
+            self.counts = collections.Counter()
+            self.totals = collections.Counter()
+            self.categories = {}
+            self.commandBytes = 0
+            self.threadNames = {}
+
+    def record(self, name: str, category: str, start: float, duration: float, args: Union[dict, None] = None):
+        thread = threading.current_thread()
+        with self._lock:
+            self.events.append((name, category, start, duration, thread.ident, args))
+            self.threadNames[thread.ident] = thread.name
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = collections.deque(maxlen=MAX_SAMPLES)
+                self.categories[name] = category
+            samples.append(duration)
+            self.counts[name] += 1
+            self.totals[name] += duration
+            if args and 'bytes' in args:
+                self.commandBytes += args['bytes']
+
+    def recordCommand(self, argv: list, start: float, duration: float, returncode: int, outputBytes: int):
+        self.record(os.path.basename(argv[0]) + ' ' + (argv[1] if len(argv) > 1 else ''), 'command',
+                    start, duration, {'argv': list(argv), 'exit': returncode, 'bytes': outputBytes})
+
+    def statistics(self) -> list:
+        # (name, category, calls, total, p50, p95, max) per span name,
+        # largest total first; percentiles cover the last MAX_SAMPLES calls
+        with self._lock:
+            items = [(name, self.categories[name], self.counts[name], self.totals[name], sorted(samples))
+                     for name, samples in self.samples.items()]
+        rows = []
+        for name, category, count, total, ordered in items:
+            rows.append((name, category, count, total, ordered[len(ordered) // 2],
+                         ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], ordered[-1]))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def chromeTrace(self) -> dict:
+        # the Trace Event Format understood by chrome://tracing and Perfetto
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            threadNames = dict(self.threadNames)
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in threadNames.items()]
+        for name, category, start, duration, tid, args in events:
+            event = {'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': tid,
+                     'ts': (start - self._origin) * 1e6, 'dur': duration * 1e6}
+            if args:
+                event['args'] = args
+            trace.append(event)
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def exportChromeTrace(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.chromeTrace(), f)
+
+
+recorder = Recorder()
+
+
+def timed(category: str = 'slot') -> Callable:
+    # Records every call of the decorated function as a span named after it.
+    # Like Qt does for slots, surplus signal arguments are dropped when the
+    # function takes fewer.
+    def decorator(fn: Callable) -> Callable:
+        name = fn.__qualname__
+        code = fn.__code__
+        maxArgs = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            args = args[:maxArgs]
+            if not recorder.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                recorder.record(name, category, start, time.perf_counter() - start)
+        return wrapper
+    return decorator
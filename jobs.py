@@ -0,0 +1,131 @@
+# This Python file uses the following encoding: utf-8
+import time
+from typing import Union
+
+from backend import BULK_ACTIONS
+
+PENDING = 'pending'
+# handed to the backend, systemd has not answered yet
+SENDING = 'sending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELED = 'canceled'
+ACTIVE_STATES = (PENDING, SENDING, RUNNING)
+# actions of one kind undo each other, a later one replaces an earlier
+# one that has not been sent yet
+ACTION_KINDS = {'start': 'run', 'stop': 'run', 'restart': 'run', 'enable': 'file', 'disable': 'file'}
+
+
+class Job:
+    # One action on one unit as queued by the operator. jobId is the
+    # backend's handle once systemd took it, see Backend.enqueueJobs
+    __slots__ = ('number', 'name', 'action', 'state', 'detail', 'jobId', 'queued', 'finished',
+                 'cancelRequested')
+
+    def __init__(self, number: int, name: str, action: str):
+        self.number = number
+        self.name = name
+        self.action = action
+        self.state = PENDING
+        self.detail = ''
+        self.jobId = None
+        self.queued = time.time()
+        self.finished = None
+        self.cancelRequested = False
+
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+
+class JobQueue:
+    # Unit actions in the order they were asked for. The actions on one
+    # unit are sent one after the other, different units do not wait for
+    # each other. Finished jobs stay listed until cleared.
+    def __init__(self):
+        self.jobs = []
+        self._nextNumber = 1
+
+    def add(self, action: str, names: list) -> list:
+        # the jobs queued; a pending job of the same kind on the same unit
+        # is replaced (start then stop is a stop), the same action twice
+        # is queued once
+        if action not in BULK_ACTIONS:
+            raise ValueError(f'unknown action: {action}')
+        added = []
+        pending = {(job.name, ACTION_KINDS[job.action]): job for job in self.jobs if job.state == PENDING}
+        for name in names:
+            earlier = pending.get((name, ACTION_KINDS[action]))
+            if earlier is not None:
+                if earlier.action == action:
+                    continue
+                self._finish(earlier, CANCELED, f'replaced by {action}')
+            job = Job(self._nextNumber, name, action)
+            self._nextNumber += 1
+            self.jobs.append(job)
+            pending[(name, ACTION_KINDS[action])] = job
+            added.append(job)
+        return added
+
+    def takeReady(self) -> dict:
+        # {action: [job]} for the first pending job of every unit without a
+        # job in systemd; they are sending from here on
+        busy = {job.name for job in self.jobs if job.state in (SENDING, RUNNING)}
+        ready = {}
+        for job in self.jobs:
+            if job.state == PENDING and job.name not in busy:
+                busy.add(job.name)
+                job.state = SENDING
+                ready.setdefault(job.action, []).append(job)
+        return ready
+
+    def accept(self, job: Job, jobId):
+        # systemd took the job
+        job.state = RUNNING
+        job.jobId = jobId
+
+    def running(self) -> list:
+        return [job for job in self.jobs if job.state == RUNNING]
+
+    def busyUnits(self) -> set:
+        return {job.name for job in self.jobs if job.active()}
+
+    def activeCount(self) -> int:
+        return sum(job.active() for job in self.jobs)
+
+    def finish(self, job: Job, succeeded: bool, detail: str):
+        if not job.active():
+            return
+        if succeeded:
+            self._finish(job, DONE, detail)
+        elif job.cancelRequested:
+            self._finish(job, CANCELED, 'canceled while running')
+        else:
+            self._finish(job, FAILED, detail)
+
+    def _finish(self, job: Job, state: str, detail: str):
+        job.state = state
+        job.detail = detail
+        job.finished = time.time()
+
+    def cancel(self, job: Job) -> bool:
+        # True when the job never left the queue; a running one has to be
+        # cancelled in systemd, it is marked so its failure reads as such
+        if job.state == PENDING:
+            self._finish(job, CANCELED, 'canceled before it was sent')
+            return True
+        if job.state in (SENDING, RUNNING):
+            job.cancelRequested = True
+        return False
+
+    def clearFinished(self):
+        self.jobs = [job for job in self.jobs if job.active()]
+
+    def counts(self) -> dict:
+        counts = {}
+        for job in self.jobs:
+            counts[job.state] = counts.get(job.state, 0) + 1
+        return counts
+
+    def jobFor(self, name: str, state: str = RUNNING) -> Union[Job, None]:
+        return next((job for job in self.jobs if job.name == name and job.state == state), None)
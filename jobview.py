@@ -0,0 +1,130 @@
+# This Python file uses the following encoding: utf-8
+import time
+from typing import Union
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (QHBoxLayout, QHeaderView, QLabel, QPushButton, QTableView, QVBoxLayout,
+                               QWidget)
+
+from jobs import CANCELED, FAILED, RUNNING, Job
+
+DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+FOREGROUND_ROLE = Qt.ItemDataRole.ForegroundRole
+STATE_COLORS = {FAILED: QColor('#c9302c'), CANCELED: QColor('#777777')}
+
+
+def formatClock(seconds: Union[float, None]) -> str:
+    return '' if seconds is None else time.strftime('%H:%M:%S', time.localtime(seconds))
+
+
+class JobTableModel(QAbstractTableModel):
+    # The jobs of a jobs.JobQueue in queue order. The queue only appends
+    # until finished jobs are cleared, so an update is a row insertion and
+    # one dataChanged, and the selection stays put
+    HEADERS = ('#', 'Unit', 'Action', 'State', 'Queued', 'Finished', 'Detail')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = []
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.jobs)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def jobAt(self, row: int) -> Job:
+        return self.jobs[row]
+
+    def data(self, index, role=DISPLAY_ROLE):
+        if not index.isValid():
+            return None
+        job = self.jobs[index.row()]
+        column = index.column()
+        if role == DISPLAY_ROLE:
+            if column == 0:
+                return str(job.number)
+            if column == 1:
+                return job.name
+            if column == 2:
+                return job.action
+            if column == 3:
+                return 'canceling' if job.cancelRequested and job.state == RUNNING else job.state
+            if column == 4:
+                return formatClock(job.queued)
+            if column == 5:
+                return formatClock(job.finished)
+            return job.detail
+        if role == FOREGROUND_ROLE and column == 3:
+            return STATE_COLORS.get(job.state)
+        return None
+
+    def headerData(self, section: int, orientation, role=DISPLAY_ROLE):
+        if role == DISPLAY_ROLE and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def setJobs(self, jobs: list):
+        known = len(self.jobs)
+        if known <= len(jobs) and all(a is b for a, b in zip(self.jobs, jobs)):
+            if len(jobs) > known:
+                self.beginInsertRows(QModelIndex(), known, len(jobs) - 1)
+                self.jobs = list(jobs)
+                self.endInsertRows()
+            if known:
+                self.dataChanged.emit(self.index(0, 0), self.index(known - 1, len(self.HEADERS) - 1))
+            return
+        self.beginResetModel()
+        self.jobs = list(jobs)
+        self.endResetModel()
+
+
+class JobView(QWidget):
+    # The jobs tab: everything queued with its state, cancel for the
+    # selected jobs and clearing of the finished ones
+    unitActivated = Signal(str)
+    cancelRequested = Signal(list)
+    clearRequested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.summaryLabel = QLabel(self)
+        self.model = JobTableModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.ExtendedSelection)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        for column, width in enumerate((50, 280, 70, 80, 80, 80)):
+            self.table.setColumnWidth(column, width)
+        self.table.setWordWrap(False)
+        self.table.clicked.connect(lambda index: self.unitActivated.emit(self.model.jobAt(index.row()).name))
+        self.table.selectionModel().selectionChanged.connect(self.updateButtons)
+        self.cancelButton = QPushButton('Cancel', self)
+        self.cancelButton.clicked.connect(
+            lambda: self.cancelRequested.emit([job for job in self.selectedJobs() if job.active()]))
+        self.clearButton = QPushButton('Clear finished', self)
+        self.clearButton.clicked.connect(self.clearRequested)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.summaryLabel, 1)
+        buttons.addWidget(self.cancelButton)
+        buttons.addWidget(self.clearButton)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(buttons)
+        layout.addWidget(self.table, 1)
+        self.updateButtons()
+
+    def selectedJobs(self) -> list:
+        return [self.model.jobAt(index.row()) for index in self.table.selectionModel().selectedRows()]
+
+    def setJobs(self, jobs: list, counts: dict):
+        self.model.setJobs(jobs)
+        self.summaryLabel.setText(', '.join(f'{count} {state}' for state, count in counts.items()) or 'No jobs')
+        self.updateButtons()
+
+    def updateButtons(self):
+        self.cancelButton.setEnabled(any(job.active() for job in self.selectedJobs()))
+        self.clearButton.setEnabled(any(not job.active() for job in self.model.jobs))
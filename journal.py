@@ -0,0 +1,307 @@
+# This Python file uses the following encoding: utf-8
+import collections
+import json
+import subprocess
+import threading
+import time
+from typing import Union
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt, QTimer, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from instrumentation import recorder
+
+PRIORITY_NAMES = ('emerg', 'alert', 'crit', 'err', 'warning', 'notice', 'info', 'debug')
+JOURNAL_FIELDS = ('MESSAGE', 'PRIORITY', 'SYSLOG_IDENTIFIER', '_PID')
+DEFAULT_CAPACITY = 20000
+BACKLOG_LINES = 500
+FLUSH_MS = 16
+
+
+def parseJournalLine(line: bytes) -> Union[tuple, None]:
+    # One `journalctl -o json` record -> (timestamp in µs, priority,
+    # identifier, message); MESSAGE is a list of bytes when it isn't UTF-8
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    message = record.get('MESSAGE')
+    if isinstance(message, list):
+        message = bytes(message).decode(errors='replace')
+    elif message is None:
+        message = ''
+    try:
+        priority = int(record.get('PRIORITY', 6))
+    except (TypeError, ValueError):
+        priority = 6
+    identifier = record.get('SYSLOG_IDENTIFIER') or ''
+    pid = record.get('_PID')
+    if pid:
+        identifier = f'{identifier}[{pid}]'
+    return int(record.get('__REALTIME_TIMESTAMP', 0)), priority, identifier, message
+
+
+class JournalModel(QAbstractTableModel):
+    # The last `capacity` entries in a ring buffer. Rows are the entries
+    # accepted by the current filter, kept as ascending sequence numbers;
+    # entry n lives in slot n % capacity until it is overwritten.
+    HEADERS = ('Time', 'Process', 'Message')
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.maxPriority = 7
+        self.text = ''
+        self._ring = [None] * capacity
+        self._next = 0
+        self._visible = []
+
+    def clear(self):
+        self.beginResetModel()
+        self._ring = [None] * self.capacity
+        self._next = 0
+        self._visible = []
+        self.endResetModel()
+
+    def _accepts(self, entry: tuple) -> bool:
+        if entry[1] > self.maxPriority:
+            return False
+        return not self.text or self.text in entry[3].lower() or self.text in entry[2].lower()
+
+    def setFilter(self, maxPriority: int, text: str):
+        self.maxPriority = maxPriority
+        self.text = text.lower()
+        self.beginResetModel()
+        first = max(0, self._next - self.capacity)
+        self._visible = [seq for seq in range(first, self._next)
+                         if self._accepts(self._ring[seq % self.capacity])]
+        self.endResetModel()
+
+    def appendEntries(self, entries: list):
+        if not entries:
+            return
+        entries = entries[-self.capacity:]
+        start = self._next
+        for entry in entries:
+            self._ring[self._next % self.capacity] = entry
+            self._next += 1
+        first = max(0, self._next - self.capacity)
+
+        # rows whose entries were just overwritten always sit at the top
+        evicted = 0
+        while evicted < len(self._visible) and self._visible[evicted] < first:
+            evicted += 1
+        if evicted:
+            self.beginRemoveRows(QModelIndex(), 0, evicted - 1)
+            del self._visible[:evicted]
+            self.endRemoveRows()
+
+        accepted = [seq for seq in range(max(start, first), self._next)
+                    if self._accepts(self._ring[seq % self.capacity])]
+        if accepted:
+            row = len(self._visible)
+            self.beginInsertRows(QModelIndex(), row, row + len(accepted) - 1)
+            self._visible.extend(accepted)
+            self.endInsertRows()
+
+    def entryAt(self, row: int) -> tuple:
+        return self._ring[self._visible[row] % self.capacity]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._visible)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entryAt(index.row())
+        if role == Qt.DisplayRole:
+            column = index.column()
+            if column == 0:
+                # formatted on demand, only visible rows ever get here
+                seconds = entry[0] / 1000000
+                return time.strftime('%b %d %H:%M:%S', time.localtime(seconds))
+            return entry[column + 1]
+        if role == Qt.ForegroundRole:
+            if entry[1] <= 3:
+                return QColor('#c62828')
+            if entry[1] == 4:
+                return QColor('#b26a00')
+        if role == Qt.ToolTipRole and index.column() == 2:
+            return f'{PRIORITY_NAMES[entry[1]] if 0 <= entry[1] < 8 else entry[1]}: {entry[3]}'
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+
+class _Follower:
+    # State of one journalctl run, shared between its reader thread and
+    # the stream; a stopped follower's lines are simply dropped
+    def __init__(self, process: subprocess.Popen, capacity: int):
+        self.process = process
+        self.started = time.perf_counter()
+        self.entries = collections.deque(maxlen=capacity)
+        self.lock = threading.Lock()
+        self.running = True
+
+
+class JournalStream(QObject):
+    # Follows the journal of one unit through `journalctl -f -o json`. A
+    # reader thread parses lines as they arrive into a bounded queue which
+    # the GUI drains once per frame, so a burst never blocks the event loop
+    # and never holds more than `capacity` entries in flight.
+    entriesReady = Signal(list)
+    failed = Signal(str)
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, journalctl: str = 'journalctl', parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.journalctl = journalctl
+        self.unit = None
+        self._follower = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(FLUSH_MS)
+        self._timer.timeout.connect(self._flush)
+
+    def follow(self, unit: str, backlog: int = BACKLOG_LINES):
+        self.stop()
+        cmd = [self.journalctl, '-f', '-o', 'json', '-n', str(backlog), '--no-pager',
+               '--output-fields=' + ','.join(JOURNAL_FIELDS), '-u', unit]
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            self.failed.emit(f'cannot run {self.journalctl}: {e.strerror}')
+            return
+        self.unit = unit
+        self._follower = _Follower(process, self.capacity)
+        threading.Thread(target=self._readLoop, args=(self._follower,), name='journal-reader',
+                         daemon=True).start()
+        self._timer.start()
+
+    def stop(self):
+        follower = self._follower
+        self._follower = None
+        self.unit = None
+        self._timer.stop()
+        if follower is not None:
+            follower.running = False
+            # the reader thread sees EOF and reaps the process
+            follower.process.kill()
+
+    def _readLoop(self, follower: _Follower):
+        received = 0
+        for line in follower.process.stdout:
+            if not follower.running:
+                break
+            received += len(line)
+            entry = parseJournalLine(line)
+            if entry is not None:
+                with follower.lock:
+                    follower.entries.append(entry)
+        follower.process.stdout.close()
+        follower.process.wait()
+        if recorder.enabled:
+            recorder.recordCommand(follower.process.args, follower.started,
+                                   time.perf_counter() - follower.started, follower.process.returncode, received)
+
+    def _flush(self):
+        follower = self._follower
+        if follower is None:
+            return
+        with follower.lock:
+            if not follower.entries:
+                return
+            entries = list(follower.entries)
+            follower.entries.clear()
+        self.entriesReady.emit(entries)
+
+
+class JournalView(QWidget):
+    # Log panel for one unit: priority and text filter above a table that
+    # keeps following the newest entries while scrolled to the bottom
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, journalctl: str = 'journalctl', parent=None):
+        super().__init__(parent)
+        self.model = JournalModel(capacity, self)
+        self.stream = JournalStream(capacity, journalctl, self)
+        self.stream.entriesReady.connect(self._append)
+        self.stream.failed.connect(self._showError)
+
+        self.priorityBox = QComboBox(self)
+        for number, name in enumerate(PRIORITY_NAMES):
+            self.priorityBox.addItem(f'{number} {name}', number)
+        self.priorityBox.setCurrentIndex(len(PRIORITY_NAMES) - 1)
+        self.filterEdit = QLineEdit(self)
+        self.filterEdit.setPlaceholderText('Filter messages')
+        self.filterEdit.setClearButtonEnabled(True)
+        self.statusLabel = QLabel(self)
+        self.filterTimer = QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(150)
+        self.filterTimer.timeout.connect(self._applyFilter)
+        self.filterEdit.textChanged.connect(lambda: self.filterTimer.start())
+        self.priorityBox.currentIndexChanged.connect(self._applyFilter)
+
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Fixed)
+        header.resizeSection(0, 120)
+        header.setSectionResizeMode(1, QHeaderView.Interactive)
+        header.resizeSection(1, 160)
+        header.setStretchLastSection(True)
+
+        filters = QHBoxLayout()
+        filters.addWidget(self.priorityBox)
+        filters.addWidget(self.filterEdit, 1)
+        filters.addWidget(self.statusLabel)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(filters)
+        layout.addWidget(self.table, 1)
+
+    def follow(self, unit: Union[str, None]):
+        if unit == self.stream.unit:
+            return
+        self.model.clear()
+        self.statusLabel.setText('')
+        if unit is None:
+            self.stream.stop()
+        else:
+            self.stream.follow(unit)
+
+    def stop(self):
+        self.stream.stop()
+
+    def _applyFilter(self):
+        self.filterTimer.stop()
+        self.model.setFilter(self.priorityBox.currentData(), self.filterEdit.text())
+        self.table.scrollToBottom()
+
+    def _append(self, entries: list):
+        scrollBar = self.table.verticalScrollBar()
+        following = scrollBar.value() >= scrollBar.maximum()
+        self.model.appendEntries(entries)
+        if following:
+            self.table.scrollToBottom()
+
+    def _showError(self, message: str):
+        self.statusLabel.setText(message)
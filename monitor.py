@@ -0,0 +1,122 @@
+# This Python file uses the following encoding: utf-8
+import re
+import threading
+from PySide6.QtCore import QObject, QTimer, Signal
+
+try:
+    from jeepney import DBusAddress, HeaderFields, MatchRule, MessageType, message_bus, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    open_dbus_connection = None
+
+from backend import DBusBackend, formatDBusValue
+
+UNIT_PATH_PREFIX = '/org/freedesktop/systemd1/unit/'
+COALESCE_MS = 250
+
+
+def unitNameFromPath(path: str) -> str:
+    # inverse of sd-bus' object path escaping: "dbus_2eservice" -> "dbus.service"
+    label = path[len(UNIT_PATH_PREFIX):]
+    return re.sub(r'_([0-9a-f]{2})', lambda m: chr(int(m.group(1), 16)), label)
+
+
+class SystemdChanges:
+    def __init__(self):
+        self.newUnits = set()
+        self.removedUnits = set()
+        self.properties = {}
+        self.invalidated = set()
+        self.unitFilesChanged = False
+
+    def __bool__(self) -> bool:
+        return bool(self.newUnits or self.removedUnits or self.properties
+                    or self.invalidated or self.unitFilesChanged)
+
+
+class SystemdMonitor(QObject):
+    # Listens for systemd's signals on a dedicated connection in a background
+    # thread and hands them to the GUI as one SystemdChanges batch at most
+    # every COALESCE_MS milliseconds.
+    changed = Signal(object)
+
+    def __init__(self, bus: str = 'SYSTEM', interval: int = COALESCE_MS, parent=None):
+        super().__init__(parent)
+        if open_dbus_connection is None:
+            raise RuntimeError('live updates require the jeepney package')
+        self._connection = open_dbus_connection(bus=bus)
+        self._lock = threading.Lock()
+        self._pending = SystemdChanges()
+        self._running = True
+        self._subscribe()
+        self._thread = threading.Thread(target=self._receiveLoop, name='systemd-monitor', daemon=True)
+        self._thread.start()
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._flush)
+        self._timer.start()
+
+    def _subscribe(self):
+        rules = [
+            MatchRule(type='signal', sender=DBusBackend.SERVICE, interface=DBusBackend.MANAGER_INTERFACE,
+                      path=DBusBackend.MANAGER_PATH, member=member)
+            for member in ('UnitNew', 'UnitRemoved', 'UnitFilesChanged')
+        ]
+        rules.append(MatchRule(type='signal', sender=DBusBackend.SERVICE,
+                               interface='org.freedesktop.DBus.Properties', member='PropertiesChanged',
+                               path_namespace=UNIT_PATH_PREFIX.rstrip('/')))
+        for rule in rules:
+            self._connection.send_and_get_reply(message_bus.AddMatch(rule))
+        manager = DBusAddress(DBusBackend.MANAGER_PATH, bus_name=DBusBackend.SERVICE,
+                              interface=DBusBackend.MANAGER_INTERFACE)
+        self._connection.send_and_get_reply(new_method_call(manager, 'Subscribe'))
+
+    def stop(self):
+        self._running = False
+        self._timer.stop()
+        self._thread.join(1.0)
+        self._connection.close()
+
+    def _receiveLoop(self):
+        while self._running:
+            try:
+                message = self._connection.receive(timeout=0.5)
+            except TimeoutError:
+                continue
+            except OSError:
+                return
+            if message.header.message_type == MessageType.signal:
+                self._record(message)
+
+    def _record(self, message):
+        member = message.header.fields.get(HeaderFields.member)
+        with self._lock:
+            pending = self._pending
+            if member == 'UnitNew':
+                pending.newUnits.add(message.body[0])
+                pending.removedUnits.discard(message.body[0])
+            elif member == 'UnitRemoved':
+                pending.removedUnits.add(message.body[0])
+                pending.newUnits.discard(message.body[0])
+            elif member == 'UnitFilesChanged':
+                pending.unitFilesChanged = True
+            elif member == 'PropertiesChanged':
+                path = message.header.fields.get(HeaderFields.path, '')
+                if not path.startswith(UNIT_PATH_PREFIX):
+                    return
+                name = unitNameFromPath(path)
+                _, changed, invalidated = message.body
+                if changed:
+                    values = pending.properties.setdefault(name, {})
+                    for key, (signature, value) in changed.items():
+                        values[key] = formatDBusValue(signature, value)
+                if invalidated:
+                    pending.invalidated.add(name)
+
+    def _flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            changes = self._pending
+            self._pending = SystemdChanges()
+        self.changed.emit(changes)
@@ -0,0 +1,67 @@
+# This Python file uses the following encoding: utf-8
+import time
+from typing import Union
+
+from instrumentation import timed
+
+
+DETAIL_PROPERTIES = (
+    'Id',
+    'Description',
+    'FragmentPath',
+    'UnitFileState',
+    'ActiveState',
+    'SubState',
+    'After',
+    'Before',
+    'Requires',
+    'Wants',
+    'Conflicts',
+)
+
+
+@timed('parse')
+def parseShowOutput(output: str) -> list:
+    # `systemctl show` prints one KEY=VALUE block per unit, blocks are
+    # separated by an empty line and keep the order of the requested units
+    blocks = []
+    current = {}
+    for line in output.split('\n'):
+        if not line:
+            if current:
+                blocks.append(current)
+                current = {}
+            continue
+        key, sep, value = line.partition('=')
+        if sep:
+            current[key] = value
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+class PropertiesCache:
+    def __init__(self, ttl: float = 10.0):
+        self.ttl = ttl
+        self._entries = {}
+
+    def get(self, name: str) -> Union[dict, None]:
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        stamp, values = entry
+        if time.monotonic() - stamp > self.ttl:
+            del self._entries[name]
+            return None
+        return values
+
+    def put(self, name: str, values: dict):
+        self._entries[name] = (time.monotonic(), values)
+
+    def invalidate(self, name: Union[str, None] = None):
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+
@@ -0,0 +1,152 @@
+# This Python file uses the following encoding: utf-8
+from typing import Union
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QPointF, Qt, Signal
+from PySide6.QtGui import QColor, QPen, QPolygonF
+from PySide6.QtWidgets import QHeaderView, QLabel, QStyledItemDelegate, QTableView, QVBoxLayout, QWidget
+
+DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+ALIGNMENT_ROLE = Qt.ItemDataRole.TextAlignmentRole
+# the columns holding a cgroups.RingBuffer
+SPARKLINE_COLUMNS = (5, 6)
+SPARKLINE_COLORS = (QColor('#d9534f'), QColor('#337ab7'))
+
+
+def formatBytes(value: Union[float, None]) -> str:
+    if value is None:
+        return ''
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if value < 1024:
+            return f'{value:.0f} {unit}' if unit == 'B' else f'{value:.1f} {unit}'
+        value /= 1024
+    return f'{value:.1f} TiB'
+
+
+class ResourceTableModel(QAbstractTableModel):
+    # Rows as returned by cgroups.CgroupSampler.sample, kept sorted; every
+    # update is a layout change, so the selection follows the units around
+    HEADERS = ('Unit', 'CPU %', 'Memory', 'IO/s', 'Tasks', 'CPU history', 'Memory history')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.sortColumn = 1
+        self.sortOrder = Qt.DescendingOrder
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def nameAt(self, row: int) -> str:
+        return self.rows[row][0]
+
+    def data(self, index, role=DISPLAY_ROLE):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = index.column()
+        if role == DISPLAY_ROLE:
+            value = row[column]
+            if column == 0:
+                return value
+            if value is None or column in SPARKLINE_COLUMNS:
+                return ''
+            if column == 1:
+                return f'{value:.1f}'
+            if column in (2, 3):
+                return formatBytes(value)
+            return str(value)
+        if role == ALIGNMENT_ROLE and 0 < column < SPARKLINE_COLUMNS[0]:
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def headerData(self, section: int, orientation, role=DISPLAY_ROLE):
+        if role == DISPLAY_ROLE and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def _sorted(self, rows: list) -> list:
+        # a history sorts like the value it records
+        column = {5: 1, 6: 2}.get(self.sortColumn, self.sortColumn)
+        if column == 0:
+            key = lambda row: row[0]
+        else:
+            key = lambda row: -1.0 if row[column] is None else row[column]
+        return sorted(rows, key=key, reverse=self.sortOrder == Qt.DescendingOrder)
+
+    def setRows(self, rows: list):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        names = [self.rows[index.row()][0] for index in persistent]
+        self.rows = self._sorted(rows)
+        rowOf = {row[0]: number for number, row in enumerate(self.rows)}
+        self.changePersistentIndexList(persistent, [
+            self.index(rowOf[name], index.column()) if name in rowOf else QModelIndex()
+            for name, index in zip(names, persistent)])
+        self.layoutChanged.emit()
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        self.sortColumn = column
+        self.sortOrder = order
+        self.setRows(self.rows)
+
+
+class SparklineDelegate(QStyledItemDelegate):
+    # The history of a cell as a line, scaled to its own maximum; only
+    # visible cells are painted, so only their history is copied out
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        values = index.model().rows[index.row()][index.column()].values()
+        if len(values) < 2:
+            return
+        rect = option.rect.adjusted(2, 3, -2, -3)
+        top = max(values) or 1.0
+        step = rect.width() / (len(values) - 1)
+        points = QPolygonF([QPointF(rect.left() + i * step, rect.bottom() - value / top * rect.height())
+                            for i, value in enumerate(values)])
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setPen(QPen(SPARKLINE_COLORS[SPARKLINE_COLUMNS.index(index.column())], 1.2))
+        painter.drawPolyline(points)
+        painter.restore()
+
+
+class ResourceView(QWidget):
+    # The resources tab: every unit with a cgroup, busiest first; clicking a
+    # unit asks for it to be selected
+    unitActivated = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.summaryLabel = QLabel(self)
+        self.model = ResourceTableModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        # enabling sorting sorts by the header's default, put ours back
+        column, order = self.model.sortColumn, self.model.sortOrder
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(column, order)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        delegate = SparklineDelegate(self.table)
+        for column in SPARKLINE_COLUMNS:
+            self.table.setItemDelegateForColumn(column, delegate)
+            self.table.setColumnWidth(column, 140)
+        self.table.clicked.connect(lambda index: self.unitActivated.emit(self.model.nameAt(index.row())))
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.summaryLabel)
+        layout.addWidget(self.table, 1)
+
+    def setRows(self, rows: list):
+        self.model.setRows(rows)
+        cpu = sum(row[1] or 0.0 for row in rows)
+        memory = sum(row[2] or 0 for row in rows)
+        self.summaryLabel.setText(f'{len(rows)} units, {cpu:.1f} % CPU, {formatBytes(memory)} memory')
+
+    def setError(self, message: str):
+        self.summaryLabel.setText(message)
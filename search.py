@@ -0,0 +1,97 @@
+# This Python file uses the following encoding: utf-8
+import re
+from typing import Union
+
+from instrumentation import timed
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _TrigramIndex:
+    def __init__(self, texts: list):
+        self.texts = texts
+        self.postings = {}
+        for row, text in enumerate(texts):
+            for trigram in trigrams(text):
+                posting = self.postings.get(trigram)
+                if posting is None:
+                    self.postings[trigram] = [row]
+                else:
+                    posting.append(row)
+
+    def candidates(self, query: str) -> Union[list, None]:
+        # Rows containing every trigram of the query are a superset of the
+        # matches; checking the rarest trigram's rows is enough since the
+        # caller verifies each candidate anyway
+        if len(query) < 3:
+            return None
+        best = None
+        for trigram in trigrams(query):
+            posting = self.postings.get(trigram)
+            if posting is None:
+                return []
+            if best is None or len(posting) < len(best):
+                best = posting
+        return best
+
+
+class UnitSearchIndex:
+    # Built once per loaded unit list. search() returns the sorted source rows
+    # that match, or None when nothing is filtered out.
+    MAX_CACHED_RESULTS = 64
+
+    def __init__(self, units: list):
+        self.units = units
+        self.names = [unit.name.lower() for unit in units]
+        self._nameIndex = _TrigramIndex(self.names)
+        self._fullTexts = None
+        self._fullIndex = None
+        self._results = {}
+        self._lastKey = None
+
+    def _texts(self, descriptions: bool) -> tuple:
+        if not descriptions:
+            return self.names, self._nameIndex
+        if self._fullIndex is None:
+            self._fullTexts = [name + '\n' + unit.description.lower()
+                               for name, unit in zip(self.names, self.units)]
+            self._fullIndex = _TrigramIndex(self._fullTexts)
+        return self._fullTexts, self._fullIndex
+
+    @timed('search')
+    def search(self, query: str, fuzzy: bool = False, descriptions: bool = False) -> Union[list, None]:
+        query = query.lower()
+        if not query:
+            return None
+        key = (query, fuzzy, descriptions)
+        result = self._results.get(key)
+        if result is not None:
+            self._lastKey = key
+            return result
+
+        texts, index = self._texts(descriptions)
+        last = self._lastKey
+        if last is not None and last[1:] == key[1:] and query.startswith(last[0]):
+            # the query only grew, so the matches can only shrink
+            candidates = self._results[last]
+        elif fuzzy:
+            candidates = range(len(texts))
+        else:
+            candidates = index.candidates(query)
+            if candidates is None:
+                candidates = range(len(texts))
+
+        if fuzzy:
+            pattern = re.compile('.*?'.join(map(re.escape, query)), re.DOTALL)
+            search = pattern.search
+            result = [row for row in candidates if search(texts[row])]
+        else:
+            result = [row for row in candidates if query in texts[row]]
+
+        if len(self._results) >= self.MAX_CACHED_RESULTS:
+            self._results.clear()
+        self._results[key] = result
+        self._lastKey = key
+        return result
@@ -0,0 +1,70 @@
+# This Python file uses the following encoding: utf-8
+import hashlib
+import json
+import os
+import zlib
+from typing import Union
+
+from units import Unit, unitTypeOf
+
+SNAPSHOT_VERSION = 2
+BOOT_ID_PATH = '/proc/sys/kernel/random/boot_id'
+
+
+def cacheDirectory() -> str:
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'systemdGUI')
+
+
+def snapshotPath(scope: str = '') -> str:
+    # one file per scope, so going back and forth between machines keeps both
+    if not scope:
+        return os.path.join(cacheDirectory(), 'units.snapshot')
+    digest = hashlib.blake2b(scope.encode(errors='surrogateescape'), digest_size=8).hexdigest()
+    return os.path.join(cacheDirectory(), f'units-{digest}.snapshot')
+
+
+def bootId() -> str:
+    # unit files may have changed while the machine was down, a snapshot
+    # from an earlier boot is not worth showing
+    try:
+        with open(BOOT_ID_PATH) as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def saveSnapshot(units: list, scope: str = '', path: Union[str, None] = None):
+    # The unit list as compressed JSON rows; the type is derived from the
+    # name again when loading
+    path = path or snapshotPath(scope)
+    data = {
+        'version': SNAPSHOT_VERSION,
+        'bootId': bootId(),
+        'scope': scope,
+        'units': [(unit.name, unit.unitFileState, unit.description, unit.loadState, unit.activeState,
+                   unit.subState) for unit in units],
+    }
+    payload = zlib.compress(json.dumps(data, separators=(',', ':')).encode(), 1)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(payload)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+
+
+def loadSnapshot(scope: str = '', path: Union[str, None] = None) -> Union[list, None]:
+    path = path or snapshotPath(scope)
+    try:
+        with open(path, 'rb') as f:
+            data = json.loads(zlib.decompress(f.read()))
+    except (OSError, ValueError, zlib.error):
+        return None
+    if (not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION
+            or data.get('bootId') != bootId() or data.get('scope') != scope):
+        return None
+    return [Unit(name, unitTypeOf(name), description, state, load, active, sub)
+            for name, state, description, load, active, sub in data['units']]
@@ -0,0 +1,199 @@
+# This Python file uses the following encoding: utf-8
+import concurrent.futures
+import os
+import subprocess
+from typing import Callable, Union
+
+from backend import BULK_ACTIONS, Backend, SubprocessBackend, createBackend
+from properties import DETAIL_PROPERTIES
+from instrumentation import timed
+
+DEFAULT_TIMEOUT = 15.0
+MAX_PARALLEL = 8
+STATE_PROPERTIES = ('LoadState', 'ActiveState', 'SubState', 'UnitFileState')
+
+
+class Target:
+    # One systemd the GUI can manage: the local one, a container
+    # (systemctl --machine=NAME) or a remote host over ssh
+    # (systemctl --host=[USER@]HOST). A runner replaces runLocally() for all
+    # systemctl calls of the target, and timeout bounds each of them.
+    def __init__(self, name: str, options: tuple = (), runner: Union[Callable, None] = None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.name = name
+        self.options = tuple(options)
+        self.runner = runner
+        self.timeout = timeout
+
+    def isLocal(self) -> bool:
+        return not self.options and self.runner is None
+
+    def createBackend(self) -> Backend:
+        if self.isLocal():
+            return createBackend()
+        return SubprocessBackend(options=self.options, runner=self.runner, timeout=self.timeout)
+
+
+def parseTarget(spec: str, timeout: float = DEFAULT_TIMEOUT) -> Target:
+    # "local", "--machine=NAME" or "machine:NAME", "--host=HOST" or "host:HOST"
+    spec = spec.strip()
+    if spec == 'local':
+        return Target('local', timeout=timeout)
+    for kind in ('machine', 'host'):
+        for prefix in (f'--{kind}=', f'{kind}:'):
+            if spec.startswith(prefix) and spec[len(prefix):]:
+                address = spec[len(prefix):]
+                return Target(address, (f'--{kind}={address}',), timeout=timeout)
+    raise ValueError(f'unknown target: {spec}')
+
+
+def targetsFromArguments(args: list) -> list:
+    # --machine=/--host= command line arguments plus the comma separated
+    # SYSTEMDGUI_TARGETS; nothing configured means the local host only
+    timeout = float(os.environ.get('SYSTEMDGUI_TARGET_TIMEOUT', DEFAULT_TIMEOUT))
+    specs = [arg for arg in args if arg.startswith(('--machine=', '--host='))]
+    specs += [spec for spec in os.environ.get('SYSTEMDGUI_TARGETS', '').split(',') if spec.strip()]
+    return [parseTarget(spec, timeout) for spec in specs] or [Target('local', timeout=timeout)]
+
+
+def createTargetBackend(args: list) -> Backend:
+    targets = targetsFromArguments(args)
+    if len(targets) == 1:
+        return targets[0].createBackend()
+    return FanOutBackend(targets)
+
+
+def describeError(error: Exception) -> str:
+    if isinstance(error, subprocess.TimeoutExpired):
+        return f'no answer within {error.timeout:g} s'
+    return str(error) or type(error).__name__
+
+
+class FanOutBackend(Backend):
+    # Runs every call against all targets at once, at most maxParallel of
+    # them at a time. The unit list is the union over all targets, with the
+    # state of the first target that has the unit; actions succeed when they
+    # succeed everywhere. Targets that fail are left out and their error is
+    # kept in `errors` until they answer again.
+    local = False
+
+    def __init__(self, targets: list, maxParallel: int = MAX_PARALLEL):
+        self.targets = targets
+        self.name = 'targets:' + ','.join(target.name for target in targets)
+        self.backends = [target.createBackend() for target in targets]
+        self.errors = {}
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(maxParallel, len(targets))),
+                                                           thread_name_prefix='fan-out')
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        for backend in self.backends:
+            backend.close()
+
+    def fanOut(self, method: str, *args) -> list:
+        # [(target, result, error)] in target order, error is None on success
+        futures = [self._pool.submit(getattr(backend, method), *args) for backend in self.backends]
+        results = []
+        for target, future in zip(self.targets, futures):
+            try:
+                results.append((target, future.result(), None))
+                self.errors.pop(target.name, None)
+            except Exception as e:
+                results.append((target, None, describeError(e)))
+                self.errors[target.name] = describeError(e)
+        return results
+
+    def _succeeded(self, method: str, *args) -> list:
+        results = self.fanOut(method, *args)
+        if all(error is not None for _, _, error in results):
+            raise RuntimeError('; '.join(f'{target.name}: {error}' for target, _, error in results))
+        return [result for _, result, error in results if error is None]
+
+    @timed('backend')
+    def listUnitFiles(self) -> list:
+        units = {}
+        for result in self._succeeded('listUnitFiles'):
+            for unit in result:
+                units.setdefault(unit.name, unit)
+        return list(units.values())
+
+    @timed('backend')
+    def listUnits(self) -> list:
+        rows = {}
+        for result in self._succeeded('listUnits'):
+            for row in result:
+                rows.setdefault(row[0], row)
+        return list(rows.values())
+
+    @timed('backend')
+    def listTimers(self) -> list:
+        timers = {}
+        for result in self._succeeded('listTimers'):
+            for row in result:
+                timers.setdefault(row[0], row)
+        return list(timers.values())
+
+    @timed('backend')
+    def getProperties(self, names: list, properties: tuple = DETAIL_PROPERTIES) -> dict:
+        # every target is asked at once, details come from the first one in
+        # target order that has the unit. LoadState tells which those are,
+        # it is asked for whether the caller wants it or not.
+        asked = tuple(properties) if 'LoadState' in properties else tuple(properties) + ('LoadState',)
+        result = {}
+        notFound = {}
+        for _, values, error in self.fanOut('getProperties', list(names), asked):
+            if error is not None:
+                continue
+            for name, block in values.items():
+                if name in result:
+                    continue
+                if block.get('LoadState') == 'not-found':
+                    notFound.setdefault(name, block)
+                else:
+                    result[name] = block
+        # a unit no target has is reported as the first target saw it
+        for name, block in notFound.items():
+            result.setdefault(name, block)
+        if 'LoadState' not in properties:
+            for block in result.values():
+                block.pop('LoadState', None)
+        return result
+
+    @timed('backend')
+    def unitStates(self, name: str) -> list:
+        # the merged view: [(target name, properties or None, error)]
+        return [(target.name, None if error else result.get(name, {}), error)
+                for target, result, error in self.fanOut('getProperties', [name], STATE_PROPERTIES)]
+
+    def _allSucceeded(self, method: str, name: str) -> bool:
+        return all(error is None and result for _, result, error in self.fanOut(method, name))
+
+    def startUnit(self, name: str) -> bool:
+        return self._allSucceeded('startUnit', name)
+
+    def stopUnit(self, name: str) -> bool:
+        return self._allSucceeded('stopUnit', name)
+
+    def enableUnit(self, name: str) -> bool:
+        return self._allSucceeded('enableUnit', name)
+
+    def disableUnit(self, name: str) -> bool:
+        return self._allSucceeded('disableUnit', name)
+
+    @timed('backend')
+    def bulkAction(self, action: str, names: list) -> dict:
+        # a unit counts as done when every target did it, the detail names
+        # the targets where it failed
+        if action not in BULK_ACTIONS:
+            raise ValueError(f'unknown action: {action}')
+        failures = {name: [] for name in names}
+        details = {}
+        for target, result, error in self.fanOut('bulkAction', action, names):
+            for name in names:
+                succeeded, detail = (False, error) if error is not None else result.get(name, (False, 'no result'))
+                if succeeded:
+                    details.setdefault(name, detail)
+                else:
+                    failures[name].append(f'{target.name}: {detail}')
+        return {name: (not failures[name], '; '.join(failures[name]) or details.get(name, ''))
+                for name in names}
@@ -0,0 +1,50 @@
+# This Python file uses the following encoding: utf-8
+import os
+import subprocess
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+from backend import SubprocessBackend, errorLineFor
+
+ERRORS = (b'Failed to start a-foo.service: Unit a-foo.service has a bad setting.\n'
+          b'Warning: foo.service.d/override.conf changed on disk.\n'
+          b'Job for "foo.service" failed because the control process exited with error code.\n')
+
+
+def failingRunner(argv: list, timeout=None, stderr=None) -> subprocess.CompletedProcess:
+    # every unit ends up failed, systemctl explains why on stderr
+    if argv[1] == 'show':
+        names = argv[argv.index('--') + 1:]
+        blocks = ''.join(f'Id={name}\nLoadState=loaded\nActiveState=failed\nSubState=failed\n'
+                         f'UnitFileState=enabled\n\n' for name in names)
+        return subprocess.CompletedProcess(argv, 0, blocks.encode(), b'')
+    return subprocess.CompletedProcess(argv, 1, b'', ERRORS)
+
+
+class ErrorLineTest(unittest.TestCase):
+    def testWholeNamesOnly(self):
+        lines = ERRORS.decode().splitlines()
+        self.assertEqual(errorLineFor('foo.service', lines), lines[2])
+        self.assertEqual(errorLineFor('a-foo.service', lines), lines[0])
+        self.assertIsNone(errorLineFor('bar.service', lines))
+
+    def testBulkActionDetails(self):
+        backend = SubprocessBackend(runner=failingRunner)
+        result = backend.bulkAction('start', ['foo.service', 'a-foo.service', 'bar.service'])
+        self.assertIn('control process', result['foo.service'][1])
+        self.assertIn('bad setting', result['a-foo.service'][1])
+        self.assertEqual(result['bar.service'], (False, 'start failed'))
+
+    def testEnqueueJobsDetails(self):
+        backend = SubprocessBackend(runner=failingRunner)
+        queued, failed = backend.enqueueJobs('start', ['foo.service', 'a-foo.service', 'bar.service'])
+        self.assertEqual(set(queued), {'bar.service'})
+        self.assertIn('control process', failed['foo.service'][1])
+        self.assertIn('bad setting', failed['a-foo.service'][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+# This Python file uses the following encoding: utf-8
+# CgroupSampler over a temporary cgroup v2 tree written by
+# fake_systemd.generateCgroupTree
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'benchmarks'))
+
+from cgroups import CgroupSampler, RingBuffer, UnitResources, cgroupsAvailable
+from fake_systemd import generateCgroupTree, unitNumber, writeCgroupFiles
+
+UNITS = 60
+
+
+class CgroupSamplerTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.cgroups = generateCgroupTree(self.root.name, UNITS)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def rows(self, sampler: CgroupSampler) -> dict:
+        return {row[0]: row for row in sampler.sample()}
+
+    def testTreeIsDetected(self):
+        self.assertTrue(cgroupsAvailable(self.root.name))
+        with tempfile.TemporaryDirectory() as empty:
+            self.assertFalse(cgroupsAvailable(empty))
+
+    def testRatesFollowTheCounters(self):
+        name, path = next((name, path) for name, path in self.cgroups.items() if unitNumber(name) % 13)
+        number = unitNumber(name)
+        directory = os.path.join(self.root.name, path)
+        unit = UnitResources(name, directory, keepOpen=True)
+        unit.sample(10.0)
+        self.assertIsNone(unit.cpu)
+        writeCgroupFiles(directory, number, tick=1)
+        unit.sample(12.0)
+        self.assertAlmostEqual(unit.cpu, (number % 13) * 7000 / 1e4 / 2)
+        self.assertAlmostEqual(unit.io, ((number % 7) * 512 + 1024) / 2)
+        self.assertEqual(unit.memory, (number % 40 + 1) * 1048576 + (number % 3) * 4096)
+        self.assertEqual(unit.tasks, number % 9 + 1)
+        self.assertEqual(len(unit.cpuHistory), 1)
+        unit.close()
+
+    def testOpenAndReopenedFilesReadTheSame(self):
+        kept = CgroupSampler(self.root.name)
+        reopened = CgroupSampler(self.root.name)
+        reopened.openFileBudget = 0
+        for sampler in (kept, reopened):
+            sampler.setUnits(self.cgroups)
+            sampler.sample()
+        self.assertTrue(all(unit.files[0].keepOpen for unit in kept.units.values()))
+        self.assertFalse(any(unit.files[0].keepOpen for unit in reopened.units.values()))
+        generateCgroupTree(self.root.name, UNITS, tick=1)
+        keptRows, reopenedRows = self.rows(kept), self.rows(reopened)
+        self.assertEqual(set(keptRows), set(self.cgroups))
+        for name, row in keptRows.items():
+            # memory and tasks are read as they are, rates depend on timing
+            self.assertEqual(row[2], reopenedRows[name][2])
+            self.assertEqual(row[4], reopenedRows[name][4])
+        kept.close()
+        reopened.close()
+
+    def testStoppedAndRemovedUnits(self):
+        sampler = CgroupSampler(self.root.name)
+        # files kept open still read after the directory is gone on a plain
+        # file system, unlike on cgroupfs
+        sampler.openFileBudget = 0
+        sampler.setUnits(self.cgroups)
+        sampler.sample()
+        sampler.sample()
+        stopped, removed = sorted(self.cgroups)[:2]
+        shutil.rmtree(os.path.join(self.root.name, self.cgroups[stopped]))
+        remaining = {name: path for name, path in self.cgroups.items() if name != removed}
+        kept = sampler.units[sorted(remaining)[-1]]
+        sampler.setUnits(remaining)
+        rows = self.rows(sampler)
+        self.assertNotIn(stopped, rows)
+        self.assertNotIn(removed, rows)
+        self.assertNotIn(removed, sampler.units)
+        # units that stay keep their history
+        self.assertIs(sampler.units[sorted(remaining)[-1]], kept)
+        self.assertEqual(len(kept.cpuHistory), 2)
+        sampler.close()
+
+    def testRingBufferKeepsTheLastValues(self):
+        ring = RingBuffer(3)
+        for value in range(5):
+            ring.append(value)
+        self.assertEqual(ring.values(), [2.0, 3.0, 4.0])
+        self.assertEqual(len(ring), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
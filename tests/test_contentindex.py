@@ -0,0 +1,31 @@
+# This Python file uses the following encoding: utf-8
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+from contentindex import isContentQuery
+
+DEVICE = 'sys-devices-pci0000:00-0000:00:1f.2-ata1-host0.device'
+
+
+class ContentQueryTest(unittest.TestCase):
+    def testKeyTerms(self):
+        self.assertTrue(isContentQuery('ExecStart:/usr/bin/foo'))
+        self.assertTrue(isContentQuery('nginx Service.MemoryMax:'))
+        self.assertFalse(isContentQuery('nginx /usr/bin/foo'))
+
+    def testDeviceUnitNamesAreNotQueries(self):
+        self.assertFalse(isContentQuery(DEVICE))
+        self.assertFalse(isContentQuery('sys-devices-pci0000:00', [DEVICE]))
+
+    def testStartOfAKnownUnitName(self):
+        names = ['Backup:daily.timer', 'nginx.service']
+        self.assertFalse(isContentQuery('Backup:da', names))
+        self.assertTrue(isContentQuery('Backup:da', ['nginx.service']))
+
+
+if __name__ == "__main__":
+    unittest.main()
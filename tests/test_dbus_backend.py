@@ -0,0 +1,106 @@
+# This Python file uses the following encoding: utf-8
+# DBusBackend job tracking against benchmarks/mock_systemd1.py on a private
+# dbus-daemon
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'benchmarks')
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from backend import DBusBackend, open_dbus_connection
+from compare_backends import startPrivateBus
+
+UNITS = 200
+
+
+def unitNames(count: int) -> list:
+    types = ('service', 'socket', 'timer', 'mount', 'target', 'path')
+    return [f'mock-{i:05d}.{types[i % len(types)]}' for i in range(count)]
+
+
+@unittest.skipUnless(open_dbus_connection is not None and shutil.which('dbus-daemon'),
+                     'needs jeepney and dbus-daemon')
+class DBusBackendJobTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.daemon, cls.address = startPrivateBus(cls.directory.name)
+        cls.mock = subprocess.Popen([sys.executable, os.path.join(BENCHMARK_DIR, 'mock_systemd1.py'),
+                                     '--bus', cls.address, '--units', str(UNITS)],
+                                    stdout=subprocess.PIPE, text=True)
+        cls.mock.stdout.readline()
+
+    @classmethod
+    def tearDownClass(cls):
+        for process in (cls.mock, cls.daemon):
+            process.terminate()
+            process.wait()
+            process.stdout.close()
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.backend = DBusBackend(self.address, jobTimeout=10)
+
+    def tearDown(self):
+        self.backend.close()
+
+    def assertNothingKept(self, backend: DBusBackend):
+        self.assertEqual(backend._pendingJobs, set())
+        self.assertEqual(backend._finishedJobs, {})
+
+    def testStartUnit(self):
+        self.assertTrue(self.backend.startUnit(unitNames(1)[0]))
+        self.assertNothingKept(self.backend)
+
+    def testBulkActionCollectsEveryJob(self):
+        # the mock sends JobRemoved right behind each reply, so most arrive
+        # before the pipelined batch has been answered
+        names = unitNames(UNITS)
+        result = self.backend.bulkAction('restart', names)
+        self.assertEqual(result, {name: (True, 'done') for name in names})
+        self.assertNothingKept(self.backend)
+
+    def testBulkActionReportsUnknownUnits(self):
+        result = self.backend.bulkAction('start', ['missing.service', unitNames(1)[0]])
+        self.assertFalse(result['missing.service'][0])
+        self.assertEqual(result[unitNames(1)[0]], (True, 'done'))
+
+    def testEnqueuedJobsArePolled(self):
+        names = unitNames(50)
+        queued, failed = self.backend.enqueueJobs('start', names)
+        self.assertEqual(failed, {})
+        self.assertEqual(set(queued), set(names))
+        # polled like the jobs tab does, until every job reported back
+        running = {name: ('start', jobPath) for name, jobPath in queued.items()}
+        results = {}
+        deadline = time.monotonic() + 10
+        while running and time.monotonic() < deadline:
+            finished = self.backend.jobResults(running)
+            results.update(finished)
+            running = {name: job for name, job in running.items() if name not in finished}
+            time.sleep(0.01)
+        self.assertEqual(results, {name: (True, 'done') for name in names})
+        self.assertNothingKept(self.backend)
+
+    def testJobsOfOtherClientsAreNotKept(self):
+        other = DBusBackend(self.address)
+        try:
+            other.bulkAction('stop', unitNames(100))
+        finally:
+            other.close()
+        self.backend.UNCLAIMED_JOB_SECONDS = 0
+        # reading the unit list dispatches the JobRemoved signals queued up
+        self.backend.listUnits()
+        self.assertNothingKept(self.backend)
+        self.assertEqual(self.backend._unclaimedJobs, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
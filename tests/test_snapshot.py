@@ -0,0 +1,47 @@
+# This Python file uses the following encoding: utf-8
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+from snapshot import loadSnapshot, saveSnapshot, snapshotPath
+from units import Unit, unitTypeOf
+
+
+def units(*names: str) -> list:
+    return [Unit(name, unitTypeOf(name), name, 'enabled', 'loaded', 'active', 'running') for name in names]
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = tempfile.TemporaryDirectory()
+        self.environment = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': self.cache.name})
+        self.environment.start()
+
+    def tearDown(self):
+        self.environment.stop()
+        self.cache.cleanup()
+
+    def testEveryScopeKeepsItsOwnSnapshot(self):
+        local = 'dbus:SYSTEM'
+        remote = 'subprocess --host=db1:SYSTEM'
+        saveSnapshot(units('a.service'), local)
+        saveSnapshot(units('b.service', 'c.timer'), remote)
+        self.assertNotEqual(snapshotPath(local), snapshotPath(remote))
+        self.assertEqual([unit.name for unit in loadSnapshot(local)], ['a.service'])
+        self.assertEqual([unit.name for unit in loadSnapshot(remote)], ['b.service', 'c.timer'])
+        self.assertIsNone(loadSnapshot('subprocess --user:SYSTEM'))
+
+    def testScopeIsCheckedInTheFile(self):
+        path = os.path.join(self.cache.name, 'shared.snapshot')
+        saveSnapshot(units('a.service'), 'one', path)
+        self.assertIsNone(loadSnapshot('two', path))
+        self.assertEqual(len(loadSnapshot('one', path)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# This Python file uses the following encoding: utf-8
+# FanOutBackend over stand-in machines: fake_systemd.FakeRunner answers the
+# systemctl calls of each target with its own set of units
+import os
+import sys
+import time
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'benchmarks'))
+
+from properties import DETAIL_PROPERTIES
+from targets import FanOutBackend, Target
+from fake_systemd import FakeRunner, unitName, unitRecord
+
+
+class FanOutBackendTest(unittest.TestCase):
+    def setUp(self):
+        # b has every unit a has and ten more
+        self.backend = FanOutBackend([Target('a', ('--host=a',), FakeRunner(10)),
+                                      Target('b', ('--host=b',), FakeRunner(20))])
+
+    def tearDown(self):
+        self.backend.close()
+
+    def testUnitListIsTheUnion(self):
+        names = {unit.name for unit in self.backend.listUnitFiles()}
+        self.assertEqual(names, {unitName(number) for number in range(20)})
+
+    def testPropertiesOfAUnitOnlyTheSecondTargetHas(self):
+        name = unitName(15)
+        properties = self.backend.getProperties([name, unitName(3)])
+        self.assertEqual(properties[name]['Description'], unitRecord(15, 20)['Description'])
+        self.assertTrue(properties[name]['FragmentPath'])
+        self.assertNotIn('LoadState', properties[name])
+        self.assertIn(unitName(3), properties)
+        self.assertEqual(set(properties[name]) - {'Id'}, set(DETAIL_PROPERTIES) - {'Id'})
+
+    def testLoadStateIsKeptWhenAskedFor(self):
+        properties = self.backend.getProperties([unitName(15)], ('LoadState', 'Description'))
+        self.assertEqual(properties[unitName(15)]['LoadState'], 'loaded')
+
+    def testUnitNoTargetHas(self):
+        properties = self.backend.getProperties(['nowhere.service'], ('LoadState',))
+        self.assertEqual(properties['nowhere.service']['LoadState'], 'not-found')
+
+    def testTargetsAreAskedAtOnce(self):
+        # only the last of three slow targets has the unit
+        backend = FanOutBackend([Target(name, (f'--host={name}',), FakeRunner(count, latency=0.3))
+                                 for name, count in (('a', 10), ('b', 10), ('c', 20))])
+        try:
+            start = time.perf_counter()
+            properties = backend.getProperties([unitName(15)], ('LoadState', 'Description'))
+            took = time.perf_counter() - start
+        finally:
+            backend.close()
+        self.assertEqual(properties[unitName(15)]['LoadState'], 'loaded')
+        self.assertLess(took, 0.6)
+
+    def testUnitStatesPerTarget(self):
+        states = self.backend.unitStates(unitName(15))
+        self.assertEqual([target for target, _, _ in states], ['a', 'b'])
+        self.assertEqual(states[0][1]['LoadState'], 'not-found')
+        self.assertEqual(states[1][1]['LoadState'], 'loaded')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# This Python file uses the following encoding: utf-8
+import os
+import sys
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+from unitfile import findDropIns, loadUnitSettings
+
+
+def write(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+class FindDropInsTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.etc = os.path.join(self.root.name, 'etc')
+        self.usr = os.path.join(self.root.name, 'usr')
+        os.makedirs(self.etc)
+        os.makedirs(self.usr)
+        self.searchPaths = (self.etc, self.usr)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def testHigherSearchPathMasksTypeWideDirectory(self):
+        write(os.path.join(self.etc, 'foo.service.d', 'x.conf'), '[Service]\nNice=1\n')
+        write(os.path.join(self.usr, 'service.d', 'x.conf'), '[Service]\nNice=2\n')
+        self.assertEqual(findDropIns('foo.service', self.searchPaths),
+                         [os.path.join(self.etc, 'foo.service.d', 'x.conf')])
+
+    def testUnitDirectoryMasksTemplateAndPrefixWithinOnePath(self):
+        write(os.path.join(self.usr, 'foo-bar@.service.d', 'x.conf'), '[Service]\nNice=1\n')
+        write(os.path.join(self.usr, 'foo-.service.d', 'x.conf'), '[Service]\nNice=2\n')
+        write(os.path.join(self.usr, 'foo-bar@a.service.d', 'x.conf'), '[Service]\nNice=3\n')
+        write(os.path.join(self.usr, 'foo-.service.d', 'y.conf'), '[Service]\nNice=4\n')
+        self.assertEqual(findDropIns('foo-bar@a.service', self.searchPaths),
+                         [os.path.join(self.usr, 'foo-bar@a.service.d', 'x.conf'),
+                          os.path.join(self.usr, 'foo-.service.d', 'y.conf')])
+
+    def testDropInsApplyInFileNameOrder(self):
+        write(os.path.join(self.usr, 'foo.service'), '[Service]\nNice=0\n')
+        write(os.path.join(self.usr, 'service.d', '20-b.conf'), '[Service]\nNice=2\n')
+        write(os.path.join(self.etc, 'foo.service.d', '10-a.conf'), '[Service]\nNice=1\n')
+        settings = loadUnitSettings('foo.service', os.path.join(self.usr, 'foo.service'), self.searchPaths)
+        self.assertEqual(settings.value('Service', 'Nice'), '2')
+
+
+if __name__ == "__main__":
+    unittest.main()
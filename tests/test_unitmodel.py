@@ -0,0 +1,74 @@
+# This Python file uses the following encoding: utf-8
+# UnitTableModel following the units systemd announces and drops, the way
+# onSystemdChanged hands them to it; fake_systemd.FakeRunner stands in for
+# systemctl
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'benchmarks'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtGui import QGuiApplication
+
+from backend import SubprocessBackend, loadUnits
+from core import refreshNamedUnits
+from units import Unit, UnitType
+from unitmodel import UnitTableModel
+from fake_systemd import FakeRunner, unitName
+
+UNITS = 20
+
+
+class NamedUnitsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QGuiApplication.instance() or QGuiApplication([])
+
+    def setUp(self):
+        self.backend = SubprocessBackend(runner=FakeRunner(UNITS))
+        self.units = loadUnits(self.backend)
+        self.model = UnitTableModel()
+        self.inserted = []
+        self.removed = []
+        self.model.rowsInserted.connect(lambda parent, first, last: self.inserted.append((first, last)))
+        self.model.rowsRemoved.connect(lambda parent, first, last: self.removed.append((first, last)))
+
+    def refresh(self, names: list):
+        fresh, diff, _, handedBack = refreshNamedUnits(self.backend, list(self.model.units), names)
+        self.assertEqual(handedBack, names)
+        self.model.applyDiff(diff)
+        self.assertEqual([unit.name for unit in self.model.units], [unit.name for unit in fresh])
+
+    def testNewUnitGetsARow(self):
+        new = unitName(7)
+        self.model.setUnits([unit for unit in self.units if unit.name != new])
+        self.refresh([new])
+        row = self.model.rowOf(new)
+        self.assertIsNotNone(row)
+        self.assertEqual(self.inserted, [(row, row)])
+        self.assertEqual(self.model.unitAt(row).loadState, 'loaded')
+        self.assertEqual([unit.name for unit in self.model.units], sorted(unit.name for unit in self.units))
+
+    def testRemovedUnitLosesItsRow(self):
+        scope = Unit('run-rabc.scope', UnitType.SCOPE, 'Transient scope', '', 'loaded', 'active', 'running')
+        self.model.setUnits(sorted(self.units + [scope], key=lambda x: x.name))
+        row = self.model.rowOf(scope.name)
+        self.refresh([scope.name])
+        self.assertIsNone(self.model.rowOf(scope.name))
+        self.assertEqual(self.removed, [(row, row)])
+        self.assertEqual(self.model.rowCount(), len(self.units))
+
+    def testUnitWithAFileKeepsItsRow(self):
+        # dropped by systemd once stopped, still listed from its unit file
+        self.model.setUnits(self.units)
+        name = unitName(3)
+        self.refresh([name])
+        self.assertIsNotNone(self.model.rowOf(name))
+        self.assertEqual((self.inserted, self.removed), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# This Python file uses the following encoding: utf-8
+# UnitFileWatcher over a unit tree written by fake_systemd.generateUnitTree
+# in a temporary directory, and the NeedDaemonReload check of the units it
+# reports against fake_systemd.FakeRunner
+import os
+import sys
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'benchmarks'))
+
+from PySide6.QtCore import QCoreApplication
+
+from backend import SubprocessBackend
+from core import checkDaemonReload
+from unitfile import ownerRows
+from unitwatch import UnitFileWatcher
+from fake_systemd import UNIT_DIRECTORY, FakeRunner, generateUnitTree, unitName
+from unit_watch import Edit, collect, replace
+
+UNITS = 50
+COALESCE_MS = 50
+
+
+class UnitFileWatcherTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        generateUnitTree(self.root.name, UNITS)
+        self.directory = os.path.join(self.root.name, UNIT_DIRECTORY)
+        self.watcher = UnitFileWatcher((self.directory,), coalesceMs=COALESCE_MS, maxDelayMs=5000)
+
+    def tearDown(self):
+        self.watcher.close()
+        self.root.cleanup()
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.directory, *parts)
+
+    def changes(self, fn) -> list:
+        batches, _ = collect(self.watcher, Edit(fn), quiet=COALESCE_MS / 1000 + 0.5)
+        return batches
+
+    def testBurstIsOneBatch(self):
+        def burst():
+            for number in range(20):
+                replace(self.path(unitName(number)), open(self.path(unitName(number))).read() + '# upgraded\n')
+        batches = self.changes(burst)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].owners, {unitName(number) for number in range(20)})
+        # renamed over the files that were there, nothing new
+        self.assertFalse(batches[0].filesAddedOrRemoved)
+        self.assertFalse(batches[0].overflow)
+
+    def testDropInsAreReportedForTheirOwner(self):
+        def dropIns():
+            replace(self.path(unitName(0) + '.d', 'override.conf'), '[Service]\nNice=5\n')
+            os.makedirs(self.path(unitName(1) + '.d'))
+            replace(self.path(unitName(1) + '.d', 'limits.conf'), '[Service]\nMemoryMax=1G\n')
+            os.makedirs(self.path('service.d'))
+        batches = self.changes(dropIns)
+        owners = set().union(*(changes.owners for changes in batches))
+        self.assertEqual(owners, {unitName(0), unitName(1), 'service'})
+        names = sorted(unitName(number) for number in range(UNITS))
+        affected = {names[row] for row in ownerRows(owners, names)}
+        self.assertEqual(affected, {name for name in names if name.endswith('.service')} | {unitName(1)})
+        self.assertFalse(any(changes.filesAddedOrRemoved for changes in batches))
+
+    def testAddedAndRemovedFiles(self):
+        def addRemove():
+            replace(self.path('added.service'), '[Service]\nExecStart=/bin/true\n')
+            os.unlink(self.path(unitName(UNITS - 1)))
+        batches = self.changes(addRemove)
+        self.assertEqual(len(batches), 1)
+        self.assertTrue(batches[0].filesAddedOrRemoved)
+        self.assertEqual(batches[0].owners, {'added.service', unitName(UNITS - 1)})
+
+    def testTemporaryFilesAreLeftOut(self):
+        def scratch():
+            with open(self.path('.#editor-scratch'), 'w') as f:
+                f.write('x')
+            with open(self.path(unitName(2) + '.swp'), 'w') as f:
+                f.write('x')
+        self.assertEqual(self.changes(scratch), [])
+
+    def testEditedUnitsNeedDaemonReload(self):
+        runner = FakeRunner(UNITS, root=self.root.name)
+        backend = SubprocessBackend(runner=runner)
+        edited = [unitName(3), unitName(7)]
+
+        def edit():
+            for name in edited:
+                replace(self.path(name), open(self.path(name)).read() + '# edited\n')
+        owners = set().union(*(changes.owners for changes in self.changes(edit)))
+        self.assertEqual(owners, set(edited))
+        names = [unitName(number) for number in range(UNITS)]
+        checked, stale = checkDaemonReload(backend, names)
+        self.assertEqual(checked, set(names))
+        self.assertEqual(stale, set(edited))
+        runner(['systemctl', 'daemon-reload'])
+        self.assertEqual(checkDaemonReload(backend, names)[1], set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# This Python file uses the following encoding: utf-8
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+from verify import VerifyCache, loadVerifyCache, verifyUnitFiles
+
+
+def write(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def noAnalyze(argv: list, timeout=None, stderr=None):
+    raise FileNotFoundError(argv[0])
+
+
+class VerifyUnitFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.units = os.path.join(self.root.name, 'units')
+        self.cachePath = os.path.join(self.root.name, 'verify.cache')
+        write(os.path.join(self.units, 'foo@.service'), '[Unit]\nDescription=foo %i\n[Service]\nExecStart=/bin/true\n')
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def verify(self, names: list, runner=noAnalyze, cache=None) -> tuple:
+        cache = cache if cache is not None else VerifyCache()
+        return verifyUnitFiles(names, cache, (self.units,), runner, 2, self.cachePath)
+
+    def testInstanceDropInsAreChecked(self):
+        dropIn = os.path.join(self.units, 'foo@a.service.d', 'x.conf')
+        write(dropIn, '[Unit]\nNoSuchKey=1\n')
+        checked, findings, _ = self.verify(['foo@a.service', 'foo@b.service'])
+        self.assertEqual(checked, {'foo@a.service', 'foo@b.service'})
+        self.assertEqual([(path, message) for _, path, _, message in findings['foo@a.service']],
+                         [(dropIn, 'unknown key NoSuchKey= in [Unit]')])
+        self.assertNotIn('foo@b.service', findings)
+
+    def testCurrentAndOlderUnitKeysAreKnown(self):
+        write(os.path.join(self.units, 'bar.service'),
+              '[Unit]\nOnSuccessJobMode=fail\nStartLimitIntervalSec=10\nStartLimitInterval=10\n'
+              'PropagateReloadTo=foo@a.service\nConditionPathExists=/etc\n'
+              '[Install]\nWantedBy=multi-user.target\n[Service]\nExecStart=/bin/true\n')
+        checked, findings, _ = self.verify(['bar.service'])
+        self.assertEqual(checked, {'bar.service'})
+        self.assertEqual(findings, {})
+
+    def testEditedFilesReplaceTheirOldFindings(self):
+        def analyze(argv: list, timeout=None, stderr=None):
+            calls.append(argv)
+            return subprocess.CompletedProcess(argv, 0, b'', b'')
+        calls = []
+        names = ['bar.service', 'baz.service', 'foo@a.service', 'foo@b.service', 'qux.service']
+        for name in ('bar.service', 'baz.service', 'qux.service'):
+            write(os.path.join(self.units, name), f'[Unit]\nDescription={name}\n')
+        write(os.path.join(self.units, 'foo@b.service.d', 'x.conf'), '[Unit]\nDescription=b\n')
+        _, _, cache = self.verify(names, analyze)
+        self.assertEqual(len(cache), 5)
+        write(os.path.join(self.units, 'bar.service'), '[Unit]\nDescription=edited\n')
+        self.verify(['bar.service'], analyze, cache)
+        # the old findings of bar.service are gone, the others are kept
+        self.assertEqual(len(cache), 5)
+        self.assertEqual(len(loadVerifyCache(self.cachePath)), 5)
+        calls.clear()
+        self.verify(names, analyze, loadVerifyCache(self.cachePath))
+        self.assertEqual(calls, [])
+
+    def testAnalyzerLinesAboutInstanceDropIns(self):
+        dropIn = os.path.join(self.units, 'foo@a.service.d', 'x.conf')
+        write(dropIn, '[Service]\nNice=1\n')
+        fragment = os.path.join(self.units, 'foo@.service')
+
+        def analyze(argv: list, timeout=None, stderr=None):
+            output = f'{dropIn}:2: something about the drop-in\nfoo@.service: something about the template\n'
+            return subprocess.CompletedProcess(argv, 1, output.encode(), b'')
+        _, findings, _ = self.verify(['foo@a.service', 'foo@b.service'], analyze)
+        self.assertEqual({path for _, path, _, _ in findings['foo@a.service']}, {dropIn, fragment})
+        self.assertEqual({path for _, path, _, _ in findings['foo@b.service']}, {fragment})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# This Python file uses the following encoding: utf-8
+from typing import Union
+
+from units import FileSections
+from backend import Backend
+from unitfile import loadUnitSettings
+from instrumentation import timed
+
+# the [Timer] settings shown as the schedule, in this order
+SCHEDULE_KEYS = ('OnCalendar', 'OnActiveSec', 'OnBootSec', 'OnStartupSec', 'OnUnitActiveSec',
+                 'OnUnitInactiveSec', 'RandomizedDelaySec', 'Persistent')
+CHUNK_SIZE = 1000
+
+
+def formatCountdown(seconds: float) -> str:
+    # "1d 2h", "3h 4min", "5min 6s", "7s", the way list-timers prints them
+    seconds = int(seconds)
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if days:
+        return f'{days}d {hours}h'
+    if hours:
+        return f'{hours}h {minutes}min'
+    if minutes:
+        return f'{minutes}min {seconds}s'
+    return f'{seconds}s'
+
+
+class TimerEntry:
+    # One timer: the unit it activates, when it elapses next and when it
+    # last did, in seconds since the epoch (None for never), and its
+    # [Timer] settings as text
+    __slots__ = ('name', 'activates', 'nextElapse', 'lastTrigger', 'schedule')
+
+    def __init__(self, name: str, activates: str, nextElapse: Union[float, None], lastTrigger: Union[float, None],
+                 schedule: str = ''):
+        self.name = name
+        self.activates = activates
+        self.nextElapse = nextElapse
+        self.lastTrigger = lastTrigger
+        self.schedule = schedule
+
+
+def timerSchedule(name: str, fragmentPath: Union[str, None]) -> str:
+    settings = loadUnitSettings(name, fragmentPath)
+    return '; '.join(f'{key}={value}' for key in SCHEDULE_KEYS
+                     for value in settings.get(FileSections.TIMER, key) if value)
+
+
+@timed('worker')
+def loadTimers(backend: Backend, schedules: Union[dict, None] = None) -> list:
+    # every loaded timer, soonest first; the unit files are only read for
+    # the machine we run on, and only for timers missing from schedules
+    schedules = schedules or {}
+    timers = backend.listTimers()
+    fragments = {}
+    if backend.local:
+        names = [timer[0] for timer in timers if timer[0] not in schedules]
+        for start in range(0, len(names), CHUNK_SIZE):
+            for name, values in backend.getProperties(names[start:start + CHUNK_SIZE], ('FragmentPath',)).items():
+                fragments[name] = values.get('FragmentPath')
+    entries = [TimerEntry(name, activates, nextElapse / 1e6 if nextElapse else None,
+                          lastTrigger / 1e6 if lastTrigger else None,
+                          schedules[name] if name in schedules
+                          else timerSchedule(name, fragments[name]) if name in fragments else '')
+               for name, activates, nextElapse, lastTrigger in timers]
+    entries.sort(key=lambda entry: (entry.nextElapse is None, entry.nextElapse or 0, entry.name))
+    return entries
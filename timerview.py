@@ -0,0 +1,173 @@
+# This Python file uses the following encoding: utf-8
+import time
+from typing import Union
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, Signal
+from PySide6.QtWidgets import QHeaderView, QLabel, QTableView, QVBoxLayout, QWidget
+
+from timers import TimerEntry, formatCountdown
+
+DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+ALIGNMENT_ROLE = Qt.ItemDataRole.TextAlignmentRole
+# columns that change every second
+LEFT_COLUMN = 3
+PASSED_COLUMN = 5
+# systemd takes a moment to work out the next elapse after firing
+FIRE_GRACE_S = 2.0
+
+
+def formatTime(seconds: Union[float, None]) -> str:
+    if seconds is None:
+        return 'n/a'
+    return time.strftime('%a %Y-%m-%d %H:%M:%S', time.localtime(seconds))
+
+
+class TimerTableModel(QAbstractTableModel):
+    # The timers as loaded once; the countdowns are worked out from `now`,
+    # which tick() moves on, so nothing is asked from systemd in between
+    HEADERS = ('Timer', 'Activates', 'Next', 'Left', 'Last', 'Passed', 'Schedule')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.now = time.time()
+        self.sortColumn = 2
+        self.sortOrder = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def entryAt(self, row: int) -> TimerEntry:
+        return self.entries[row]
+
+    def nextDue(self) -> Union[float, None]:
+        # the soonest elapse still ahead as of the last load
+        return min((entry.nextElapse for entry in self.entries
+                    if entry.nextElapse is not None and entry.nextElapse > self.now), default=None)
+
+    def data(self, index, role=DISPLAY_ROLE):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        column = index.column()
+        if role == DISPLAY_ROLE:
+            if column == 0:
+                return entry.name
+            if column == 1:
+                return entry.activates
+            if column == 2:
+                return formatTime(entry.nextElapse)
+            if column == LEFT_COLUMN:
+                if entry.nextElapse is None:
+                    return 'n/a'
+                return formatCountdown(max(entry.nextElapse - self.now, 0))
+            if column == 4:
+                return formatTime(entry.lastTrigger)
+            if column == PASSED_COLUMN:
+                if entry.lastTrigger is None:
+                    return 'n/a'
+                return formatCountdown(max(self.now - entry.lastTrigger, 0)) + ' ago'
+            return entry.schedule
+        if role == ALIGNMENT_ROLE and column in (LEFT_COLUMN, PASSED_COLUMN):
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def headerData(self, section: int, orientation, role=DISPLAY_ROLE):
+        if role == DISPLAY_ROLE and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def _key(self, column: int):
+        # Left sorts like Next and Passed like Last; never goes last
+        if column in (2, LEFT_COLUMN):
+            return lambda entry: (entry.nextElapse is None, entry.nextElapse or 0)
+        if column in (4, PASSED_COLUMN):
+            return lambda entry: (entry.lastTrigger is None, -(entry.lastTrigger or 0))
+        attribute = ('name', 'activates')[column] if column < 2 else 'schedule'
+        return lambda entry: getattr(entry, attribute)
+
+    def setEntries(self, entries: list):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        names = [self.entries[index.row()].name for index in persistent]
+        self.entries = sorted(entries, key=self._key(self.sortColumn),
+                              reverse=self.sortOrder == Qt.DescendingOrder)
+        self.now = time.time()
+        rowOf = {entry.name: row for row, entry in enumerate(self.entries)}
+        self.changePersistentIndexList(persistent, [
+            self.index(rowOf[name], index.column()) if name in rowOf else QModelIndex()
+            for name, index in zip(names, persistent)])
+        self.layoutChanged.emit()
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        self.sortColumn = column
+        self.sortOrder = order
+        self.setEntries(self.entries)
+
+    def tick(self):
+        # one dataChanged over the countdown columns, one repaint
+        self.now = time.time()
+        if self.entries:
+            self.dataChanged.emit(self.index(0, LEFT_COLUMN),
+                                  self.index(len(self.entries) - 1, PASSED_COLUMN), [DISPLAY_ROLE])
+
+
+class TimerView(QWidget):
+    # The timers tab. Counts down once a second while ticking; asks for a
+    # reload (timerFired) once the soonest timer has elapsed
+    unitActivated = Signal(str)
+    timerFired = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.summaryLabel = QLabel(self)
+        self.model = TimerTableModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        # enabling sorting sorts by the header's default, put ours back
+        column, order = self.model.sortColumn, self.model.sortOrder
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(column, order)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setWordWrap(False)
+        self.table.clicked.connect(lambda index: self.unitActivated.emit(self.model.entryAt(index.row()).name))
+        self.tickTimer = QTimer(self)
+        self.tickTimer.setInterval(1000)
+        self.tickTimer.timeout.connect(self.tick)
+        self.due = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.summaryLabel)
+        layout.addWidget(self.table, 1)
+
+    def setTicking(self, ticking: bool):
+        if ticking and not self.tickTimer.isActive():
+            self.tick()
+            self.tickTimer.start()
+        elif not ticking:
+            self.tickTimer.stop()
+
+    def setLoading(self):
+        self.summaryLabel.setText('Loading timers...')
+
+    def setEntries(self, entries: list):
+        self.model.setEntries(entries)
+        self.due = self.model.nextDue()
+        waiting = sum(entry.nextElapse is not None for entry in entries)
+        self.summaryLabel.setText(f'{len(entries)} timers, {waiting} waiting to elapse')
+        self.table.resizeColumnsToContents()
+
+    def setError(self, message: str):
+        self.summaryLabel.setText(message)
+
+    def tick(self):
+        self.model.tick()
+        if self.due is not None and self.model.now >= self.due + FIRE_GRACE_S:
+            self.due = None
+            self.timerFired.emit()
@@ -3,7 +3,7 @@
 ################################################################################
 ## Form generated from reading UI file 'form.ui'
 ##
-## Created by: Qt User Interface Compiler version 6.2.4
+## Created by: Qt User Interface Compiler version 6.8.3
 ##
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
@@ -17,7 +17,8 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QAbstractItemView, QApplication, QComboBox, QGridLayout,
     QHeaderView, QLabel, QLineEdit, QPushButton,
-    QSizePolicy, QTableWidget, QTableWidgetItem, QWidget)
+    QSizePolicy, QTabWidget, QTableView, QVBoxLayout,
+    QWidget)
 
 class Ui_Widget(object):
     def setupUi(self, Widget):
@@ -41,42 +42,41 @@ class Ui_Widget(object):
         self.comboBox.addItem("")
         self.comboBox.setObjectName(u"comboBox")
         self.comboBox.setGeometry(QRect(9, 9, 100, 26))
-        self.tableWidget = QTableWidget(Widget)
-        if (self.tableWidget.columnCount() < 1):
-            self.tableWidget.setColumnCount(1)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tableWidget.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        self.tableWidget.setObjectName(u"tableWidget")
-        self.tableWidget.setEnabled(True)
-        self.tableWidget.setGeometry(QRect(10, 80, 891, 291))
-        sizePolicy = QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.tableView = QTableView(Widget)
+        self.tableView.setObjectName(u"tableView")
+        self.tableView.setEnabled(True)
+        self.tableView.setGeometry(QRect(10, 80, 891, 291))
+        sizePolicy = QSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
-        sizePolicy.setHeightForWidth(self.tableWidget.sizePolicy().hasHeightForWidth())
-        self.tableWidget.setSizePolicy(sizePolicy)
-        self.tableWidget.setMaximumSize(QSize(1000, 16777215))
-        self.tableWidget.setLayoutDirection(Qt.LeftToRight)
-        self.tableWidget.setAutoFillBackground(False)
-        self.tableWidget.setEditTriggers(QAbstractItemView.AnyKeyPressed|QAbstractItemView.EditKeyPressed)
-        self.tableWidget.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.tableWidget.setSelectionBehavior(QAbstractItemView.SelectRows)
+        sizePolicy.setHeightForWidth(self.tableView.sizePolicy().hasHeightForWidth())
+        self.tableView.setSizePolicy(sizePolicy)
+        self.tableView.setMaximumSize(QSize(1000, 16777215))
+        self.tableView.setLayoutDirection(Qt.LeftToRight)
+        self.tableView.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tableView.setAutoFillBackground(False)
+        self.tableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableView.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tableView.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.refreshButton = QPushButton(Widget)
         self.refreshButton.setObjectName(u"refreshButton")
         self.refreshButton.setGeometry(QRect(810, 10, 80, 26))
-        self.gridLayoutWidget = QWidget(Widget)
-        self.gridLayoutWidget.setObjectName(u"gridLayoutWidget")
-        self.gridLayoutWidget.setGeometry(QRect(10, 380, 891, 351))
-        self.gridLayout = QGridLayout(self.gridLayoutWidget)
+        self.detailTabs = QTabWidget(Widget)
+        self.detailTabs.setObjectName(u"detailTabs")
+        self.detailTabs.setGeometry(QRect(10, 380, 891, 351))
+        self.detailsTab = QWidget()
+        self.detailsTab.setObjectName(u"detailsTab")
+        self.gridLayout = QGridLayout(self.detailsTab)
         self.gridLayout.setObjectName(u"gridLayout")
         self.gridLayout.setHorizontalSpacing(6)
-        self.gridLayout.setContentsMargins(0, 0, 0, 0)
-        self.labelMoreBefore = QLabel(self.gridLayoutWidget)
+        self.gridLayout.setContentsMargins(-1, -1, -1, 0)
+        self.labelMoreBefore = QLabel(self.detailsTab)
         self.labelMoreBefore.setObjectName(u"labelMoreBefore")
         self.labelMoreBefore.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreBefore, 4, 1, 1, 1)
 
-        self.labelMoreBeforeStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreBeforeStatic = QLabel(self.detailsTab)
         self.labelMoreBeforeStatic.setObjectName(u"labelMoreBeforeStatic")
         self.labelMoreBeforeStatic.setMouseTracking(False)
         self.labelMoreBeforeStatic.setTabletTracking(False)
@@ -85,35 +85,35 @@ class Ui_Widget(object):
 
         self.gridLayout.addWidget(self.labelMoreBeforeStatic, 4, 0, 1, 1)
 
-        self.labelMoreAutorun = QLabel(self.gridLayoutWidget)
+        self.labelMoreAutorun = QLabel(self.detailsTab)
         self.labelMoreAutorun.setObjectName(u"labelMoreAutorun")
         self.labelMoreAutorun.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreAutorun, 3, 1, 1, 1)
 
-        self.labelMoreNameStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreNameStatic = QLabel(self.detailsTab)
         self.labelMoreNameStatic.setObjectName(u"labelMoreNameStatic")
 
         self.gridLayout.addWidget(self.labelMoreNameStatic, 0, 0, 1, 1)
 
-        self.labelMoreConflicts = QLabel(self.gridLayoutWidget)
+        self.labelMoreConflicts = QLabel(self.detailsTab)
         self.labelMoreConflicts.setObjectName(u"labelMoreConflicts")
         self.labelMoreConflicts.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreConflicts, 8, 1, 1, 1)
 
-        self.labelMoreDescription = QLabel(self.gridLayoutWidget)
+        self.labelMoreDescription = QLabel(self.detailsTab)
         self.labelMoreDescription.setObjectName(u"labelMoreDescription")
         self.labelMoreDescription.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreDescription, 1, 1, 1, 1)
 
-        self.labelMoreDescriptionStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreDescriptionStatic = QLabel(self.detailsTab)
         self.labelMoreDescriptionStatic.setObjectName(u"labelMoreDescriptionStatic")
 
         self.gridLayout.addWidget(self.labelMoreDescriptionStatic, 1, 0, 1, 1)
 
-        self.labelMoreAutorunStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreAutorunStatic = QLabel(self.detailsTab)
         self.labelMoreAutorunStatic.setObjectName(u"labelMoreAutorunStatic")
         self.labelMoreAutorunStatic.setMouseTracking(False)
         self.labelMoreAutorunStatic.setTabletTracking(False)
@@ -122,7 +122,7 @@ class Ui_Widget(object):
 
         self.gridLayout.addWidget(self.labelMoreAutorunStatic, 3, 0, 1, 1)
 
-        self.labelMoreAfterStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreAfterStatic = QLabel(self.detailsTab)
         self.labelMoreAfterStatic.setObjectName(u"labelMoreAfterStatic")
         self.labelMoreAfterStatic.setMouseTracking(False)
         self.labelMoreAfterStatic.setTabletTracking(False)
@@ -131,7 +131,7 @@ class Ui_Widget(object):
 
         self.gridLayout.addWidget(self.labelMoreAfterStatic, 5, 0, 1, 1)
 
-        self.labelMoreConflictsStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreConflictsStatic = QLabel(self.detailsTab)
         self.labelMoreConflictsStatic.setObjectName(u"labelMoreConflictsStatic")
         self.labelMoreConflictsStatic.setMouseTracking(False)
         self.labelMoreConflictsStatic.setTabletTracking(False)
@@ -140,13 +140,13 @@ class Ui_Widget(object):
 
         self.gridLayout.addWidget(self.labelMoreConflictsStatic, 8, 0, 1, 1)
 
-        self.labelMoreWants = QLabel(self.gridLayoutWidget)
+        self.labelMoreWants = QLabel(self.detailsTab)
         self.labelMoreWants.setObjectName(u"labelMoreWants")
         self.labelMoreWants.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreWants, 7, 1, 1, 1)
 
-        self.labelMoreWantsStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreWantsStatic = QLabel(self.detailsTab)
         self.labelMoreWantsStatic.setObjectName(u"labelMoreWantsStatic")
         self.labelMoreWantsStatic.setMouseTracking(False)
         self.labelMoreWantsStatic.setTabletTracking(False)
@@ -155,13 +155,13 @@ class Ui_Widget(object):
 
         self.gridLayout.addWidget(self.labelMoreWantsStatic, 7, 0, 1, 1)
 
-        self.labelMoreAfter = QLabel(self.gridLayoutWidget)
+        self.labelMoreAfter = QLabel(self.detailsTab)
         self.labelMoreAfter.setObjectName(u"labelMoreAfter")
         self.labelMoreAfter.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreAfter, 5, 1, 1, 1)
 
-        self.labelMoreStateStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreStateStatic = QLabel(self.detailsTab)
         self.labelMoreStateStatic.setObjectName(u"labelMoreStateStatic")
         self.labelMoreStateStatic.setMouseTracking(False)
         self.labelMoreStateStatic.setTabletTracking(False)
@@ -170,19 +170,19 @@ class Ui_Widget(object):
 
         self.gridLayout.addWidget(self.labelMoreStateStatic, 2, 0, 1, 1)
 
-        self.labelMoreName = QLabel(self.gridLayoutWidget)
+        self.labelMoreName = QLabel(self.detailsTab)
         self.labelMoreName.setObjectName(u"labelMoreName")
         self.labelMoreName.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreName, 0, 1, 1, 1)
 
-        self.labelMoreRequires = QLabel(self.gridLayoutWidget)
+        self.labelMoreRequires = QLabel(self.detailsTab)
         self.labelMoreRequires.setObjectName(u"labelMoreRequires")
         self.labelMoreRequires.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreRequires, 6, 1, 1, 1)
 
-        self.labelMoreRequiresStatic = QLabel(self.gridLayoutWidget)
+        self.labelMoreRequiresStatic = QLabel(self.detailsTab)
         self.labelMoreRequiresStatic.setObjectName(u"labelMoreRequiresStatic")
         self.labelMoreRequiresStatic.setMouseTracking(False)
         self.labelMoreRequiresStatic.setTabletTracking(False)
@@ -191,13 +191,13 @@ class Ui_Widget(object):
 
         self.gridLayout.addWidget(self.labelMoreRequiresStatic, 6, 0, 1, 1)
 
-        self.labelMoreState = QLabel(self.gridLayoutWidget)
+        self.labelMoreState = QLabel(self.detailsTab)
         self.labelMoreState.setObjectName(u"labelMoreState")
         self.labelMoreState.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
         self.gridLayout.addWidget(self.labelMoreState, 2, 1, 1, 1)
 
-        self.labelMorePathToUnitStatic = QLabel(self.gridLayoutWidget)
+        self.labelMorePathToUnitStatic = QLabel(self.detailsTab)
         self.labelMorePathToUnitStatic.setObjectName(u"labelMorePathToUnitStatic")
         self.labelMorePathToUnitStatic.setMouseTracking(False)
         self.labelMorePathToUnitStatic.setTabletTracking(False)
@@ -206,7 +206,7 @@ class Ui_Widget(object):
 
         self.gridLayout.addWidget(self.labelMorePathToUnitStatic, 9, 0, 1, 1)
 
-        self.labelMorePathToUnit = QLabel(self.gridLayoutWidget)
+        self.labelMorePathToUnit = QLabel(self.detailsTab)
         self.labelMorePathToUnit.setObjectName(u"labelMorePathToUnit")
         self.labelMorePathToUnit.setTextInteractionFlags(Qt.LinksAccessibleByMouse|Qt.TextSelectableByMouse)
 
@@ -214,6 +214,42 @@ class Ui_Widget(object):
 
         self.gridLayout.setColumnStretch(0, 1)
         self.gridLayout.setColumnStretch(1, 6)
+        self.detailTabs.addTab(self.detailsTab, "")
+        self.dependenciesTab = QWidget()
+        self.dependenciesTab.setObjectName(u"dependenciesTab")
+        self.dependenciesLayout = QVBoxLayout(self.dependenciesTab)
+        self.dependenciesLayout.setObjectName(u"dependenciesLayout")
+        self.detailTabs.addTab(self.dependenciesTab, "")
+        self.logsTab = QWidget()
+        self.logsTab.setObjectName(u"logsTab")
+        self.logsLayout = QVBoxLayout(self.logsTab)
+        self.logsLayout.setObjectName(u"logsLayout")
+        self.detailTabs.addTab(self.logsTab, "")
+        self.targetsTab = QWidget()
+        self.targetsTab.setObjectName(u"targetsTab")
+        self.targetsLayout = QVBoxLayout(self.targetsTab)
+        self.targetsLayout.setObjectName(u"targetsLayout")
+        self.detailTabs.addTab(self.targetsTab, "")
+        self.bootTab = QWidget()
+        self.bootTab.setObjectName(u"bootTab")
+        self.bootLayout = QVBoxLayout(self.bootTab)
+        self.bootLayout.setObjectName(u"bootLayout")
+        self.detailTabs.addTab(self.bootTab, "")
+        self.resourcesTab = QWidget()
+        self.resourcesTab.setObjectName(u"resourcesTab")
+        self.resourcesLayout = QVBoxLayout(self.resourcesTab)
+        self.resourcesLayout.setObjectName(u"resourcesLayout")
+        self.detailTabs.addTab(self.resourcesTab, "")
+        self.timersTab = QWidget()
+        self.timersTab.setObjectName(u"timersTab")
+        self.timersLayout = QVBoxLayout(self.timersTab)
+        self.timersLayout.setObjectName(u"timersLayout")
+        self.detailTabs.addTab(self.timersTab, "")
+        self.jobsTab = QWidget()
+        self.jobsTab.setObjectName(u"jobsTab")
+        self.jobsLayout = QVBoxLayout(self.jobsTab)
+        self.jobsLayout.setObjectName(u"jobsLayout")
+        self.detailTabs.addTab(self.jobsTab, "")
         self.startStopButton = QPushButton(Widget)
         self.startStopButton.setObjectName(u"startStopButton")
         self.startStopButton.setEnabled(False)
@@ -230,6 +266,7 @@ class Ui_Widget(object):
 
         self.retranslateUi(Widget)
 
+        self.detailTabs.setCurrentIndex(0)
         self.startStopButton.setDefault(False)
 
 
@@ -251,8 +288,6 @@ class Ui_Widget(object):
         self.comboBox.setItemText(10, QCoreApplication.translate("Widget", u"Slice", None))
         self.comboBox.setItemText(11, QCoreApplication.translate("Widget", u"Scope", None))
 
-        ___qtablewidgetitem = self.tableWidget.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("Widget", u"Unit", None));
         self.refreshButton.setText(QCoreApplication.translate("Widget", u"refresh", None))
         self.labelMoreBefore.setText("")
         self.labelMoreBeforeStatic.setText(QCoreApplication.translate("Widget", u"Before", None))
@@ -274,6 +309,14 @@ class Ui_Widget(object):
         self.labelMoreState.setText("")
         self.labelMorePathToUnitStatic.setText(QCoreApplication.translate("Widget", u"Path to unit", None))
         self.labelMorePathToUnit.setText("")
+        self.detailTabs.setTabText(self.detailTabs.indexOf(self.detailsTab), QCoreApplication.translate("Widget", u"Details", None))
+        self.detailTabs.setTabText(self.detailTabs.indexOf(self.dependenciesTab), QCoreApplication.translate("Widget", u"Dependencies", None))
+        self.detailTabs.setTabText(self.detailTabs.indexOf(self.logsTab), QCoreApplication.translate("Widget", u"Logs", None))
+        self.detailTabs.setTabText(self.detailTabs.indexOf(self.targetsTab), QCoreApplication.translate("Widget", u"Targets", None))
+        self.detailTabs.setTabText(self.detailTabs.indexOf(self.bootTab), QCoreApplication.translate("Widget", u"Boot", None))
+        self.detailTabs.setTabText(self.detailTabs.indexOf(self.resourcesTab), QCoreApplication.translate("Widget", u"Resources", None))
+        self.detailTabs.setTabText(self.detailTabs.indexOf(self.timersTab), QCoreApplication.translate("Widget", u"Timers", None))
+        self.detailTabs.setTabText(self.detailTabs.indexOf(self.jobsTab), QCoreApplication.translate("Widget", u"Jobs", None))
         self.startStopButton.setText("")
         self.enableDisableButton.setText("")
     # retranslateUi
@@ -0,0 +1,233 @@
+# This Python file uses the following encoding: utf-8
+import os
+from typing import Union
+
+from units import FileSections
+from instrumentation import timed
+
+
+# Highest priority first, as in systemd's unit search path
+UNIT_PATHS = (
+    '/etc/systemd/system.control',
+    '/run/systemd/system.control',
+    '/run/systemd/transient',
+    '/etc/systemd/system',
+    '/run/systemd/system',
+    '/usr/local/lib/systemd/system',
+    '/usr/lib/systemd/system',
+    '/lib/systemd/system',
+)
+
+
+def sectionName(section: FileSections) -> str:
+    return section.value[1:-1]
+
+
+class UnitFile:
+    # One parsed file: sections map to keys, keys map to every value assigned
+    # in the file in order. An empty value is kept, it resets list settings
+    # when files are merged. lines has the line a section header or a key
+    # first appears on, keyed by (section, None) and (section, key).
+    def __init__(self, path: str = ''):
+        self.path = path
+        self.sections = {}
+        self.errors = []
+        self.lines = {}
+
+    def get(self, section: Union[FileSections, str], key: str) -> list:
+        if isinstance(section, FileSections):
+            section = sectionName(section)
+        return self.sections.get(section, {}).get(key, [])
+
+
+def parseUnitText(text: str, path: str = '') -> UnitFile:
+    unitFile = UnitFile(path)
+    current = None
+    currentName = None
+    pending = None
+    pendingLine = 0
+    for lineNumber, line in enumerate(text.split('\n'), 1):
+        line = line.strip()
+        if pending is not None:
+            # comments inside a continued value are dropped, like systemd does
+            if line.startswith(('#', ';')):
+                continue
+            if line.endswith('\\'):
+                pending += ' ' + line[:-1].strip()
+                continue
+            line = pending + ' ' + line
+            pending = None
+        elif not line or line.startswith(('#', ';')):
+            continue
+        elif line.endswith('\\'):
+            pending = line[:-1].strip()
+            pendingLine = lineNumber
+            continue
+        else:
+            pendingLine = lineNumber
+
+        if line.startswith('['):
+            if not line.endswith(']'):
+                unitFile.errors.append((pendingLine, f'malformed section header: {line}'))
+                current = None
+                continue
+            currentName = line[1:-1]
+            current = unitFile.sections.setdefault(currentName, {})
+            unitFile.lines.setdefault((currentName, None), pendingLine)
+            continue
+        key, sep, value = line.partition('=')
+        if not sep:
+            unitFile.errors.append((pendingLine, f'missing "=": {line}'))
+            continue
+        if current is None:
+            unitFile.errors.append((pendingLine, f'assignment outside of a section: {line}'))
+            continue
+        key = key.strip()
+        current.setdefault(key, []).append(value.strip())
+        unitFile.lines.setdefault((currentName, key), pendingLine)
+    if pending is not None:
+        # a trailing backslash on the last line just ends the value
+        unitFile.errors.append((pendingLine, 'unterminated line continuation'))
+    return unitFile
+
+
+_parseCache = {}
+
+
+def parseUnitFile(path: str) -> Union[UnitFile, None]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _parseCache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        with open(path, 'rb') as f:
+            text = f.read().decode(errors='replace')
+    except OSError:
+        return None
+    unitFile = parseUnitText(text, path)
+    _parseCache[path] = (key, unitFile)
+    return unitFile
+
+
+def invalidateParseCache(path: Union[str, None] = None):
+    if path is None:
+        _parseCache.clear()
+    else:
+        _parseCache.pop(path, None)
+
+
+def dropInDirectoryNames(name: str) -> list:
+    # Lowest precedence first: the type-wide directory ("service.d"), the
+    # prefixes of dashed names ("foo-.service.d"), the template
+    # ("foo@.service.d") and finally the unit itself
+    prefix, dot, suffix = name.rpartition('.')
+    if not dot:
+        return [name + '.d']
+    result = [suffix + '.d']
+    parts = prefix.split('-')
+    for i in range(1, len(parts)):
+        result.append('-'.join(parts[:i]) + '-.' + suffix + '.d')
+    if '@' in prefix and not prefix.endswith('@'):
+        result.append(prefix.split('@')[0] + '@.' + suffix + '.d')
+    result.append(name + '.d')
+    return result
+
+
+def ownerRows(owners: set, names: list, positions: Union[dict, None] = None) -> list:
+    # Rows of names that files owned by owners apply to. A fragment is owned
+    # by the unit it is named after, a drop-in by its directory name without
+    # ".d", which may stand for many units ("service", "foo-.service",
+    # "foo@.service"). positions maps names to rows when the caller keeps it.
+    if positions is None:
+        positions = {name: row for row, name in enumerate(names)}
+    patterns = {owner for owner in owners if '.' not in owner or '-.' in owner or '@.' in owner}
+    rows = {positions[owner] for owner in owners - patterns if owner in positions}
+    if patterns:
+        for row, name in enumerate(names):
+            if any(directory[:-2] in patterns for directory in dropInDirectoryNames(name)):
+                rows.add(row)
+    return sorted(rows)
+
+
+_dirCache = {}
+
+
+def _listConfFiles(directory: str) -> list:
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return []
+    cached = _dirCache.get(directory)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        entries = sorted(entry for entry in os.listdir(directory) if entry.endswith('.conf'))
+    except OSError:
+        entries = []
+    _dirCache[directory] = (mtime, entries)
+    return entries
+
+
+def findDropIns(name: str, searchPaths: tuple = UNIT_PATHS) -> list:
+    # systemd applies drop-ins sorted by file name, whatever directory they
+    # are in; a file name in a higher priority directory masks the same name
+    # further down the search path, and within one search path the unit's
+    # own directory masks the template, prefix and type-wide ones
+    directoryNames = dropInDirectoryNames(name)[::-1]
+    chosen = {}
+    for basePath in searchPaths:
+        for directoryName in directoryNames:
+            directory = os.path.join(basePath, directoryName)
+            for entry in _listConfFiles(directory):
+                if entry not in chosen:
+                    chosen[entry] = os.path.join(directory, entry)
+    return [chosen[entry] for entry in sorted(chosen)]
+
+
+def mergeUnitFiles(files: list) -> dict:
+    effective = {}
+    for unitFile in files:
+        for section, keys in unitFile.sections.items():
+            target = effective.setdefault(section, {})
+            for key, values in keys.items():
+                merged = target.setdefault(key, [])
+                for value in values:
+                    if value:
+                        merged.append(value)
+                    else:
+                        merged.clear()
+    return effective
+
+
+class UnitSettings:
+    def __init__(self, name: str, fragment: Union[UnitFile, None], dropIns: list):
+        self.name = name
+        self.fragment = fragment
+        self.dropIns = dropIns
+        files = ([fragment] if fragment is not None else []) + dropIns
+        self.effective = mergeUnitFiles(files)
+
+    def get(self, section: Union[FileSections, str], key: str) -> list:
+        if isinstance(section, FileSections):
+            section = sectionName(section)
+        return self.effective.get(section, {}).get(key, [])
+
+    def value(self, section: Union[FileSections, str], key: str) -> Union[str, None]:
+        values = self.get(section, key)
+        return values[-1] if values else None
+
+
+@timed('parse')
+def loadUnitSettings(name: str, fragmentPath: Union[str, None],
+                     searchPaths: Union[tuple, None] = None) -> UnitSettings:
+    # UNIT_PATHS is looked up on every call so it can be pointed elsewhere,
+    # e.g. at the synthetic tree of the benchmarks
+    searchPaths = searchPaths or UNIT_PATHS
+    fragment = parseUnitFile(fragmentPath) if fragmentPath else None
+    dropIns = [parsed for parsed in map(parseUnitFile, findDropIns(name, searchPaths))
+               if parsed is not None]
+    return UnitSettings(name, fragment, dropIns)
@@ -0,0 +1,418 @@
+# This Python file uses the following encoding: utf-8
+import bisect
+import sys
+from typing import Union
+from PySide6.QtCore import QAbstractProxyModel, QAbstractTableModel, QModelIndex, Qt, QTimer
+from PySide6.QtGui import QFont, QIcon
+
+from units import UnitType, Unit, UnitListDiff
+from verify import ERROR, formatFinding
+from core import filterRows
+from instrumentation import timed
+
+# Looking up Qt.DisplayRole and friends costs microseconds in PySide, and
+# data() runs for every painted cell and role
+DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+DECORATION_ROLE = Qt.ItemDataRole.DecorationRole
+FONT_ROLE = Qt.ItemDataRole.FontRole
+TOOLTIP_ROLE = Qt.ItemDataRole.ToolTipRole
+HORIZONTAL = Qt.Orientation.Horizontal
+# findings listed in a tooltip before it is cut short
+TOOLTIP_FINDINGS = 10
+
+
+class UnitTableModel(QAbstractTableModel):
+    HEADERS = ('Unit', 'Load', 'Active', 'Sub', 'Enabled', 'Description')
+    COLUMN_FIELDS = ('name', 'loadState', 'activeState', 'subState', 'unitFileState', 'description')
+    # columns with few distinct values, offered as checklists in the header menu
+    FILTER_COLUMNS = (1, 2, 3, 4)
+    PROPERTY_FIELDS = {'Description': 'description', 'UnitFileState': 'unitFileState',
+                       'LoadState': 'loadState', 'ActiveState': 'activeState', 'SubState': 'subState'}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.units = []
+        self.busyUnits = set()
+        self.busyIcon = QIcon()
+        # units whose files changed since systemd loaded them
+        self.staleUnits = set()
+        self.staleIcon = QIcon()
+        # units verified so far, and the findings of those with any, see
+        # verify.verifyUnitFiles
+        self.verifiedUnits = set()
+        self.findings = {}
+        self.errorIcon = QIcon()
+        self.warningIcon = QIcon()
+        self._rows = {}
+        self._busyFont = QFont()
+        self._busyFont.setItalic(True)
+
+    @timed('model')
+    def setUnits(self, units: list):
+        self.beginResetModel()
+        self.units = units
+        self._rows = {unit.name: row for row, unit in enumerate(units)}
+        self.endResetModel()
+
+    @timed('model')
+    def applyDiff(self, diff: UnitListDiff):
+        # Keeps the list sorted by name and touches only the affected rows,
+        # so views keep their selection and scroll position
+        if diff.removed:
+            rows = sorted(self._rows[name] for name in diff.removed)
+            while rows:
+                last = rows.pop()
+                first = last
+                while rows and rows[-1] == first - 1:
+                    first = rows.pop()
+                self.beginRemoveRows(QModelIndex(), first, last)
+                del self.units[first:last + 1]
+                self.endRemoveRows()
+        for unit in sorted(diff.added, key=lambda x: x.name):
+            row = bisect.bisect_left(self.units, unit.name, key=lambda x: x.name)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.units.insert(row, unit)
+            self.endInsertRows()
+        if diff.removed or diff.added:
+            self._rows = {unit.name: row for row, unit in enumerate(self.units)}
+        for unit, fresh in diff.changed:
+            unit.update(fresh)
+            row = self._rows[unit.name]
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    @timed('model')
+    def updateUnits(self, changes: dict):
+        # changes maps unit names to systemd properties, as reported by
+        # PropertiesChanged; properties the table does not show are ignored
+        for name, values in changes.items():
+            row = self._rows.get(name)
+            if row is None:
+                continue
+            unit = self.units[row]
+            changed = False
+            for key, attribute in self.PROPERTY_FIELDS.items():
+                if key in values and getattr(unit, attribute) != values[key]:
+                    setattr(unit, attribute, sys.intern(values[key]))
+                    changed = True
+            if changed:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def unitAt(self, row: int) -> Unit:
+        return self.units[row]
+
+    def rowOf(self, name: str) -> Union[int, None]:
+        return self._rows.get(name)
+
+    def setBusy(self, name: str, busy: bool):
+        if busy:
+            self.busyUnits.add(name)
+        else:
+            self.busyUnits.discard(name)
+        row = self._rows.get(name)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def setStale(self, checked: set, stale: set):
+        # the units in checked are stale when they are in stale; only rows
+        # whose flag flipped are repainted
+        flipped = (checked & self.staleUnits) ^ stale
+        self.staleUnits = (self.staleUnits - checked) | stale
+        for name in flipped:
+            row = self._rows.get(name)
+            if row is not None:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, 0))
+
+    def setFindings(self, checked: set, findings: dict):
+        # like setStale, for the findings of the units in checked
+        changed = {name for name in checked if self.findings.get(name) != findings.get(name)}
+        self.verifiedUnits |= checked
+        for name in checked:
+            if name in findings:
+                self.findings[name] = findings[name]
+            else:
+                self.findings.pop(name, None)
+        for name in changed:
+            row = self._rows.get(name)
+            if row is not None:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, 0))
+
+    def toolTip(self, name: str) -> Union[str, None]:
+        lines = []
+        if name in self.staleUnits:
+            lines.append('Changed on disk, systemctl daemon-reload needed')
+        findings = self.findings.get(name, ())
+        lines += [formatFinding(finding) for finding in findings[:TOOLTIP_FINDINGS]]
+        if len(findings) > TOOLTIP_FINDINGS:
+            lines.append(f'... and {len(findings) - TOOLTIP_FINDINGS} more')
+        return '\n'.join(lines) or None
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.units)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        return self.cellData(index.row(), index.column(), role)
+
+    def cellData(self, row: int, column: int, role=Qt.DisplayRole):
+        # data() without the QModelIndex, the proxy asks for every painted
+        # cell and role
+        unit = self.units[row]
+        if role == DISPLAY_ROLE:
+            return getattr(unit, self.COLUMN_FIELDS[column])
+        if role == DECORATION_ROLE and column == 0:
+            if unit.name in self.busyUnits:
+                return self.busyIcon
+            findings = self.findings.get(unit.name)
+            if findings and any(finding[0] == ERROR for finding in findings):
+                return self.errorIcon
+            if unit.name in self.staleUnits:
+                return self.staleIcon
+            if findings:
+                return self.warningIcon
+            return None
+        if role == TOOLTIP_ROLE and column == 0:
+            return self.toolTip(unit.name)
+        if role == FONT_ROLE and unit.name in self.busyUnits:
+            return self._busyFont
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == DISPLAY_ROLE and orientation == HORIZONTAL:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def columnValues(self, column: int) -> list:
+        field = self.COLUMN_FIELDS[column]
+        return sorted({getattr(unit, field) for unit in self.units})
+
+
+class UnitFilterProxyModel(QAbstractProxyModel):
+    # Filters by unit type, by the accepted values of single columns and by a
+    # precomputed set of matching rows (see search.UnitSearchIndex), and sorts
+    # by one column. The visible rows are kept as a plain list, so a filter
+    # or sort change costs one list comprehension, one sort and a layout
+    # change instead of a Python filterAcceptsRow()/lessThan() call per unit.
+    # In the natural order (by name, ascending) the list is ascending like the
+    # source rows, which row insertion and removal rely on.
+    RESORT_MS = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.unitType = UnitType.ALL
+        self.acceptedRows = None
+        self.columnFilters = {}
+        self.sortColumn = 0
+        self.sortOrder = Qt.AscendingOrder
+        self._rows = []
+        self._positions = None
+        self._pendingRemoval = (0, 0)
+        # state changes may move rows when sorting or filtering by state,
+        # they are put in place in one go after a burst of updates
+        self._resortTimer = QTimer(self)
+        self._resortTimer.setSingleShot(True)
+        self._resortTimer.setInterval(self.RESORT_MS)
+        self._resortTimer.timeout.connect(self.refilter)
+
+    def setSourceModel(self, model: UnitTableModel):
+        super().setSourceModel(model)
+        model.modelReset.connect(self._onSourceReset)
+        model.dataChanged.connect(self._onSourceDataChanged)
+        model.rowsAboutToBeRemoved.connect(self._onSourceRowsAboutToBeRemoved)
+        model.rowsRemoved.connect(self._onSourceRowsRemoved)
+        model.rowsInserted.connect(self._onSourceRowsInserted)
+        self._onSourceReset()
+
+    def setUnitType(self, unitType: UnitType):
+        if unitType != self.unitType:
+            self.unitType = unitType
+            self.refilter()
+
+    def setAcceptedRows(self, rows: Union[list, None]):
+        if rows is not self.acceptedRows:
+            self.acceptedRows = rows
+            self.refilter()
+
+    def setColumnFilter(self, column: int, values: Union[set, None]):
+        # only units whose value in column is one of values are shown, None
+        # removes the filter
+        if values is None:
+            if self.columnFilters.pop(column, None) is None:
+                return
+        else:
+            self.columnFilters[column] = set(values)
+        self.headerDataChanged.emit(Qt.Horizontal, column, column)
+        self.refilter()
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        column = max(column, 0)
+        if (column, order) != (self.sortColumn, self.sortOrder):
+            self.sortColumn = column
+            self.sortOrder = order
+            self.refilter()
+
+    def unitAt(self, index) -> Unit:
+        return self.sourceModel().unitAt(self._rows[index.row()])
+
+    def _naturalOrder(self) -> bool:
+        return self.sortColumn == 0 and self.sortOrder == Qt.AscendingOrder
+
+    def _filter(self, rows: Union[list, range]) -> list:
+        fieldFilters = {UnitTableModel.COLUMN_FIELDS[column]: values
+                        for column, values in self.columnFilters.items()}
+        return filterRows(self.sourceModel().units, rows, self.unitType, fieldFilters)
+
+    def _filteredRows(self) -> list:
+        units = self.sourceModel().units
+        rows = self._filter(range(len(units)) if self.acceptedRows is None else self.acceptedRows)
+        if not self._naturalOrder():
+            # the rows come in name order and the sort is stable, so equal
+            # values stay ordered by name
+            field = UnitTableModel.COLUMN_FIELDS[self.sortColumn]
+            rows.sort(key=lambda row: getattr(units[row], field), reverse=self.sortOrder == Qt.DescendingOrder)
+        return rows
+
+    def _onSourceReset(self):
+        self.beginResetModel()
+        self.acceptedRows = None
+        self._rows = self._filteredRows()
+        self._positions = None
+        self.endResetModel()
+
+    @timed('model')
+    def refilter(self):
+        self._resortTimer.stop()
+        self.layoutAboutToBeChanged.emit()
+        oldPersistent = self.persistentIndexList()
+        sourceRows = [self._rows[index.row()] for index in oldPersistent]
+        self._rows = self._filteredRows()
+        self._positions = None
+        newPersistent = []
+        for index, sourceRow in zip(oldPersistent, sourceRows):
+            row = self._positionOf(sourceRow)
+            newPersistent.append(QModelIndex() if row is None else self.index(row, index.column()))
+        self.changePersistentIndexList(oldPersistent, newPersistent)
+        self.layoutChanged.emit()
+
+    def _positionOf(self, sourceRow: int) -> Union[int, None]:
+        if self._positions is None:
+            self._positions = {row: position for position, row in enumerate(self._rows)}
+        return self._positions.get(sourceRow)
+
+    def _onSourceRowsAboutToBeRemoved(self, parent, first: int, last: int):
+        if not self._naturalOrder():
+            # the removed rows are scattered over the sorted list, they go
+            # right away as contiguous runs from the bottom up
+            self._pendingRemoval = (0, 0)
+            positions = sorted(position for position in map(self._positionOf, range(first, last + 1))
+                               if position is not None)
+            while positions:
+                end = positions.pop()
+                begin = end
+                while positions and positions[-1] == begin - 1:
+                    begin = positions.pop()
+                self.beginRemoveRows(QModelIndex(), begin, end)
+                del self._rows[begin:end + 1]
+                self._positions = None
+                self.endRemoveRows()
+            return
+        begin = bisect.bisect_left(self._rows, first)
+        end = bisect.bisect_right(self._rows, last)
+        self._pendingRemoval = (begin, end)
+        if end > begin:
+            self.beginRemoveRows(QModelIndex(), begin, end - 1)
+
+    def _onSourceRowsRemoved(self, parent, first: int, last: int):
+        begin, end = self._pendingRemoval
+        count = last - first + 1
+        if self._naturalOrder():
+            self._rows = self._rows[:begin] + [row - count for row in self._rows[end:]]
+        else:
+            self._rows = [row - count if row > last else row for row in self._rows]
+        if self.acceptedRows is not None:
+            position = bisect.bisect_left(self.acceptedRows, first)
+            tail = bisect.bisect_right(self.acceptedRows, last)
+            self.acceptedRows = self.acceptedRows[:position] + [row - count for row in self.acceptedRows[tail:]]
+        self._positions = None
+        if end > begin:
+            self.endRemoveRows()
+
+    def _onSourceRowsInserted(self, parent, first: int, last: int):
+        # New rows are shown when they pass the type and column filters; the
+        # search results are recomputed by the owner once the source model
+        # settled
+        count = last - first + 1
+        inserted = self._filter(range(first, last + 1))
+        if self.acceptedRows is not None:
+            position = bisect.bisect_left(self.acceptedRows, first)
+            self.acceptedRows = (self.acceptedRows[:position] + list(range(first, last + 1))
+                                 + [row + count for row in self.acceptedRows[position:]])
+        if not self._naturalOrder():
+            # appended at the bottom, then moved to their sorted place
+            self._rows = [row + count if row >= first else row for row in self._rows]
+            self._positions = None
+            if inserted:
+                self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(inserted) - 1)
+                self._rows += inserted
+                self.endInsertRows()
+                self.refilter()
+            return
+        begin = bisect.bisect_left(self._rows, first)
+        tail = [row + count for row in self._rows[begin:]]
+        if inserted:
+            self.beginInsertRows(QModelIndex(), begin, begin + len(inserted) - 1)
+        self._rows = self._rows[:begin] + inserted + tail
+        self._positions = None
+        if inserted:
+            self.endInsertRows()
+
+    def _onSourceDataChanged(self, topLeft, bottomRight, roles=()):
+        for sourceRow in range(topLeft.row(), bottomRight.row() + 1):
+            row = self._positionOf(sourceRow)
+            if row is not None:
+                self.dataChanged.emit(self.index(row, topLeft.column()),
+                                      self.index(row, bottomRight.column()), roles)
+        if self.columnFilters or self.sortColumn != 0:
+            self._resortTimer.start()
+
+    def index(self, row: int, column: int, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self._rows):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+    def mapToSource(self, proxyIndex):
+        if not proxyIndex.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self._rows[proxyIndex.row()], proxyIndex.column())
+
+    def mapFromSource(self, sourceIndex):
+        if not sourceIndex.isValid():
+            return QModelIndex()
+        row = self._positionOf(sourceIndex.row())
+        return QModelIndex() if row is None else self.index(row, sourceIndex.column())
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        return self.sourceModel().cellData(self._rows[index.row()], index.column(), role)
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if orientation == HORIZONTAL:
+            header = self.sourceModel().headerData(section, orientation, role)
+            if role == DISPLAY_ROLE and section in self.columnFilters:
+                header += ' *'
+            return header
+        # rows are numbered as shown, not by their place in the source
+        return section + 1 if role == DISPLAY_ROLE else None
@@ -0,0 +1,95 @@
+# This Python file uses the following encoding: utf-8
+import enum
+import sys
+from typing import Union
+
+
+class UnitType(enum.Enum):
+    ALL = 0
+    SERVICE = 'service'
+    MOUNT = 'mount'
+    SWAP = 'swap'
+    SOCKET = 'socket'
+    TARGET = 'target'
+    DEVICE = 'device'
+    AUTOMOUNT = 'automount'
+    TIMER = 'timer'
+    PATH = 'path'
+    SLICE = 'slice'
+    SCOPE = 'scope'
+
+
+class FileSections(enum.Enum):
+    UNIT = '[Unit]'
+    INSTALL = '[Install]'
+    SERVICE = '[Service]'
+    SOCKET = '[Socket]'
+    DEVICE = '[Device]'
+    MOUNT = '[Mount]'
+    AUTOMOUNT = '[Automount]'
+    SWAP = '[Swap]'
+    TARGET = '[Target]'
+    PATH = '[Path]'
+    TIMER = '[Timer]'
+    SLICE = '[Slice]'
+    SCOPE = '[Scope]'
+
+
+UNIT_TYPES = {unitType.value: unitType for unitType in UnitType if unitType != UnitType.ALL}
+
+
+def unitTypeOf(name: str) -> Union[UnitType, None]:
+    return UNIT_TYPES.get(name.rpartition('.')[2])
+
+
+class Unit:
+    # One row of the unit table. There are tens of thousands of them on big
+    # hosts, so no per instance dict, and the few distinct state strings are
+    # interned instead of being kept once per unit
+    __slots__ = ('name', 'unitType', 'description', 'unitFileState', 'loadState', 'activeState', 'subState')
+    STATE_FIELDS = ('unitFileState', 'loadState', 'activeState', 'subState')
+
+    def __init__(self, name: str, unitType: Union[UnitType, None], description: str = '',
+                 unitFileState: str = '', loadState: str = '', activeState: str = '', subState: str = ''):
+        self.name = name
+        self.unitType = unitType
+        self.description = description
+        self.unitFileState = sys.intern(unitFileState)
+        self.loadState = sys.intern(loadState)
+        self.activeState = sys.intern(activeState)
+        self.subState = sys.intern(subState)
+
+    def sameState(self, other: 'Unit') -> bool:
+        return (self.unitType == other.unitType and self.description == other.description
+                and self.unitFileState == other.unitFileState and self.loadState == other.loadState
+                and self.activeState == other.activeState and self.subState == other.subState)
+
+    def update(self, other: 'Unit'):
+        self.unitType = other.unitType
+        self.description = other.description
+        self.unitFileState = other.unitFileState
+        self.loadState = other.loadState
+        self.activeState = other.activeState
+        self.subState = other.subState
+
+
+class UnitListDiff:
+    def __init__(self, added: list, removed: list, changed: list):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diffUnits(old: list, new: list) -> UnitListDiff:
+    # changed holds (current unit, fresh unit) pairs so the current objects
+    # can be updated in place and keep their identity
+    current = {unit.name: unit for unit in old}
+    fresh = {unit.name: unit for unit in new}
+    added = [unit for unit in new if unit.name not in current]
+    removed = [unit.name for unit in old if unit.name not in fresh]
+    changed = [(unit, fresh[unit.name]) for unit in old
+               if unit.name in fresh and not unit.sameState(fresh[unit.name])]
+    return UnitListDiff(added, removed, changed)
@@ -0,0 +1,204 @@
+# This Python file uses the following encoding: utf-8
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import time
+from typing import Union
+from PySide6.QtCore import QObject, QSocketNotifier, QTimer, Signal
+
+import unitfile
+from units import unitTypeOf
+from instrumentation import timed
+
+# from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+# no IN_MODIFY: a file being written is reported once, when it is closed
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+APPEARED = IN_CREATE | IN_MOVED_TO
+DISAPPEARED = IN_DELETE | IN_MOVED_FROM
+EVENT_HEADER = struct.Struct('iIII')
+READ_SIZE = 64 * 1024
+# a burst is reported once it has been quiet this long, or after the
+# longer time when it keeps going
+COALESCE_MS = 300
+MAX_DELAY_MS = 2000
+
+
+class Inotify:
+    # inotify through ctypes, non-blocking; read() returns what is queued
+    # as (watch descriptor, mask, name) tuples
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        try:
+            self._addWatch = libc.inotify_add_watch
+            self._removeWatch = libc.inotify_rm_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self._addWatch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._removeWatch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+    def addWatch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._addWatch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()), path)
+        return wd
+
+    def removeWatch(self, wd: int):
+        self._removeWatch(self.fd, wd)
+
+    def read(self) -> list:
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                events.append((wd, mask, os.fsdecode(name)))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class UnitFileChanges:
+    # One batch of edits: the owners of the files touched (see
+    # unitfile.ownerRows), whether unit files appeared or disappeared, and
+    # whether the kernel dropped events, in which case anything may have
+    # changed
+    def __init__(self):
+        self.owners = set()
+        self.paths = set()
+        self.filesAddedOrRemoved = False
+        self.overflow = False
+
+    def __bool__(self) -> bool:
+        return bool(self.owners or self.overflow)
+
+
+class UnitFileWatcher(QObject):
+    # Watches the unit directories and their drop-in directories and reports
+    # bursts of changes as one UnitFileChanges
+    changed = Signal(object)
+
+    def __init__(self, searchPaths: Union[tuple, None] = None, coalesceMs: int = COALESCE_MS,
+                 maxDelayMs: int = MAX_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.searchPaths = tuple(searchPaths or unitfile.UNIT_PATHS)
+        self.maxDelay = maxDelayMs / 1000
+        self.inotify = Inotify()
+        self.directories = {}
+        # the unit files in the base directories, so that a file renamed
+        # over another one is not taken for a new unit
+        self.unitFiles = set()
+        self.pending = UnitFileChanges()
+        self._firstEvent = None
+        for path in self.searchPaths:
+            self._watchTree(path)
+        self._notifier = QSocketNotifier(self.inotify.fd, QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self._onReadable)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(coalesceMs)
+        self._timer.timeout.connect(self.flush)
+
+    def _watch(self, path: str) -> bool:
+        try:
+            self.directories[self.inotify.addWatch(path)] = path
+        except OSError:
+            return False
+        return True
+
+    def _watchTree(self, path: str):
+        # a unit directory and the drop-in directories in it
+        if not self._watch(path):
+            return
+        try:
+            for entry in os.scandir(path):
+                if entry.name.endswith('.d') and entry.is_dir(follow_symlinks=False):
+                    self._watch(entry.path)
+                elif unitTypeOf(entry.name) is not None:
+                    self.unitFiles.add(entry.path)
+        except OSError:
+            pass
+
+    @timed()
+    def _onReadable(self):
+        for wd, mask, name in self.inotify.read():
+            if mask & IN_Q_OVERFLOW:
+                self.pending.overflow = True
+                continue
+            directory = self.directories.get(wd)
+            if mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+            self._record(directory, name, mask)
+        if self.pending:
+            now = time.monotonic()
+            if self._firstEvent is None:
+                self._firstEvent = now
+            if now - self._firstEvent >= self.maxDelay:
+                self.flush()
+            else:
+                self._timer.start()
+
+    def _record(self, directory: str, name: str, mask: int):
+        path = os.path.join(directory, name)
+        if directory in self.searchPaths:
+            # temporary files of editors and package managers are left out
+            if name.endswith('.d'):
+                if mask & IN_ISDIR and mask & APPEARED and self._watch(path):
+                    # files may have landed before the watch was in place
+                    self.pending.paths.add(path)
+                self.pending.owners.add(name[:-2])
+            elif not mask & IN_ISDIR and unitTypeOf(name) is not None:
+                self.pending.owners.add(name)
+                self.pending.paths.add(path)
+                if mask & APPEARED and path not in self.unitFiles:
+                    self.unitFiles.add(path)
+                    self.pending.filesAddedOrRemoved = True
+                elif mask & DISAPPEARED and not os.path.lexists(path):
+                    self.unitFiles.discard(path)
+                    self.pending.filesAddedOrRemoved = True
+        elif name.endswith('.conf'):
+            self.pending.owners.add(os.path.basename(directory)[:-2])
+            self.pending.paths.add(path)
+
+    def flush(self):
+        self._timer.stop()
+        self._firstEvent = None
+        if not self.pending:
+            return
+        changes, self.pending = self.pending, UnitFileChanges()
+        self.changed.emit(changes)
+
+    def close(self):
+        self._notifier.setEnabled(False)
+        self._timer.stop()
+        self.inotify.close()
@@ -0,0 +1,292 @@
+# This Python file uses the following encoding: utf-8
+# Checks of unit files: the parser's own (syntax, sections unknown or of
+# another unit type, unknown [Unit] and [Install] keys) and whatever
+# `systemd-analyze verify` has to say. Results are kept by a hash of the
+# file contents, a file is only verified again once it or one of its
+# drop-ins changed. A finding is a (severity, path, line, message) tuple,
+# line is 0 when the message is about the whole file.
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import subprocess
+import zlib
+from typing import Callable, Union
+
+import unitfile
+from units import FileSections, UnitType, unitTypeOf
+from unitfile import findDropIns, parseUnitText, sectionName
+from backend import runLocally
+from snapshot import cacheDirectory
+from instrumentation import timed
+
+VERIFY_CACHE_VERSION = 2
+ERROR = 'error'
+WARNING = 'warning'
+# systemd-analyze processes running at once, and files per process
+VERIFY_WORKERS = os.cpu_count() or 2
+VERIFY_BATCH = 32
+VERIFY_TIMEOUT = 60
+# sections only some unit types have; [Unit] and [Install] go anywhere
+SECTION_TYPES = {sectionName(section): UnitType[section.name] for section in FileSections
+                 if section not in (FileSections.UNIT, FileSections.INSTALL)}
+KNOWN_SECTIONS = {sectionName(section) for section in FileSections}
+# the [Unit] and [Install] keys of systemd's load-fragment-gperf.gperf.in
+UNIT_KEYS = {
+    'Description', 'Documentation', 'Wants', 'Requires', 'Requisite', 'BindsTo', 'PartOf', 'Upholds',
+    'Conflicts', 'Before', 'After', 'OnFailure', 'OnSuccess', 'PropagatesReloadTo', 'ReloadPropagatedFrom',
+    'PropagatesStopTo', 'StopPropagatedFrom', 'JoinsNamespaceOf', 'RequiresMountsFor', 'WantsMountsFor',
+    'OnFailureJobMode', 'OnSuccessJobMode', 'IgnoreOnIsolate', 'StopWhenUnneeded', 'RefuseManualStart',
+    'RefuseManualStop', 'AllowIsolate', 'DefaultDependencies', 'SurviveFinalKillSignal', 'CollectMode', 'FailureAction',
+    'SuccessAction', 'FailureActionExitStatus', 'SuccessActionExitStatus', 'JobTimeoutSec',
+    'JobRunningTimeoutSec', 'JobTimeoutAction', 'JobTimeoutRebootArgument', 'StartLimitIntervalSec',
+    'StartLimitBurst', 'StartLimitAction', 'RebootArgument', 'SourcePath',
+    # older spellings systemd still takes
+    'BindTo', 'OnFailureIsolate', 'StartLimitInterval', 'RequiresOverridable', 'RequisiteOverridable',
+    'IgnoreOnSnapshot', 'PropagateReloadTo', 'PropagateReloadFrom',
+}
+# Condition...= and Assert...= are open ended
+UNIT_KEY_PREFIXES = ('Condition', 'Assert')
+INSTALL_KEYS = {'Alias', 'WantedBy', 'RequiredBy', 'UpheldBy', 'Also', 'DefaultInstance'}
+# "/path/foo.service:12: message" or "foo.service: message"
+ANALYZE_LINE = re.compile(r'^(?P<subject>[^\s:]+?)(?::(?P<line>\d+))?: (?P<message>.+)$')
+ANALYZE_ERROR = re.compile(r'Refusing|[Ff]ailed|not executable|not found|[Nn]o such file')
+
+
+def verifyCachePath() -> str:
+    return os.path.join(cacheDirectory(), 'verify.cache')
+
+
+def formatFinding(finding: tuple) -> str:
+    severity, path, line, message = finding
+    where = os.path.basename(path) + (f':{line}' if line else '')
+    return f'{where}: {message}'
+
+
+def checkUnitFile(unitFile: unitfile.UnitFile, unitType: Union[UnitType, None]) -> list:
+    # the parser's findings for one fragment or drop-in of a unit of
+    # unitType; sections and keys starting with "X-" are left to their users
+    findings = [(WARNING, unitFile.path, line, message) for line, message in unitFile.errors]
+    for section, keys in unitFile.sections.items():
+        line = unitFile.lines.get((section, None), 0)
+        if section.startswith('X-'):
+            continue
+        if section not in KNOWN_SECTIONS:
+            findings.append((WARNING, unitFile.path, line, f'unknown section [{section}]'))
+            continue
+        sectionType = SECTION_TYPES.get(section)
+        if sectionType is not None and unitType is not None and sectionType != unitType:
+            findings.append((WARNING, unitFile.path, line,
+                             f'[{section}] does not apply to .{unitType.value} units'))
+            continue
+        known = UNIT_KEYS if section == 'Unit' else INSTALL_KEYS if section == 'Install' else None
+        if known is None:
+            continue
+        for key in keys:
+            if key in known or key.startswith('X-') or (section == 'Unit' and key.startswith(UNIT_KEY_PREFIXES)):
+                continue
+            findings.append((WARNING, unitFile.path, unitFile.lines.get((section, key), 0),
+                             f'unknown key {key}= in [{section}]'))
+    return findings
+
+
+def parseAnalyzeOutput(output: str, files: dict) -> dict:
+    # {fragment path: [finding]} from `systemd-analyze verify`; files maps
+    # every fragment of the run to its drop-ins. Lines about units that
+    # were not asked about, dependencies say, are dropped.
+    subjects = {}
+    for fragment, dropIns in files.items():
+        subjects[fragment] = fragment
+        subjects[os.path.basename(fragment)] = fragment
+        for dropIn in dropIns:
+            subjects[dropIn] = fragment
+    findings = {}
+    for line in output.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        severity = ERROR if ANALYZE_ERROR.search(line) else WARNING
+        match = ANALYZE_LINE.match(line)
+        if match is not None and match.group('subject') in subjects:
+            subject = match.group('subject')
+            path = subject if subject.startswith('/') else subjects[subject]
+            findings.setdefault(subjects[subject], []).append(
+                (severity, path, int(match.group('line') or 0), match.group('message')))
+            continue
+        # "Unit foo.service not found." and the like
+        for fragment in files:
+            if os.path.basename(fragment) in line.split():
+                findings.setdefault(fragment, []).append((severity, fragment, 0, line))
+                break
+    return findings
+
+
+def contentKey(paths: list) -> tuple:
+    # (hash, {path: text}) of the files in order; the hash is None when one
+    # of them could not be read
+    digest = hashlib.blake2b(digest_size=16)
+    texts = {}
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None, texts
+        digest.update(path.encode(errors='surrogateescape') + b'\0' + data + b'\0')
+        texts[path] = data.decode(errors='replace')
+    return digest.hexdigest(), texts
+
+
+def findFragment(name: str, searchPaths: tuple) -> Union[str, None]:
+    # the file a unit is loaded from; instances come from their template
+    candidates = [name]
+    prefix, at, rest = name.partition('@')
+    if at and not rest.startswith('.'):
+        candidates.append(f'{prefix}@.{rest.rpartition(".")[2]}')
+    for candidate in candidates:
+        for basePath in searchPaths:
+            path = os.path.join(basePath, candidate)
+            if os.path.lexists(path):
+                # a masked unit points at /dev/null
+                return path if os.path.isfile(path) else None
+    return None
+
+
+def verifyBatch(batch: list, runner: Callable) -> tuple:
+    # ({key: [finding]}, analyzed) for (key, fragment, dropIns, texts) entries;
+    # analyzed is False when systemd-analyze could not be run, the parser's
+    # findings are all there is then
+    # instances of one template are verified once with the drop-ins of all
+    # of them, each keeps the lines about its own
+    files = {}
+    for _, fragment, dropIns, _ in batch:
+        shared = files.setdefault(fragment, [])
+        shared += [dropIn for dropIn in dropIns if dropIn not in shared]
+    analyzed = True
+    try:
+        result = runner(['systemd-analyze', 'verify', '--man=no', '--no-pager', *files], VERIFY_TIMEOUT,
+                        subprocess.PIPE)
+        output = (result.stdout or b'').decode(errors='replace') + (result.stderr or b'').decode(errors='replace')
+        reported = parseAnalyzeOutput(output, files)
+    except (OSError, subprocess.SubprocessError):
+        analyzed = False
+        reported = {}
+    findings = {}
+    for key, fragment, dropIns, texts in batch:
+        unitType = unitTypeOf(os.path.basename(fragment))
+        found = []
+        for path in [fragment] + dropIns:
+            found += checkUnitFile(parseUnitText(texts[path], path), unitType)
+        others = set(files[fragment]).difference(dropIns)
+        findings[key] = found + [finding for finding in reported.get(fragment, []) if finding[1] not in others]
+    return findings, analyzed
+
+
+class VerifyCache:
+    # Findings by content hash, and the hash each unit was last verified
+    # with. A hash is dropped once no unit was last verified with it, so
+    # verifying a few units leaves the findings of all others alone.
+    def __init__(self, findings: Union[dict, None] = None, names: Union[dict, None] = None):
+        self.findings = findings if findings is not None else {}
+        self.names = names if names is not None else {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.findings
+
+    def __getitem__(self, key: str) -> list:
+        return self.findings[key]
+
+    def __len__(self) -> int:
+        return len(self.findings)
+
+    def update(self, findings: dict):
+        self.findings.update(findings)
+
+    def setKeys(self, keys: dict) -> bool:
+        # notes the hashes units were just verified with; True when that
+        # changed anything
+        replaced = {self.names[name] for name, key in keys.items() if self.names.get(name, key) != key}
+        changed = bool(replaced) or any(name not in self.names for name in keys)
+        self.names.update(keys)
+        if replaced:
+            replaced.difference_update(self.names.values())
+            for key in replaced:
+                self.findings.pop(key, None)
+        return changed
+
+
+@timed('worker')
+def verifyUnitFiles(names: list, cache: Union[VerifyCache, None] = None, searchPaths: Union[tuple, None] = None,
+                    runner: Union[Callable, None] = None, workers: int = VERIFY_WORKERS,
+                    path: Union[str, None] = None) -> tuple:
+    # (names checked, {name: [finding]} for those with findings, cache).
+    # cache is loaded from path when None; units without a readable file
+    # are not checked. The files not in the cache are spread over up to
+    # workers systemd-analyze processes.
+    searchPaths = searchPaths or unitfile.UNIT_PATHS
+    runner = runner or runLocally
+    if cache is None:
+        cache = loadVerifyCache(path)
+    keys = {}
+    contents = {}
+    todo = {}
+    for name in names:
+        fragment = findFragment(name, searchPaths)
+        if fragment is None:
+            continue
+        # an instance has the drop-ins of its template and its own
+        dropIns = findDropIns(name, searchPaths)
+        files = (fragment, tuple(dropIns))
+        if files not in contents:
+            key, texts = contentKey([fragment] + dropIns)
+            contents[files] = key
+            if key is not None and key not in cache and key not in todo:
+                todo[key] = (key, fragment, dropIns, texts)
+        if contents[files] is not None:
+            keys[name] = contents[files]
+    # findings of batches systemd-analyze could not run for are shown but
+    # not kept, they are tried again next time
+    uncached = {}
+    if todo:
+        entries = list(todo.values())
+        size = max(1, min(VERIFY_BATCH, -(-len(entries) // max(1, workers))))
+        batches = [entries[i:i + size] for i in range(0, len(entries), size)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as pool:
+            for findings, analyzed in pool.map(lambda batch: verifyBatch(batch, runner), batches):
+                (cache if analyzed else uncached).update(findings)
+    if cache.setKeys(keys) or todo:
+        saveVerifyCache(cache, path)
+    results = {}
+    for name, key in keys.items():
+        found = cache[key] if key in cache else uncached.get(key)
+        if found:
+            results[name] = found
+    return set(keys), results, cache
+
+
+def saveVerifyCache(cache: VerifyCache, path: Union[str, None] = None):
+    path = path or verifyCachePath()
+    data = {'version': VERIFY_CACHE_VERSION, 'findings': cache.findings, 'names': cache.names}
+    payload = zlib.compress(json.dumps(data, separators=(',', ':')).encode(), 1)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(payload)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+
+
+def loadVerifyCache(path: Union[str, None] = None) -> VerifyCache:
+    path = path or verifyCachePath()
+    try:
+        with open(path, 'rb') as f:
+            data = json.loads(zlib.decompress(f.read()))
+    except (OSError, ValueError, zlib.error):
+        return VerifyCache()
+    if not isinstance(data, dict) or data.get('version') != VERIFY_CACHE_VERSION:
+        return VerifyCache()
+    findings = {key: [tuple(finding) for finding in found] for key, found in data['findings'].items()}
+    return VerifyCache(findings, data['names'])
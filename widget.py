@@ -1,13 +1,23 @@
 # This Python file uses the following encoding: utf-8
+import os
 import sys
-import enum, subprocess
+import time
 from typing import Union
+
+# taken before the Qt imports, the startup report counts from here
+launchTime = time.perf_counter()
+
+from PySide6.QtCore import QEvent, QObject, Qt, QTimer
+from PySide6.QtGui import QAction, QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QApplication,
     QWidget,
+    QHeaderView,
+    QLabel,
+    QMenu,
+    QStyle,
     QTableWidget,
     QTableWidgetItem,
-    QHeaderView,
 )
 
 # Important:
@@ -15,47 +25,32 @@ from PySide6.QtWidgets import (
 #     pyside6-uic form.ui -o ui_form.py, or
 #     pyside2-uic form.ui -o ui_form.py
 from ui_form import Ui_Widget
-
-
-class UnitType(enum.Enum):
-    ALL = 0
-    SERVICE = 'service'
-    MOUNT = 'mount'
-    SWAP = 'swap'
-    SOCKET = 'socket'
-    TARGET = 'target'
-    DEVICE = 'device'
-    AUTOMOUNT = 'automount'
-    TIMER = 'timer'
-    PATH = 'path'
-    SLICE = 'slice'
-    SCOPE = 'scope'
-
-
-class FileSections(enum.Enum):
-    UNIT = '[Unit]'
-    INSTALL = '[Install]'
-    SERVICE = '[Service]'
-    SOCKET = '[Socket]'
-    DEVICE = '[Device]'
-    MOUNT = '[Mount]'
-    AUTOMOUNT = '[Automount]'
-    SWAP = '[Swap]'
-    TARGET = '[Target]'
-    PATH = '[Path]'
-    TIMER = '[Timer]'
-    SLICE = '[Slice]'
-    SCOPE = '[Scope]'
-
-
-class Unit:
-    def __init__(self, name: str, unitType: UnitType):
-        self.name = name
-        self.unitType = unitType
-
-
-units = list()
-currentType = UnitType.ALL
+from units import UNIT_TYPES, UnitType
+from backend import BULK_ACTIONS
+from core import UnitEngine, buildGraph, checkDaemonReload, fetchUnitDetails, refreshNamedUnits, refreshUnits
+from executor import CommandExecutor
+from unitmodel import UnitTableModel, UnitFilterProxyModel
+from jobs import RUNNING, JobQueue
+from search import UnitSearchIndex
+from contentindex import isContentQuery, updateContentIndex
+from verify import verifyUnitFiles
+from unitfile import UnitSettings, invalidateParseCache, ownerRows
+from snapshot import loadSnapshot
+from targets import STATE_PROPERTIES, createTargetBackend
+from cgroups import CgroupSampler, cgroupsAvailable, hasCgroup, mapControlGroups
+from instrumentation import timed
+# monitor, unitwatch, depgraph, graphview, journal, boot, bootview, timers,
+# timerview, resourceview and jobview are imported when first needed, they
+# are not required to put the unit list on screen
+
+
+SEARCH_DEBOUNCE_MS = 150
+RESOURCE_SAMPLE_MS = 1000
+# how often running jobs are checked on
+JOB_POLL_MS = 250
+# initial widths of the columns before Description, which takes the rest
+COLUMN_WIDTHS = (300, 70, 70, 80, 80)
+TARGET_COLUMNS = ('Target', 'Load', 'Active', 'Sub', 'Enabled', 'Error')
 
 
 class Widget(QWidget):
@@ -65,258 +60,941 @@ class Widget(QWidget):
         self.ui.setupUi(self)
         self.enableDisableBtnConn = None
         self.startStopBtnConn = None
+        self.executor = CommandExecutor(self)
+        # --machine=/--host= arguments or SYSTEMDGUI_TARGETS select what to
+        # manage, several targets are handled as one
+        self.engine = UnitEngine(createTargetBackend(sys.argv[1:]))
+        self.backend = self.engine.backend
+        self.unitModel = UnitTableModel(self)
+        self.unitModel.busyIcon = self.style().standardIcon(QStyle.SP_BrowserReload)
+        self.unitModel.staleIcon = self.style().standardIcon(QStyle.SP_MessageBoxInformation)
+        self.unitModel.errorIcon = self.style().standardIcon(QStyle.SP_MessageBoxCritical)
+        self.unitModel.warningIcon = self.style().standardIcon(QStyle.SP_MessageBoxWarning)
+        self.proxyModel = UnitFilterProxyModel(self)
+        self.proxyModel.setSourceModel(self.unitModel)
+        self.ui.tableView.setModel(self.proxyModel)
+        self.ui.tableView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.fuzzySearchAction = QAction('Fuzzy matching', self)
+        self.fuzzySearchAction.setCheckable(True)
+        self.descriptionSearchAction = QAction('Match descriptions', self)
+        self.descriptionSearchAction.setCheckable(True)
+        # key:value terms switch to it on their own
+        self.contentSearchAction = QAction('Search unit file contents', self)
+        self.contentSearchAction.setCheckable(True)
+        self.contentSearchAction.setVisible(self.backend.local)
+        self.ui.searchBar.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.ui.searchBar.customContextMenuRequested.connect(self.showSearchBarMenu)
+        self.dependencyGraph = None
+        self.dependencyCycles = []
+        self.dependencySummary = None
+        self.dependencyView = None
+        self.journalView = None
+        self.targetsSummary = None
+        self.targetsTable = None
+        self.bootView = None
+        self.bootLoaded = False
+        self.timerView = None
+        self.resourceView = None
+        self.resourceSampler = None
+        self.resourceTimer = QTimer(self)
+        self.resourceTimer.setInterval(RESOURCE_SAMPLE_MS)
+        self.jobQueue = JobQueue()
+        self.jobView = None
+        self.jobRequests = 0
+        self.jobTimer = QTimer(self)
+        self.jobTimer.setInterval(JOB_POLL_MS)
+        # units whose row is refreshed with the next state query
+        self.stateRefreshes = set()
+        # cgroup accounting and the journal are only readable for the machine
+        # we run on
+        self.ui.detailTabs.setTabVisible(self.ui.detailTabs.indexOf(self.ui.resourcesTab),
+                                         self.backend.local and cgroupsAvailable())
+        self.ui.detailTabs.setTabVisible(self.ui.detailTabs.indexOf(self.ui.logsTab), self.backend.local)
+        self.ui.detailTabs.setTabVisible(self.ui.detailTabs.indexOf(self.ui.targetsTab),
+                                         hasattr(self.backend, 'unitStates'))
+        self.monitor = None
+        self.unitWatcher = None
+        # units to ask NeedDaemonReload for with the next check
+        self.reloadChecks = set()
+        # units systemd announced or dropped, their rows are updated together
+        self.unitRequests = set()
+        self.reloadCheckedAtStart = False
+        # units to verify with the next pass, and the findings by content
+        # hash, loaded by the first pass
+        self.verifyRequests = set()
+        self.verifyCache = None
+        self.startupTimes = {}
+        self.backgroundStarted = False
+        self.ui.tableView.customContextMenuRequested.connect(self.showTableMenu)
+        self.ui.tableView.setSortingEnabled(True)
+        self.ui.tableView.sortByColumn(0, Qt.AscendingOrder)
+        self.ui.tableView.horizontalHeader().setContextMenuPolicy(Qt.CustomContextMenu)
+        self.ui.tableView.horizontalHeader().customContextMenuRequested.connect(self.showHeaderMenu)
+        self.debugPanel = None
+        self.debugShortcut = QShortcut(QKeySequence('Ctrl+Shift+D'), self)
+        self.debugShortcut.activated.connect(self.showDebugPanel)
+
+    def setupDependenciesTab(self):
+        from graphview import DependencyGraphView
+        self.dependencySummary = QLabel(self.ui.dependenciesTab)
+        self.dependencySummary.setWordWrap(True)
+        self.dependencySummary.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.dependencyView = DependencyGraphView(self.ui.dependenciesTab)
+        self.ui.dependenciesLayout.addWidget(self.dependencySummary)
+        self.ui.dependenciesLayout.addWidget(self.dependencyView, 1)
+        self.dependencyView.unitActivated.connect(selectUnit)
+
+    def showDebugPanel(self):
+        if self.debugPanel is None:
+            from debugpanel import DebugPanel
+            self.debugPanel = DebugPanel(self)
+        self.debugPanel.show()
+        self.debugPanel.raise_()
+
+    def setupLogsTab(self):
+        from journal import JournalView
+        self.journalView = JournalView(parent=self.ui.logsTab)
+        self.ui.logsLayout.addWidget(self.journalView)
+
+    def setupTargetsTab(self):
+        self.targetsSummary = QLabel(self.ui.targetsTab)
+        self.targetsSummary.setWordWrap(True)
+        self.targetsTable = QTableWidget(0, len(TARGET_COLUMNS), self.ui.targetsTab)
+        self.targetsTable.setHorizontalHeaderLabels(TARGET_COLUMNS)
+        self.targetsTable.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.targetsTable.verticalHeader().hide()
+        self.targetsTable.horizontalHeader().setStretchLastSection(True)
+        self.ui.targetsLayout.addWidget(self.targetsSummary)
+        self.ui.targetsLayout.addWidget(self.targetsTable, 1)
+
+    def setupBootTab(self):
+        from bootview import BootView
+        self.bootView = BootView(self.ui.bootTab)
+        self.ui.bootLayout.addWidget(self.bootView)
+        self.bootView.unitActivated.connect(selectUnit)
+        self.bootView.refreshRequested.connect(loadBoot)
+
+    def setupTimersTab(self):
+        from timerview import TimerView
+        self.timerView = TimerView(self.ui.timersTab)
+        self.ui.timersLayout.addWidget(self.timerView)
+        self.timerView.unitActivated.connect(selectUnit)
+        self.timerView.timerFired.connect(lambda: loadTimerList(False))
+
+    def setupResourcesTab(self):
+        from resourceview import ResourceView
+        self.resourceSampler = CgroupSampler()
+        self.resourceView = ResourceView(self.ui.resourcesTab)
+        self.ui.resourcesLayout.addWidget(self.resourceView)
+        self.resourceView.unitActivated.connect(selectUnit)
+        self.resourceTimer.timeout.connect(sampleResources)
+
+    def setupJobsTab(self):
+        from jobview import JobView
+        self.jobView = JobView(self.ui.jobsTab)
+        self.ui.jobsLayout.addWidget(self.jobView)
+        self.jobView.unitActivated.connect(selectUnit)
+        self.jobView.cancelRequested.connect(cancelJobs)
+        self.jobView.clearRequested.connect(clearJobs)
+
+    def showSearchBarMenu(self, pos):
+        menu = self.ui.searchBar.createStandardContextMenu()
+        menu.addSeparator()
+        menu.addAction(self.fuzzySearchAction)
+        menu.addAction(self.descriptionSearchAction)
+        menu.addAction(self.contentSearchAction)
+        menu.exec(self.ui.searchBar.mapToGlobal(pos))
+        menu.deleteLater()
+
+    def showTableMenu(self, pos):
+        names = selectedUnitNames()
+        # unit files can only be checked on this machine
+        if not names and not self.backend.local:
+            return
+        menu = QMenu(self)
+        suffix = f' {len(names)} units' if len(names) > 1 else ''
+        for action in BULK_ACTIONS if names else ():
+            menu.addAction(action.capitalize() + suffix,
+                           lambda action=action: self.runBulkAction(action, names))
+        if self.backend.local:
+            menu.addSeparator()
+            if names:
+                menu.addAction('Verify' + suffix, lambda: verifyUnits(names))
+            menu.addAction('Verify all units', lambda: verifyUnits(self.engine.unitNames()))
+        menu.exec(self.ui.tableView.viewport().mapToGlobal(pos))
+        menu.deleteLater()
+
+    def showHeaderMenu(self, pos):
+        # a checklist of the values found in the column, unchecked values
+        # are hidden
+        header = self.ui.tableView.horizontalHeader()
+        column = header.logicalIndexAt(pos)
+        if column not in UnitTableModel.FILTER_COLUMNS:
+            return
+        accepted = self.proxyModel.columnFilters.get(column)
+        menu = QMenu(self)
+        menu.addAction('Show all', lambda: setColumnFilter(column, None))
+        menu.addSeparator()
+        for value in self.unitModel.columnValues(column):
+            action = menu.addAction(value or '(none)')
+            action.setCheckable(True)
+            action.setChecked(accepted is None or value in accepted)
+            action.toggled.connect(lambda shown, value=value: toggleColumnValue(column, value, shown))
+        menu.exec(header.mapToGlobal(pos))
+        menu.deleteLater()
+
+    def runBulkAction(self, action: str, names: list):
+        # queued like everything else, see jobs.JobQueue
+        self.jobQueue.add(action, names)
+        dispatchJobs()
 
     def disableUnit(self, name: str):
-        cmd = ["systemctl", "disable", "--", name]
-        subprocess.run(cmd, shell=False, stdout=subprocess.PIPE)
-        onRowSelected()
+        self.runBulkAction('disable', [name])
 
     def enableUnit(self, name: str):
-        cmd = ["systemctl", "enable", "--", name]
-        subprocess.run(cmd, shell=False, stdout=subprocess.PIPE)
-        onRowSelected()
+        self.runBulkAction('enable', [name])
 
     def startUnit(self, name: str):
-        cmd = ["systemctl", "start", "--", name]
-        subprocess.run(cmd, shell=False, stdout=subprocess.PIPE)
-        onRowSelected()
+        self.runBulkAction('start', [name])
 
     def stopUnit(self, name: str):
-        cmd = ["systemctl", "stop", "--", name]
-        subprocess.run(cmd, shell=False, stdout=subprocess.PIPE)
-        onRowSelected()
-
-
-def loadListOfUnits() -> list:
-    array = []
-    cmd = ["systemctl", "list-unit-files"]
-    cmdOutput = str(subprocess.run(cmd, shell=False, stdout=subprocess.PIPE).stdout)
-    listedOutput = " ".join(cmdOutput.split()).split("\\n")
-    filtredOutput = list(map(str.strip, listedOutput))
-    filtredOutput = [value for value in filtredOutput if value]
-    listOfUnits = list(map(lambda x: x.split()[0], filtredOutput))[1:-3]
-    for item in listOfUnits:
-        array.append(Unit(item, item.split('.')[-1]))
-    return array
+        self.runBulkAction('stop', [name])
+
+
+class FirstPaintWatcher(QObject):
+    def eventFilter(self, obj, event) -> bool:
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            recordStartup('first paint')
+            QTimer.singleShot(0, startBackgroundWork)
+        return False
+
+
+def startBackgroundWork():
+    # Worker threads compete with the GUI thread for the interpreter, so
+    # nothing is started before the first frame is on screen
+    if widget.backgroundStarted:
+        return
+    widget.backgroundStarted = True
+    if widget.unitModel.units:
+        widget.executor.submit('index', UnitSearchIndex, widget.unitModel.units,
+                               onResult=onSnapshotIndexed)
+    startMonitor()
+    startUnitWatcher()
+    onLoad()
+    updateContents()
 
 
-def placeDataIntoTable(data: list, unitType:UnitType, tableWidget: QTableWidget):
-    if unitType != UnitType.ALL:
-        data = list(filter(lambda x: UnitType(x.unitType) == unitType, data))
+def recordStartup(stage: str):
+    # SYSTEMDGUI_TIMING=1 prints how long the window took to show up and to
+    # show the real unit list
+    widget.startupTimes[stage] = time.perf_counter() - launchTime
+    if stage == 'fresh data' and os.environ.get('SYSTEMDGUI_TIMING'):
+        report = ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in widget.startupTimes.items())
+        print(f'startup: {report}', file=sys.stderr)
 
-    tableWidget.setRowCount(len(data))
-    for i, item in enumerate(data):
-        tableWidget.setItem(i, 0, QTableWidgetItem(item.name))
 
+def snapshotScope() -> str:
+    return f'{widget.backend.name}:{os.environ.get("SYSTEMDGUI_BUS", "SYSTEM")}'
 
-def getUnitPath(name: str) -> Union[str, None]:
-    cmd = ["systemctl", "status", "--", name]
-    cmdOut = subprocess.run(cmd, shell=False, stdout=subprocess.PIPE)
-    if cmdOut.returncode != 4:
-        cmdOut = cmdOut.stdout
-    else:
-        return None
-    try:
-        return str(cmdOut).split("\\n")[1].strip().split("(")[1].split(";")[0]
-    except:
-        return None
 
+@timed()
+def restoreSnapshot():
+    snapshot = loadSnapshot(snapshotScope())
+    if not snapshot:
+        return
+    widget.unitModel.setUnits(snapshot)
+    widget.engine.units = widget.unitModel.units
+    recordStartup(f'snapshot ({len(snapshot)} units)')
 
-def getAutoRunStatus(name: str) -> str:
-    cmd = ["systemctl", "status", "--", name]
-    cmdOut = subprocess.run(cmd, shell=False, stdout=subprocess.PIPE).stdout
-    result = str(cmdOut).split("\\n")[1].strip().split(';')[1].strip().split(')')[0]
-    return result
 
+def onSnapshotIndexed(searchIndex: UnitSearchIndex):
+    widget.engine.searchIndex = searchIndex
+    if widget.ui.searchBar.text():
+        onSearchBarChanged()
 
-def getStateStatus(name: str) -> str:
-    cmd = ["systemctl", "status", "--", name]
-    cmdOut = subprocess.run(cmd, shell=False, stdout=subprocess.PIPE).stdout
-    result = str(cmdOut).split("\\n")[2].strip().split()[1]
-    return result
 
+@timed()
+def onLoad():
+    widget.executor.submit('list', refreshUnits, widget.backend, list(widget.unitModel.units),
+                           snapshotScope(), onResult=onUnitsLoaded)
+
+
+@timed()
+def onUnitsLoaded(result: tuple):
+    fresh, diff, searchIndex = result
+    widget.executor.cancel('index')
+    if not widget.unitModel.units or len(diff.added) + len(diff.removed) > len(fresh) // 2:
+        widget.unitModel.setUnits(fresh)
+    elif diff:
+        widget.unitModel.applyDiff(diff)
+    # the model keeps the list in the same order as fresh, so the index fits
+    widget.engine.setUnits(widget.unitModel.units, searchIndex)
+    if diff:
+        widget.dependencyGraph = None
+    onSearchBarChanged()
+    onRowSelected()
+    if diff:
+        mapResources()
+    if 'fresh data' not in widget.startupTimes:
+        recordStartup('fresh data')
+        checkReloadAtStart()
+    refreshUnitRows(())
+
+
+def refreshUnitRows(names):
+    # like checkReload; waits for a refresh of the whole list, whose result
+    # would not know about the rows changed here
+    widget.unitRequests.update(names)
+    if widget.unitRequests and not widget.executor.isBusy('list') and not widget.executor.isBusy('units'):
+        names, widget.unitRequests = sorted(widget.unitRequests), set()
+        widget.executor.submit('units', refreshNamedUnits, widget.backend, list(widget.unitModel.units), names,
+                               onResult=onUnitRowsLoaded, onError=lambda _: refreshUnitRows(()))
+
+
+def onUnitRowsLoaded(result: tuple):
+    fresh, diff, searchIndex, names = result
+    if widget.executor.isBusy('list'):
+        # the list being loaded was taken before these rows changed
+        widget.unitRequests.update(names)
+        return
+    onUnitsLoaded((fresh, diff, searchIndex))
+
+
+@timed()
+def onComboBoxChanged():
+    strCurrentType = widget.ui.comboBox.currentText()
+    widget.proxyModel.setUnitType(UnitType.ALL if strCurrentType == "All" else UNIT_TYPES[strCurrentType.lower()])
+    onFilterChanged()
 
-def getSectionElements(filePath: str, section: FileSections) -> Union[list, None]:
-    with open(filePath) as f:
-        data = f.read().strip().split('\n')
-        data = list(filter(lambda x: x != '', data))
-        data = list(filter(lambda x: x[0] != '#', data))
-        try:
-            a = data.index(section.value)
-        except:
-            return None
-        b = len(data)
-        sections = [i.value for i in FileSections]
-        sections.remove(section.value)
-        for item in sections:
-            try:
-                t = data.index(item)
-                if a < t < b:
-                    b = t
-            except:
-                continue
-        return data[a + 1:b]
 
+def onRefreshButtonPressed():
+    onLoad()
 
-def getUnitDataFromFile(data: list) -> dict:
-    pass
 
+def onBusyChanged(key: str, busy: bool):
+    if key == 'list':
+        widget.ui.refreshButton.setEnabled(not busy)
 
-def onLoad():
-    global units
-    units = loadListOfUnits()
-    placeDataIntoTable(units, UnitType.ALL, widget.ui.tableWidget)
 
+def startMonitor():
+    # Without a reachable bus the list just has to be refreshed by hand, and
+    # the local bus says nothing about other machines
+    if not widget.backend.local:
+        return
+    try:
+        from monitor import SystemdMonitor
+        widget.monitor = SystemdMonitor(os.environ.get('SYSTEMDGUI_BUS', 'SYSTEM'), parent=widget)
+    except Exception:
+        widget.monitor = None
+        return
+    widget.monitor.changed.connect(onSystemdChanged)
+    # cached properties are kept current by the signals, no need to expire them
+    widget.engine.propertiesCache.ttl = float('inf')
+
+
+@timed()
+def onSystemdChanged(changes):
+    affected = widget.engine.applySystemdChanges(changes)
+    widget.unitModel.updateUnits(changes.properties)
+    if any('ActiveState' in values for values in changes.properties.values()):
+        mapResources()
+    if changes.unitFilesChanged or any(name.endswith('.timer') for name in affected):
+        loadTimerList(changes.unitFilesChanged)
+    if changes.unitFilesChanged:
+        widget.dependencyGraph = None
+        updateContents()
+        onLoad()
+        # after a daemon-reload only the units flagged can have changed
+        checkReload(widget.unitModel.staleUnits)
+    if changes.newUnits or changes.removedUnits:
+        refreshUnitRows(changes.newUnits | changes.removedUnits)
+    if selectedUnitName() in affected:
+        onRowSelected()
 
-def onComboBoxChanged():
-    global currentType, units
-    strCurrentType = widget.ui.comboBox.currentText()
-    currentType = UnitType.ALL if strCurrentType == "All" else UnitType(strCurrentType.lower())
-    placeDataIntoTable(units, currentType, widget.ui.tableWidget)
-    onSearchBarChanged()
 
+def startUnitWatcher():
+    # edits to the unit files of this machine show up without a refresh
+    if not widget.backend.local:
+        return
+    try:
+        from unitwatch import UnitFileWatcher
+        widget.unitWatcher = UnitFileWatcher(parent=widget)
+    except OSError:
+        widget.unitWatcher = None
+        return
+    widget.unitWatcher.changed.connect(onUnitFilesEdited)
+
+
+@timed()
+def onUnitFilesEdited(changes):
+    # only the units the edited files apply to are dropped from the caches;
+    # a unit file appearing or disappearing also changes the list
+    names = widget.engine.unitNames()
+    if changes.overflow:
+        affected = list(names)
+        invalidateParseCache()
+    else:
+        affected = [names[row] for row in ownerRows(changes.owners, names)]
+        for path in changes.paths:
+            invalidateParseCache(path)
+    for name in affected:
+        widget.engine.invalidate(name)
+    updateContents()
+    if changes.overflow or changes.filesAddedOrRemoved:
+        widget.dependencyGraph = None
+        onLoad()
+    checkReload(affected)
+    verifyUnits(name for name in affected if name in widget.unitModel.verifiedUnits)
+    if selectedUnitName() in affected:
+        onRowSelected()
 
 
-def onRefreshButtonPressed():
-    global currentType, units
-    units = loadListOfUnits()
-    placeDataIntoTable(units,currentType, widget.ui.tableWidget)
-    onRowSelected()
+def checkReload(names):
+    # names pile up while a check runs and go with the next one
+    widget.reloadChecks.update(names)
+    if widget.backend.local and widget.reloadChecks and not widget.executor.isBusy('reload'):
+        names, widget.reloadChecks = sorted(widget.reloadChecks), set()
+        widget.executor.submit('reload', checkDaemonReload, widget.backend, names,
+                               onResult=onReloadChecked, onError=lambda _: checkReload(()))
+
+
+def checkReloadAtStart():
+    # a file untouched since boot was read by the systemd running now, only
+    # units with newer files are asked about; needs the fresh unit list and
+    # the content index, whichever comes last
+    if (widget.reloadCheckedAtStart or widget.engine.contentIndex is None
+            or 'fresh data' not in widget.startupTimes):
+        return
+    widget.reloadCheckedAtStart = True
+    bootTime = time.time() - time.clock_gettime(time.CLOCK_BOOTTIME)
+    names = widget.engine.unitNames()
+    checkReload(names[row] for row in ownerRows(widget.engine.contentIndex.ownersChangedSince(bootTime), names))
+
+
+def onReloadChecked(result: tuple):
+    widget.unitModel.setStale(*result)
+    checkReload(())
+
+
+def verifyUnits(names):
+    # like checkReload; files verified before only cost a hash
+    widget.verifyRequests.update(names)
+    if widget.backend.local and widget.verifyRequests and not widget.executor.isBusy('verify'):
+        names, widget.verifyRequests = sorted(widget.verifyRequests), set()
+        widget.executor.submit('verify', verifyUnitFiles, names, widget.verifyCache,
+                               onResult=onUnitsVerified, onError=lambda _: verifyUnits(()))
+
+
+def onUnitsVerified(result: tuple):
+    checked, findings, widget.verifyCache = result
+    widget.unitModel.setFindings(checked, findings)
+    verifyUnits(())
+
+
+def selectUnit(name: str):
+    sourceRow = widget.unitModel.rowOf(name)
+    if sourceRow is None:
+        return
+    index = widget.proxyModel.mapFromSource(widget.unitModel.index(sourceRow, 0))
+    if not index.isValid():
+        # the unit is filtered out, show everything again
+        widget.ui.searchBar.clear()
+        widget.ui.comboBox.setCurrentIndex(0)
+        for column in list(widget.proxyModel.columnFilters):
+            widget.proxyModel.setColumnFilter(column, None)
+        onSearchBarChanged()
+        index = widget.proxyModel.mapFromSource(widget.unitModel.index(sourceRow, 0))
+    widget.ui.tableView.selectRow(index.row())
+    widget.ui.tableView.scrollTo(index)
+
+
+@timed()
+def onDependencyGraphBuilt(result: tuple):
+    widget.dependencyGraph, widget.dependencyCycles = result
+    showDependencies()
+
+
+@timed()
+def showDependencies():
+    # the graph is only built once somebody looks at the dependencies tab
+    if widget.ui.detailTabs.currentWidget() is not widget.ui.dependenciesTab:
+        return
+    if widget.dependencyView is None:
+        widget.setupDependenciesTab()
+    name = selectedUnitName()
+    if name is None:
+        widget.dependencySummary.setText('')
+        widget.dependencyView.scene().clear()
+        return
+    graph = widget.dependencyGraph
+    if graph is None:
+        if not widget.executor.isBusy('graph'):
+            widget.dependencySummary.setText('Building the dependency graph...')
+            widget.executor.submit('graph', buildGraph, widget.backend,
+                                   [unit.name for unit in widget.unitModel.units],
+                                   onResult=onDependencyGraphBuilt)
+        return
+
+    lines = []
+    pulledInBy = graph.pulledInBy(name)
+    if pulledInBy:
+        lines.append('Pulled in by: ' + '; '.join(f'{kind}: {", ".join(sorted(sources))}'
+                                                  for kind, sources in pulledInBy.items()))
+    else:
+        lines.append('Pulled in by: nothing')
+    impact = sorted(graph.stopImpact(name))
+    if impact:
+        shown = ', '.join(impact[:20]) + (f' and {len(impact) - 20} more' if len(impact) > 20 else '')
+        lines.append(f'Stopping it also stops {len(impact)} units: {shown}')
+    for cycle in widget.dependencyCycles:
+        if name in cycle:
+            lines.append('Ordering cycle: ' + ' \u2192 '.join(cycle))
+    widget.dependencySummary.setText('\n'.join(lines))
+    widget.dependencyView.showUnit(graph, name)
+
+
+@timed()
+def showJournal():
+    # journalctl only runs while the logs tab is visible, which it is not
+    # for other machines
+    if widget.backend.local and widget.ui.detailTabs.currentWidget() is widget.ui.logsTab:
+        if widget.journalView is None:
+            widget.setupLogsTab()
+        widget.journalView.follow(selectedUnitName())
+    elif widget.journalView is not None:
+        widget.journalView.follow(None)
+
+
+def showTargets():
+    # the selected unit on every target, asked for while the tab is visible
+    if (widget.ui.detailTabs.currentWidget() is not widget.ui.targetsTab
+            or not hasattr(widget.backend, 'unitStates')):
+        return
+    if widget.targetsTable is None:
+        widget.setupTargetsTab()
+    name = selectedUnitName()
+    if name is None:
+        widget.executor.cancel('targets')
+        widget.targetsTable.setRowCount(0)
+        return
+    widget.executor.submit('targets', widget.backend.unitStates, name,
+                           onResult=lambda states: onTargetStatesFetched(name, states),
+                           onError=widget.targetsSummary.setText)
+
+
+@timed()
+def onTargetStatesFetched(name: str, states: list):
+    if name != selectedUnitName():
+        return
+    unreachable = [f'{target}: {error}' for target, error in widget.backend.errors.items()]
+    widget.targetsSummary.setText('Unreachable: ' + '; '.join(unreachable) if unreachable else '')
+    widget.targetsTable.setRowCount(len(states))
+    for row, (target, properties, error) in enumerate(states):
+        values = [target] + [(properties or {}).get(key, '') for key in STATE_PROPERTIES] + [error or '']
+        for column, value in enumerate(values):
+            widget.targetsTable.setItem(row, column, QTableWidgetItem(value))
+
+
+def showBoot():
+    # the boot is analysed the first time the tab is shown with the unit
+    # list loaded, and again on refresh
+    if widget.ui.detailTabs.currentWidget() is not widget.ui.bootTab:
+        return
+    if widget.bootView is None:
+        widget.setupBootTab()
+    if not widget.bootLoaded and widget.unitModel.units:
+        loadBoot()
+    widget.bootView.setCurrentUnit(selectedUnitName())
+
+
+def loadBoot():
+    from boot import loadBootAnalysis
+    widget.bootLoaded = True
+    widget.bootView.setLoading()
+    widget.executor.submit('boot', loadBootAnalysis, widget.backend,
+                           [unit.name for unit in widget.unitModel.units if unit.loadState == 'loaded'],
+                           onResult=onBootAnalysisLoaded, onError=widget.bootView.setError)
+
+
+@timed()
+def onBootAnalysisLoaded(analysis):
+    widget.bootView.setAnalysis(analysis)
+    widget.bootView.setCurrentUnit(selectedUnitName())
+
+
+def showTimers():
+    # the timers are loaded once, the countdowns run locally while the tab
+    # is visible
+    visible = widget.ui.detailTabs.currentWidget() is widget.ui.timersTab
+    if widget.timerView is None:
+        if not visible:
+            return
+        widget.setupTimersTab()
+        loadTimerList()
+    widget.timerView.setTicking(visible)
+
+
+def loadTimerList(readUnitFiles: bool = True):
+    # a timer firing changes when it elapses, not its schedule
+    from timers import loadTimers
+    if widget.timerView is None:
+        return
+    entries = widget.timerView.model.entries
+    if not entries:
+        widget.timerView.setLoading()
+    schedules = None if readUnitFiles else {entry.name: entry.schedule for entry in entries}
+    widget.executor.submit('timers', loadTimers, widget.backend, schedules,
+                           onResult=widget.timerView.setEntries, onError=widget.timerView.setError)
+
+
+def showResources():
+    # cgroups are only sampled while the tab is visible
+    if widget.ui.detailTabs.currentWidget() is not widget.ui.resourcesTab:
+        widget.resourceTimer.stop()
+        return
+    if widget.resourceView is None:
+        widget.setupResourcesTab()
+        mapResources()
+    if not widget.resourceTimer.isActive():
+        widget.resourceTimer.start()
+        sampleResources()
+
+
+def mapResources():
+    # which cgroup belongs to which running unit
+    if widget.resourceView is None:
+        return
+    names = [unit.name for unit in widget.unitModel.units
+             if unit.activeState in ('active', 'activating', 'reloading', 'deactivating') and hasCgroup(unit.name)]
+    widget.executor.submit('cgroups', mapControlGroups, widget.backend, names,
+                           onResult=onResourcesMapped, onError=widget.resourceView.setError)
+
+
+def onResourcesMapped(cgroups: dict):
+    widget.resourceSampler.setUnits(cgroups)
+    sampleResources()
+
+
+def sampleResources():
+    # a sample still running (or waiting for its thread) is not doubled up
+    if widget.resourceTimer.isActive() and not widget.executor.isBusy('resources'):
+        widget.executor.submit('resources', widget.resourceSampler.sample,
+                               onResult=widget.resourceView.setRows, onError=widget.resourceView.setError)
+
+
+def showJobs():
+    if widget.ui.detailTabs.currentWidget() is widget.ui.jobsTab and widget.jobView is None:
+        widget.setupJobsTab()
+        updateJobs()
+
+
+@timed()
+def updateJobs():
+    # the busy marks in the unit table, the tab title and the tab itself
+    busy = widget.jobQueue.busyUnits()
+    for name in widget.unitModel.busyUnits ^ busy:
+        widget.unitModel.setBusy(name, name in busy)
+    active = widget.jobQueue.activeCount()
+    widget.ui.detailTabs.setTabText(widget.ui.detailTabs.indexOf(widget.ui.jobsTab),
+                                    f'Jobs ({active})' if active else 'Jobs')
+    if widget.jobView is not None:
+        widget.jobView.setJobs(widget.jobQueue.jobs, widget.jobQueue.counts())
+
+
+def dispatchJobs():
+    # every unit whose previous job is over gets its next one, one backend
+    # call per action; systemd is not waited for
+    for action, jobs in widget.jobQueue.takeReady().items():
+        widget.jobRequests += 1
+        widget.executor.submit(f'jobs:{widget.jobRequests}', widget.backend.enqueueJobs, action,
+                               [job.name for job in jobs],
+                               onResult=lambda result, jobs=jobs: onJobsQueued(jobs, result),
+                               onError=lambda message, jobs=jobs: onJobsQueued(
+                                   jobs, ({}, {job.name: (False, message) for job in jobs})))
+    updateJobs()
+
+
+@timed()
+def onJobsQueued(jobs: list, result: tuple):
+    queued, finished = result
+    for job in jobs:
+        if job.name in queued:
+            widget.jobQueue.accept(job, queued[job.name])
+            if job.cancelRequested:
+                cancelJobs([job])
+        else:
+            widget.jobQueue.finish(job, *finished.get(job.name, (False, 'no result')))
+    if widget.jobQueue.running() and not widget.jobTimer.isActive():
+        widget.jobTimer.start()
+    refreshUnitStates(name for name in finished)
+    dispatchJobs()
+
+
+def pollJobs():
+    running = widget.jobQueue.running()
+    if not running:
+        widget.jobTimer.stop()
+    elif not widget.executor.isBusy('jobs'):
+        widget.executor.submit('jobs', widget.backend.jobResults,
+                               {job.name: (job.action, job.jobId) for job in running}, onResult=onJobResults)
+
+
+@timed()
+def onJobResults(results: dict):
+    for name, (succeeded, detail) in results.items():
+        job = widget.jobQueue.jobFor(name)
+        if job is not None:
+            widget.jobQueue.finish(job, succeeded, detail)
+    if results:
+        refreshUnitStates(results)
+        dispatchJobs()
+
+
+def cancelJobs(jobs: list):
+    # pending jobs just leave the queue, systemd is asked to cancel running ones
+    for job in jobs:
+        if not widget.jobQueue.cancel(job) and job.state == RUNNING:
+            widget.executor.submit(f'cancel:{job.number}', widget.backend.cancelJob, job.name, job.jobId)
+    updateJobs()
+
+
+def clearJobs():
+    widget.jobQueue.clearFinished()
+    updateJobs()
+
+
+def refreshUnitStates(names):
+    # the rows of units whose job finished, instead of the whole list;
+    # names pile up while a query runs and go with the next one
+    for name in names:
+        widget.engine.invalidate(name)
+        widget.stateRefreshes.add(name)
+    if widget.stateRefreshes and not widget.executor.isBusy('states'):
+        names, widget.stateRefreshes = sorted(widget.stateRefreshes), set()
+        widget.executor.submit('states', widget.backend.getProperties, names,
+                               tuple(UnitTableModel.PROPERTY_FIELDS),
+                               onResult=onUnitStatesRefreshed, onError=lambda _: refreshUnitStates(()))
+
+
+@timed()
+def onUnitStatesRefreshed(states: dict):
+    widget.unitModel.updateUnits(states)
+    if selectedUnitName() in states:
+        onRowSelected()
+    refreshUnitStates(())
 
 
 def clearMoreLabels():
+    widget.ui.labelMoreName.setText('')
     widget.ui.labelMoreAfter.setText('')
     widget.ui.labelMoreBefore.setText('')
     widget.ui.labelMoreRequires.setText('')
     widget.ui.labelMoreWants.setText('')
     widget.ui.labelMoreConflicts.setText('')
     widget.ui.labelMoreAutorun.setText('')
+    widget.ui.labelMoreDescription.setText('')
+    widget.ui.labelMoreState.setText('')
+    widget.ui.labelMorePathToUnit.setText('')
+    widget.ui.labelMorePathToUnit.setToolTip('')
+
+
+def contentSearchActive() -> bool:
+    text = widget.ui.searchBar.text()
+    return widget.backend.local and bool(text.strip()) and (widget.contentSearchAction.isChecked()
+                                                           or isContentQuery(text, widget.engine.unitNames()))
+
 
+@timed()
 def onSearchBarChanged():
-    global units
-    textToSearch = widget.ui.searchBar.text().lower()
-    unitsToShow = list(filter(lambda x: textToSearch in x.name.lower(), units))
-    placeDataIntoTable(unitsToShow, currentType, widget.ui.tableWidget)
-    onRowSelected()
+    widget.searchTimer.stop()
+    if contentSearchActive():
+        rows = widget.engine.contentRows(widget.ui.searchBar.text())
+    else:
+        rows = widget.engine.matchingRows(widget.ui.searchBar.text(),
+                                          fuzzy=widget.fuzzySearchAction.isChecked(),
+                                          descriptions=widget.descriptionSearchAction.isChecked())
+    widget.proxyModel.setAcceptedRows(rows)
+    onFilterChanged()
 
-def onRowSelected():
-    clearMoreLabels()
 
-    # Меняю описание юнита
-    selectedRow = widget.ui.tableWidget.selectedItems()
-    widget.ui.labelMoreName.setText(selectedRow[0].text())
-    # widget.ui.labelMoreDescription.setText(selectedRow[4].text())
-    unitPath = getUnitPath(selectedRow[0].text())
-    if unitPath:
-        sectionElements = getSectionElements(unitPath, FileSections.UNIT)
-        try:
-            descriptionText = list(filter(lambda x: x.startswith('Description='), sectionElements))
-            descriptionText = descriptionText[0][12::] if descriptionText else None
-            widget.ui.labelMoreDescription.setText(descriptionText)
-        except:
-            pass
-        try:
-            afterText = list(filter(lambda x: x.startswith('After='), sectionElements))
-            afterText = afterText[0][6::] if afterText else None
-            widget.ui.labelMoreAfter.setText(afterText)
-        except:
-            pass
-        try:
-            beforeText = list(filter(lambda x: x.startswith('Before='), sectionElements))
-            beforeText = beforeText[0][7::] if beforeText else None
-            widget.ui.labelMoreBefore.setText(beforeText)
-        except:
-            pass
-        try:
-            requiresText = list(filter(lambda x: x.startswith('Requires='), sectionElements))
-            requiresText = requiresText[0][9::] if requiresText else None
-            widget.ui.labelMoreRequires.setText(requiresText)
-        except:
-            pass
-        try:
-            wantsText = list(filter(lambda x: x.startswith('Wants='), sectionElements))
-            wantsText = wantsText[0][6::] if wantsText else None
-            widget.ui.labelMoreWants.setText(wantsText)
-        except:
-            pass
-        try:
-            conflictsText = list(filter(lambda x: x.startswith('Conflicts='), sectionElements))
-            conflictsText = conflictsText[0][10::] if conflictsText else None
-            widget.ui.labelMoreConflicts.setText(conflictsText)
-        except:
-            pass
+def updateContents():
+    # the unit files of this machine, reread where they changed
+    if widget.backend.local:
+        widget.executor.submit('contents', updateContentIndex, widget.engine.contentIndex,
+                               onResult=onContentsIndexed)
+
+
+def onContentsIndexed(contentIndex):
+    widget.engine.contentIndex = contentIndex
+    checkReloadAtStart()
+    if contentSearchActive():
+        onSearchBarChanged()
+
+
+def setColumnFilter(column: int, values: Union[set, None]):
+    widget.proxyModel.setColumnFilter(column, values)
+    onFilterChanged()
+
+
+def toggleColumnValue(column: int, value: str, shown: bool):
+    values = set(widget.unitModel.columnValues(column))
+    accepted = widget.proxyModel.columnFilters.get(column, values)
+    accepted = accepted | {value} if shown else accepted - {value}
+    setColumnFilter(column, None if accepted >= values else accepted)
+
+
+def onFilterChanged():
+    # the proxy keeps the selection when the selected unit is still visible,
+    # the details only need reloading when it got filtered out
+    if (selectedUnitName() or '') != widget.ui.labelMoreName.text():
+        onRowSelected()
+
+
+def rebindButton(button, connAttr: str, text: str, slot=None):
+    previous = getattr(widget, connAttr)
+    if previous is not None:
         try:
-            widget.ui.labelMorePathToUnit.setText(unitPath)
+            button.pressed.disconnect(previous)
         except:
             pass
+    setattr(widget, connAttr, slot)
+    button.setEnabled(slot is not None)
+    button.setText(text)
+    if slot is not None:
+        button.pressed.connect(slot)
+
+
+def selectedUnitName() -> Union[str, None]:
+    selectedRows = widget.ui.tableView.selectionModel().selectedRows()
+    return widget.proxyModel.unitAt(selectedRows[0]).name if selectedRows else None
+
+
+def selectedUnitNames() -> list:
+    return [widget.proxyModel.unitAt(index).name
+            for index in widget.ui.tableView.selectionModel().selectedRows()]
+
+
+@timed()
+def onRowSelected():
+    clearMoreLabels()
+    rebindButton(widget.ui.enableDisableButton, 'enableDisableBtnConn', '')
+    rebindButton(widget.ui.startStopButton, 'startStopBtnConn', '')
+
+    name = selectedUnitName()
+    showDependencies()
+    showJournal()
+    showTargets()
+    showBoot()
+    if name is None:
+        widget.executor.cancel('selection')
+        return
+
+    # Меняю описание юнита
+    widget.ui.labelMoreName.setText(name)
+    cached = widget.engine.cachedDetails(name)
+    if cached is not None:
+        widget.executor.cancel('selection')
+        showUnitProperties(name, *cached)
+        return
+    widget.executor.submit('selection', fetchUnitDetails, widget.backend, name,
+                           onResult=lambda result: onUnitDetailsFetched(name, result))
+
+
+@timed()
+def onUnitDetailsFetched(name: str, result: Union[tuple, None]):
+    if result is None:
+        return
+    properties, settings = result
+    widget.engine.storeDetails(name, properties, settings)
+    if name == selectedUnitName():
+        showUnitProperties(name, properties, settings)
+
+
+@timed()
+def showUnitProperties(name: str, properties: dict, settings: UnitSettings):
+    widget.ui.labelMoreDescription.setText(properties.get('Description', ''))
+    widget.ui.labelMoreAfter.setText(properties.get('After', ''))
+    widget.ui.labelMoreBefore.setText(properties.get('Before', ''))
+    widget.ui.labelMoreRequires.setText(properties.get('Requires', ''))
+    widget.ui.labelMoreWants.setText(properties.get('Wants', ''))
+    widget.ui.labelMoreConflicts.setText(properties.get('Conflicts', ''))
+    unitPath = properties.get('FragmentPath', '')
+    if settings.dropIns:
+        unitPath += f' (+{len(settings.dropIns)} drop-ins)'
+        widget.ui.labelMorePathToUnit.setToolTip('\n'.join(dropIn.path for dropIn in settings.dropIns))
+    widget.ui.labelMorePathToUnit.setText(unitPath)
 
     # Меняю действие кнопок enable/disable
-    autorunStatus = getAutoRunStatus(selectedRow[0].text())
+    autorunStatus = properties.get('UnitFileState', '')
+    widget.ui.labelMoreAutorun.setText(autorunStatus)
     if autorunStatus == 'enabled':
-        widget.ui.enableDisableButton.setEnabled(True)
-        widget.ui.enableDisableButton.setText('disable')
-        widget.ui.labelMoreAutorun.setText('enabled')
-        try:
-            widget.ui.enableDisableButton.pressed.disconnect(widget.enableDisableBtnConn)
-        except:
-            pass
-        widget.enableDisableBtnConn = lambda: widget.disableUnit(selectedRow[0].text())
-        widget.ui.enableDisableButton.pressed.connect(widget.enableDisableBtnConn)
+        rebindButton(widget.ui.enableDisableButton, 'enableDisableBtnConn', 'disable',
+                     lambda: widget.disableUnit(name))
     elif autorunStatus == 'disabled':
-        widget.ui.enableDisableButton.setEnabled(True)
-        widget.ui.enableDisableButton.setText('enable')
-        widget.ui.labelMoreAutorun.setText('disabled')
-
-        try:
-            widget.ui.enableDisableButton.pressed.disconnect(widget.enableDisableBtnConn)
-        except:
-            pass
-        widget.enableDisableBtnConn = lambda: widget.enableUnit(selectedRow[0].text())
-        widget.ui.enableDisableButton.pressed.connect(widget.enableDisableBtnConn)
+        rebindButton(widget.ui.enableDisableButton, 'enableDisableBtnConn', 'enable',
+                     lambda: widget.enableUnit(name))
     else:
-        widget.ui.enableDisableButton.setEnabled(False)
-        widget.ui.enableDisableButton.setText('')
-        try:
-            widget.ui.enableDisableButton.pressed.disconnect(widget.enableDisableBtnConn)
-        except:
-            pass
+        rebindButton(widget.ui.enableDisableButton, 'enableDisableBtnConn', '')
 
     # Меняю действие кнопок start/stop
-    activeStatus = getStateStatus(selectedRow[0].text())
+    activeStatus = properties.get('ActiveState', '')
+    subStatus = properties.get('SubState', '')
+    widget.ui.labelMoreState.setText(f'{activeStatus} ({subStatus})' if subStatus else activeStatus)
     if activeStatus == 'active':
-        widget.ui.startStopButton.setEnabled(True)
-        widget.ui.startStopButton.setText('stop')
-        widget.ui.labelMoreState.setText('active')
-        try:
-            widget.ui.startStopButton.pressed.disconnect(widget.startStopBtnConn)
-        except:
-            pass
-        widget.startStopBtnConn = lambda: widget.stopUnit(selectedRow[0].text())
-        widget.ui.startStopButton.pressed.connect(widget.startStopBtnConn)
-    elif activeStatus == 'inactive':
-        widget.ui.startStopButton.setEnabled(True)
-        widget.ui.startStopButton.setText('start')
-        widget.ui.labelMoreState.setText('inactive')
-        try:
-            widget.ui.startStopButton.pressed.disconnect(widget.startStopBtnConn)
-        except:
-            pass
-        widget.startStopBtnConn = lambda: widget.startUnit(selectedRow[0].text())
-        widget.ui.startStopButton.pressed.connect(widget.startStopBtnConn)
+        rebindButton(widget.ui.startStopButton, 'startStopBtnConn', 'stop',
+                     lambda: widget.stopUnit(name))
+    elif activeStatus in ('inactive', 'failed'):
+        rebindButton(widget.ui.startStopButton, 'startStopBtnConn', 'start',
+                     lambda: widget.startUnit(name))
     else:
-        widget.ui.startStopButton.setEnabled(False)
-        widget.ui.startStopButton.setText('')
-        widget.ui.startStopButton.pressed.disconnect(widget.startStopBtnConn)
+        rebindButton(widget.ui.startStopButton, 'startStopBtnConn', '')
+
+
+def connectSignals():
+    header = widget.ui.tableView.horizontalHeader()
+    header.setStretchLastSection(True)
+    for column, width in enumerate(COLUMN_WIDTHS):
+        header.resizeSection(column, width)
+    widget.executor.busyChanged.connect(onBusyChanged)
+    widget.ui.detailTabs.currentChanged.connect(showDependencies)
+    widget.ui.detailTabs.currentChanged.connect(showJournal)
+    widget.ui.detailTabs.currentChanged.connect(showTargets)
+    widget.ui.detailTabs.currentChanged.connect(showBoot)
+    widget.ui.detailTabs.currentChanged.connect(showTimers)
+    widget.ui.detailTabs.currentChanged.connect(showResources)
+    widget.ui.detailTabs.currentChanged.connect(showJobs)
+    widget.jobTimer.timeout.connect(pollJobs)
+    widget.ui.searchBar.textChanged.connect(lambda: widget.searchTimer.start())
+    widget.searchTimer.timeout.connect(onSearchBarChanged)
+    widget.fuzzySearchAction.toggled.connect(onSearchBarChanged)
+    widget.descriptionSearchAction.toggled.connect(onSearchBarChanged)
+    widget.contentSearchAction.toggled.connect(onSearchBarChanged)
+    widget.ui.comboBox.currentIndexChanged.connect(onComboBoxChanged)
+    widget.ui.refreshButton.pressed.connect(onRefreshButtonPressed)
+    widget.ui.tableView.selectionModel().selectionChanged.connect(onRowSelected)
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     widget = Widget()
-    widget.ui.tableWidget.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
-    onLoad()
-    widget.ui.searchBar.textChanged.connect(onSearchBarChanged)
-    widget.ui.comboBox.currentIndexChanged.connect(onComboBoxChanged)
-    widget.ui.refreshButton.pressed.connect(onRefreshButtonPressed)
-    widget.ui.tableWidget.itemSelectionChanged.connect(onRowSelected)
+    connectSignals()
+    # the last known list goes on screen right away, the real one and live
+    # updates follow once the window is up
+    firstPaintWatcher = FirstPaintWatcher()
+    widget.installEventFilter(firstPaintWatcher)
+    restoreSnapshot()
     widget.show()
-    sys.exit(app.exec())
+    # in case the window system never asks for a paint
+    QTimer.singleShot(1000, startBackgroundWork)
+    exitCode = app.exec()
+    if widget.resourceSampler is not None:
+        widget.resourceSampler.close()
+    if widget.unitWatcher is not None:
+        widget.unitWatcher.close()
+    if widget.journalView is not None:
+        widget.journalView.stop()
+    sys.exit(exitCode)